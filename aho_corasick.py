@@ -0,0 +1,84 @@
+"""
+Aho-Corasick 다중 문자열 검색
+
+여러 키워드(회사명 별칭, 분류 키워드 등)를 입력 텍스트 한 번 순회로 모두 찾기 위한 오토마톤.
+외부 의존성 없이 dict 기반 트라이와 실패 링크로 구현한다.
+"""
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    키워드 → 값 매핑을 가진 Aho-Corasick 오토마톤
+
+    사용 예:
+        automaton = AhoCorasick()
+        automaton.add("kodak", "코닥")
+        automaton.build()
+        for start, end, keyword, value in automaton.iter("kodak korea"):
+            ...
+    """
+
+    def __init__(self):
+        self._goto = [{}]      # 노드별 문자 → 다음 노드
+        self._fail = [0]       # 노드별 실패 링크
+        self._output = [[]]    # 노드에서 끝나는 (키워드, 값) 목록
+        self._built = False
+
+    def add(self, keyword, value=None):
+        """
+        키워드를 추가하는 함수 (build() 전에만 호출 가능)
+        """
+        if self._built:
+            raise RuntimeError("build() 이후에는 키워드를 추가할 수 없습니다.")
+        if not keyword:
+            return
+        node = 0
+        for ch in keyword:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        if (keyword, value) not in self._output[node]:
+            self._output[node].append((keyword, value))
+
+    def build(self):
+        """
+        실패 링크를 계산하여 검색 가능한 상태로 만드는 함수
+        """
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                # 실패 링크가 가리키는 노드의 출력도 함께 보고
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+        return self
+
+    def iter(self, text):
+        """
+        텍스트에서 발견되는 모든 키워드를 (시작, 끝, 키워드, 값) 형태로 반환하는 함수
+        겹치는 키워드도 모두 보고한다.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for keyword, value in output[node]:
+                yield index - len(keyword) + 1, index + 1, keyword, value
@@ -0,0 +1,290 @@
+"""
+질의응답 파이프라인 HTTP API (Streamlit 없이 실행)
+
+Streamlit 화면과 같은 프로세스 공유 자원(법령 코퍼스/색인, 웹 검색 캐시, 관계 그래프)을 사용하는
+aiohttp 서버. 이벤트 루프 하나에서 요청을 받고, 질문 처리(LLM 호출 포함)는 동시 처리 수를 제한한
+워커 스레드에서 실행하여 루프가 막히지 않게 한다.
+
+엔드포인트:
+    POST /ask          {"question": ..., "session_id"?: ..., "detailed"?: bool, "mode"?: "multi_agent"|"packed"}
+    POST /ask/stream   같은 요청, 진행 상황과 답변을 NDJSON(기본) 또는 SSE(Accept: text/event-stream)로 전송
+    GET  /health       준비 상태 (준비 완료 200, 그 외 503)
+    GET  /rates        공급자별 덤핑방지관세율 (?supplier=회사명 으로 특정 회사 조회)
+    GET  /metrics      토큰 사용량/비용, LLM 호출, 캐시 통계 (JSON, ?format=prometheus 로 Prometheus 형식)
+
+사용 예:
+    GEMINI_API_KEY=... python api_server.py --port 8080 --concurrency 16
+    curl -s localhost:8080/ask -d '{"question": "화펑 세율은?"}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from aiohttp import web
+
+import pipeline
+from completion_cache import get_completion_cache
+from llm_backend import get_backend, retry_stats
+from scheduler import get_llm_scheduler, get_question_scheduler
+from search_cache import get_search_cache
+from token_usage import format_prometheus, get_usage_ledger
+
+DEFAULT_CONCURRENCY = 8        # 동시에 처리할 질문 수
+DEFAULT_MAX_SESSIONS = 1000    # 메모리에 유지할 대화 세션 수
+STREAM_HEARTBEAT = 5           # 스트리밍 중 진행 상황이 없을 때 보내는 빈 이벤트 간격 (초)
+
+
+class SessionStore:
+    """
+    API 대화 세션 저장소 (session_id → HeadlessSessionState, LRU)
+
+    세션은 이 프로세스의 메모리에만 있고 대화 기록 저장소(conversation_store)에는 기록하지 않는다.
+    서버를 재시작하거나 max_sessions를 넘겨 밀려난 session_id로 질문하면 새 대화로 시작한다.
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, **defaults):
+        self.max_sessions = max_sessions
+        self.defaults = defaults
+        self._sessions = OrderedDict()
+        self._locks = {}  # session_id → asyncio.Lock (같은 세션의 질문은 순서대로 처리)
+        self._lock = threading.Lock()
+
+    def get(self, session_id=None):
+        with self._lock:
+            if session_id and session_id in self._sessions:
+                self._sessions.move_to_end(session_id)
+                return session_id, self._sessions[session_id], self._locks[session_id]
+            session_id = session_id or uuid.uuid4().hex
+            session = pipeline.new_session(session_id=session_id, **self.defaults)
+            self._sessions[session_id] = session
+            self._locks[session_id] = asyncio.Lock()
+            while len(self._sessions) > self.max_sessions:
+                old_id, _ = self._sessions.popitem(last=False)
+                self._locks.pop(old_id, None)
+            return session_id, session, self._locks[session_id]
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class QuestionAnsweringAPI:
+    """
+    HTTP API 처리기
+
+    Args:
+        concurrency (int): 동시에 처리할 질문 수 (워커 스레드 수)
+        gemini_api_key (str): Gemini API 키
+        serper_api_key (str): Serper API 키 (웹 검색용, 선택)
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, gemini_api_key="", serper_api_key=""):
+        self.concurrency = concurrency
+        self.sessions = SessionStore(gemini_api_key=gemini_api_key, serper_api_key=serper_api_key)
+        self._slots = None  # 이벤트 루프 안에서 생성
+        self.stats = {"requests": 0, "in_flight": 0, "errors": 0, "disconnects": 0}
+
+    async def parse_request(self, request):
+        """
+        요청 본문을 검사하여 질문과 세션을 꺼내는 함수 (형식이 잘못되면 400)
+
+        Returns:
+            tuple: (질문, detailed, mode, 세션 ID, 세션 상태, 세션 잠금)
+        """
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="요청 본문이 JSON이 아닙니다.")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="요청 본문은 JSON 객체여야 합니다.")
+        question = body.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise web.HTTPBadRequest(text="question 필드(문자열)가 필요합니다.")
+        detailed = body.get("detailed")
+        if detailed is not None and not isinstance(detailed, bool):
+            raise web.HTTPBadRequest(text="detailed 필드는 true/false여야 합니다.")
+        mode = body.get("mode")
+        if mode is not None and (not isinstance(mode, str) or mode not in pipeline.PIPELINE_MODE_LABELS):
+            raise web.HTTPBadRequest(text=f"지원하지 않는 mode입니다: {mode}")
+        session_id = body.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            raise web.HTTPBadRequest(text="session_id 필드는 문자열이어야 합니다.")
+        session_id, session, session_lock = self.sessions.get(session_id)
+        return question.strip(), detailed, mode, session_id, session, session_lock
+
+    async def run_question(self, session, session_lock, question, detailed, mode=None, listener=None):
+        """
+        Returns:
+            tuple: (답변, 질문의 토큰 사용량 dict)
+        """
+        async with session_lock, self._slots:
+            # 같은 세션의 이전 질문이 끝난 뒤에 답변 방식을 바꿈
+            if mode:
+                session.pipeline_mode = mode
+            self.stats["in_flight"] += 1
+            try:
+                answer = await asyncio.to_thread(pipeline.answer_question, session, question, detailed, listener)
+                usage = session.last_usage.to_dict() if session.last_usage else None
+                return answer, usage
+            finally:
+                self.stats["in_flight"] -= 1
+
+    async def handle_ask(self, request):
+        question, detailed, mode, session_id, session, session_lock = await self.parse_request(request)
+        self.stats["requests"] += 1
+        started = time.perf_counter()
+        try:
+            answer, usage = await self.run_question(session, session_lock, question, detailed, mode)
+        except Exception as e:
+            self.stats["errors"] += 1
+            return web.json_response({"error": str(e), "session_id": session_id}, status=500)
+        return web.json_response({
+            "session_id": session_id,
+            "question": question,
+            "answer": answer,
+            "usage": usage,
+            "elapsed": round(time.perf_counter() - started, 3),
+        })
+
+    async def handle_ask_stream(self, request):
+        question, detailed, mode, session_id, session, session_lock = await self.parse_request(request)
+        self.stats["requests"] += 1
+        use_sse = "text/event-stream" in request.headers.get("Accept", "")
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream" if use_sse else "application/x-ndjson",
+            "Cache-Control": "no-cache",
+        })
+        await response.prepare(request)
+
+        async def send(event, data):
+            if use_sse:
+                payload = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            else:
+                payload = json.dumps({"event": event, **data}, ensure_ascii=False) + "\n"
+            await response.write(payload.encode("utf-8"))
+
+        # 워커 스레드의 진행 상황을 이벤트 루프의 큐로 전달
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def listener(event, data):
+            loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+        started = time.perf_counter()
+        task = asyncio.ensure_future(self.run_question(session, session_lock, question, detailed, mode, listener))
+        try:
+            await send("accepted", {"session_id": session_id, "question": question})
+            while not task.done():
+                next_event = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait(
+                    {next_event, task}, timeout=STREAM_HEARTBEAT, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_event in done:
+                    await send(*next_event.result())
+                    continue
+                next_event.cancel()
+                if not done:
+                    await send("heartbeat", {"elapsed": round(time.perf_counter() - started, 1)})
+            # 답변 직전에 도착한 진행 상황 전송
+            while not events.empty():
+                await send(*events.get_nowait())
+            answer, usage = task.result()
+        except ConnectionResetError:
+            # 클라이언트 연결이 끊김: 보낼 곳이 없으므로 종료 (질문은 워커 스레드에서 마저 처리되어 세션에 남음)
+            self.stats["disconnects"] += 1
+            return response
+        except Exception as e:
+            self.stats["errors"] += 1
+            if request.transport is None or request.transport.is_closing():
+                return response
+            await send("error", {"error": str(e)})
+        else:
+            await send("answer", {
+                "session_id": session_id,
+                "answer": answer,
+                "usage": usage,
+                "elapsed": round(time.perf_counter() - started, 3),
+            })
+        await response.write_eof()
+        return response
+
+    async def handle_health(self, request):
+        pipeline.start_warmup()  # 이전 준비가 실패했으면 다시 시도
+        state = pipeline.readiness()
+        state.update({
+            "in_flight": self.stats["in_flight"],
+            "requests": self.stats["requests"],
+            "sessions": len(self.sessions),
+        })
+        return web.json_response(state, status=200 if state["ready"] else 503)
+
+    async def handle_rates(self, request):
+        supplier = request.query.get("supplier")
+        if supplier:
+            return web.json_response(pipeline.get_dumping_rate(supplier, use_web_search=False))
+        suppliers = [{
+            "supplier": key,
+            "name_en": info["name_en"],
+            "rate": info["rate"],
+            "description": info["description"],
+            "related_companies": info.get("related_companies", []),
+        } for key, info in pipeline.SUPPLIERS_INFO["MAJOR_SUPPLIERS"].items()]
+        return web.json_response({
+            "suppliers": suppliers,
+            "other_suppliers_rate": pipeline.SUPPLIERS_INFO["OTHER_SUPPLIERS_RATE"],
+            "legal_basis": pipeline.DUMPING_DUTY_LEGAL_BASIS,
+        })
+
+    async def handle_metrics(self, request):
+        usage = get_usage_ledger().snapshot()
+        if request.query.get("format") == "prometheus":
+            return web.Response(text=format_prometheus(usage), content_type="text/plain")
+        return web.json_response({
+            "usage": usage,
+            "llm": retry_stats.snapshot(),
+            "search_cache": get_search_cache().stats(),
+            "completion_cache": get_completion_cache().stats(),
+            "scheduler": {"questions": get_question_scheduler().stats(), "llm": get_llm_scheduler().stats()},
+            "api": {**self.stats, "sessions": len(self.sessions)},
+        })
+
+    async def on_startup(self, app):
+        self._slots = asyncio.Semaphore(self.concurrency)
+        pipeline.start_warmup()
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post("/ask", self.handle_ask)
+        app.router.add_post("/ask/stream", self.handle_ask_stream)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/rates", self.handle_rates)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self.on_startup)
+        return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="덤핑 전문가 챗봇 HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시에 처리할 질문 수")
+    args = parser.parse_args(argv)
+
+    gemini_api_key = os.environ.get("GEMINI_API_KEY", "")
+    if gemini_api_key:
+        get_backend().configure(gemini_api_key)
+    api = QuestionAnsweringAPI(
+        concurrency=args.concurrency,
+        gemini_api_key=gemini_api_key,
+        serper_api_key=os.environ.get("SERPER_API_KEY", ""),
+    )
+    print(f"API 서버: http://{args.host}:{args.port} (동시 처리 {args.concurrency}건)")
+    web.run_app(api.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+프로세스 전체에서 공유하는 비동기 I/O 런타임
+
+백그라운드 스레드에서 이벤트 루프 하나를 계속 실행하고, 그 루프가 소유한
+aiohttp.ClientSession(연결 풀, keep-alive, DNS 캐시)을 모든 웹 조회가 함께 사용한다.
+동기 코드(Streamlit 스크립트, 에이전트 함수 등)에서는 run()/submit()으로 코루틴을 넘긴다.
+"""
+import asyncio
+import atexit
+import os
+import threading
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+DEFAULT_CONNECTION_LIMIT = 32      # 전체 동시 연결 수
+DEFAULT_LIMIT_PER_HOST = 8         # 호스트별 동시 연결 수
+DEFAULT_KEEPALIVE_TIMEOUT = 60     # 유휴 연결 유지 시간 (초)
+DEFAULT_DNS_CACHE_TTL = 600        # DNS 조회 결과 캐시 시간 (초)
+
+
+class AsyncRuntime:
+    """
+    백그라운드 이벤트 루프 + 공유 HTTP 세션
+
+    Args:
+        connection_limit (int): 전체 동시 연결 수
+        limit_per_host (int): 호스트별 동시 요청 수
+        keepalive_timeout (float): 유휴 연결 유지 시간 (초)
+        dns_cache_ttl (int): DNS 캐시 시간 (초)
+    """
+
+    def __init__(self, connection_limit=DEFAULT_CONNECTION_LIMIT, limit_per_host=DEFAULT_LIMIT_PER_HOST,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT, dns_cache_ttl=DEFAULT_DNS_CACHE_TTL):
+        self.connection_limit = connection_limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._loop = asyncio.new_event_loop()
+        self._session = None
+        self._host_semaphores = {}
+        self._thread = threading.Thread(target=self._run_loop, name="async-runtime", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self):
+        return self._loop
+
+    async def get_session(self):
+        """
+        공유 ClientSession을 반환하는 함수 (런타임 루프 안에서만 호출)
+        """
+        if self._session is None or self._session.closed:
+            import aiohttp  # 비동기 HTTP 요청을 위한 aiohttp 라이브러리 (첫 웹 검색 때 불러옴)
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @asynccontextmanager
+    async def host_limit(self, url):
+        """
+        호스트별 동시 요청 수를 제한하는 비동기 컨텍스트 매니저
+        """
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.limit_per_host)
+        async with semaphore:
+            yield
+
+    def submit(self, coro):
+        """
+        코루틴을 런타임 루프에 제출하고 concurrent.futures.Future를 반환하는 함수
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """
+        코루틴을 런타임 루프에서 실행하고 결과를 기다리는 함수 (동기 코드용)
+        시간 초과 시 작업을 취소하고 asyncio.TimeoutError를 발생시킨다.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("런타임 루프 안에서는 run()을 호출할 수 없습니다. await를 사용하세요.")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise asyncio.TimeoutError() from None
+
+    def close(self):
+        """
+        공유 세션을 닫고 루프를 종료하는 함수
+        """
+        if not self._loop.is_running():
+            return
+
+        async def _close_session():
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+
+        try:
+            self.submit(_close_session()).result(5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_async_runtime():
+    """
+    프로세스 전체에서 공유하는 비동기 런타임을 반환하는 함수
+
+    환경 변수:
+        HTTP_CONNECTION_LIMIT: 전체 동시 연결 수
+        HTTP_LIMIT_PER_HOST: 호스트별 동시 요청 수
+    """
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AsyncRuntime(
+                    connection_limit=int(os.environ.get("HTTP_CONNECTION_LIMIT", DEFAULT_CONNECTION_LIMIT)),
+                    limit_per_host=int(os.environ.get("HTTP_LIMIT_PER_HOST", DEFAULT_LIMIT_PER_HOST)),
+                )
+                atexit.register(_runtime.close)
+    return _runtime
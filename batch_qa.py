@@ -0,0 +1,260 @@
+"""
+준비된 질문 목록 일괄 질의응답
+
+규제 검토용으로 준비한 수백 개의 질문을 화면과 같은 파이프라인(process_user_input)으로 답변한다.
+- 스레드 수를 제한한 병렬 처리 (법령 색인, 웹 검색 캐시는 프로세스 공유)
+- 프롬프트 해시 기반 LLM 응답 캐시로 같은 질문/자료 조합의 호출을 재사용
+- 결과(답변, 인용 자료, 단계별 소요 시간)는 완료되는 대로 JSONL 파일에 한 줄씩 기록
+- 같은 출력 파일로 다시 실행하면 이미 답변한 질문은 건너뛰고 이어서 진행
+  (LLM 호출 실패로 대체 문구가 답변된 질문은 오류로 기록되어 다시 실행되며, 결과 파일에는 질문별 최신 행만 남김)
+
+입력 파일 형식:
+    .txt    한 줄에 질문 하나 (#으로 시작하는 줄은 무시)
+    .csv    --question-col 열 (기본값: 첫 번째 열), --id-col 열이 있으면 질문 ID로 사용
+    .jsonl  {"question": ..., "id"?: ...}
+
+사용 예:
+    GEMINI_API_KEY=... python batch_qa.py questions.txt -o answers.jsonl --concurrency 8
+    LLM_BACKEND=fake python batch_qa.py questions.csv --question-col 질문 -o answers.jsonl --mode packed
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pipeline
+from completion_cache import CompletionCache, set_completion_cache
+from llm_backend import get_backend
+from load_test import summarize_latencies
+from search_cache import get_search_cache
+from token_usage import get_usage_ledger
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_COMPLETION_CACHE_SIZE = 4096
+
+
+def read_questions(path, question_col=None, id_col=None, encoding="utf-8-sig"):
+    """
+    입력 파일에서 질문 목록을 읽는 함수
+
+    Returns:
+        list: {"id": 질문 ID, "question": 질문} 목록 (같은 ID는 처음 것만 사용)
+    """
+    items = []
+    with open(path, encoding=encoding, newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            column = question_col or reader.fieldnames[0]
+            items = [(row.get(id_col) if id_col else None, row[column]) for row in reader if row.get(column)]
+        elif path.lower().endswith((".jsonl", ".ndjson")):
+            records = [json.loads(line) for line in f if line.strip()]
+            items = [(record.get("id"), record["question"]) for record in records if record.get("question")]
+        else:
+            items = [(None, line.strip()) for line in f if line.strip() and not line.startswith("#")]
+
+    questions = {}
+    for item_id, question in items:
+        question = question.strip()
+        item_id = str(item_id) if item_id else pipeline.question_id(question)
+        if question and item_id not in questions:
+            questions[item_id] = {"id": item_id, "question": question}
+    return list(questions.values())
+
+
+def load_results(path):
+    """
+    기존 결과 파일의 행을 질문 ID별로 읽는 함수 (같은 ID가 여러 번 기록되었으면 마지막 행 사용)
+
+    Returns:
+        dict: 질문 ID → 결과 행
+    """
+    if not os.path.exists(path):
+        return {}
+    results = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단되며 잘린 마지막 줄
+            results[row["id"]] = row
+    return results
+
+
+def load_answered_ids(path):
+    """
+    기존 결과 파일에서 이미 답변한 질문 ID를 읽는 함수 (이어서 실행용, 마지막 행이 오류인 질문은 다시 실행)
+    """
+    return {item_id for item_id, row in load_results(path).items() if not row.get("error")}
+
+
+def compact_results(path):
+    """
+    결과 파일을 질문 ID별 마지막 정상 행 하나씩만 남도록 다시 쓰는 함수
+    (다시 실행할 오류 행과 중복 행을 지워, 이어서 실행한 결과가 같은 ID로 중복 기록되지 않게 함)
+
+    Returns:
+        set: 이미 답변한 질문 ID
+    """
+    results = load_results(path)
+    if not results:
+        return set()
+    answered = {item_id: row for item_id, row in results.items() if not row.get("error")}
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        for row in answered.values():
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(temp_path, path)
+    return set(answered)
+
+
+def collect_citations(events):
+    """
+    파이프라인 진행 이벤트에서 답변에 사용된 자료 목록을 만드는 함수
+    """
+    citations = []
+    for _, event, data in events:
+        if event == "route" and data["intent"] != pipeline.INTENT_LLM:
+            citations.append({"document": "공급자 세율표", "suppliers": data["suppliers"]})
+            citations.append({"document": pipeline.DUMPING_DUTY_LEGAL_BASIS})
+        elif event == "agent_response":
+            citations.append({"document": data["law_name"], "relevant": data["relevant"]})
+        elif event == "packed_context" and not data["overflow"]:
+            citations.extend({"document": source["law_name"], "tag": source["tag"]} for source in data["sources"])
+    return citations
+
+
+def answer_item(item, session_defaults, detailed=True):
+    """
+    질문 하나를 새 세션에서 답변하고 결과 행을 만드는 함수 (워커 스레드에서 실행)
+
+    Args:
+        item (dict): {"id": 질문 ID, "question": 질문}
+        session_defaults (dict): 세션 초기값 (API 키, 답변 생성 방식)
+        detailed (bool): True면 자료 기반 상세 답변, False면 빠른 답변
+
+    Returns:
+        dict: 결과 행
+    """
+    session = pipeline.new_session(**session_defaults)
+    started = time.perf_counter()
+    events = []
+
+    def listener(event, data):
+        events.append((time.perf_counter() - started, event, data))
+
+    row = {"id": item["id"], "question": item["question"]}
+    try:
+        row["answer"] = pipeline.answer_question(session, item["question"], detailed, listener)
+        # LLM 호출이 실패해 대체 문구로 답한 경우도 오류로 기록 (이어서 실행할 때 다시 시도)
+        row["error"] = "; ".join(session.llm_errors) or None
+    except Exception as e:
+        row["answer"] = None
+        row["error"] = str(e)
+    elapsed = time.perf_counter() - started
+
+    # 단계별 시작 시각 (질문 시작 기준 초)
+    timings = {}
+    for offset, event, _ in events:
+        timings.setdefault(event, round(offset, 3))
+    timings["total"] = round(elapsed, 3)
+
+    route = next((data for _, event, data in events if event == "route"), {})
+    row.update({
+        "intent": route.get("intent"),
+        "mode": session.pipeline_mode if detailed and route.get("intent") == pipeline.INTENT_LLM else None,
+        "citations": collect_citations(events),
+        "usage": session.last_usage.to_dict() if session.last_usage else None,
+        "timings": timings,
+        "answered_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    return row
+
+
+def answer_questions(items, session_defaults, concurrency=DEFAULT_CONCURRENCY, detailed=True):
+    """
+    질문 목록을 병렬로 답변하고 완료되는 순서대로 결과 행을 반환하는 제너레이터
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(answer_item, item, session_defaults, detailed) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="준비된 질문 목록 일괄 질의응답")
+    parser.add_argument("input", help="질문 파일 (.txt, .csv, .jsonl)")
+    parser.add_argument("-o", "--output", required=True, help="결과 JSONL 파일")
+    parser.add_argument("--question-col", help="CSV 입력의 질문 열 이름 (기본값: 첫 번째 열)")
+    parser.add_argument("--id-col", help="CSV 입력의 질문 ID 열 이름 (기본값: 질문 내용 해시)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시에 답변할 질문 수")
+    parser.add_argument("--mode", choices=list(pipeline.PIPELINE_MODE_LABELS), default=pipeline.PIPELINE_MODE_MULTI_AGENT,
+                        help="답변 생성 방식")
+    parser.add_argument("--quick", action="store_true", help="자료 검색 없이 빠른 답변만 생성")
+    parser.add_argument("--completion-cache-size", type=int, default=DEFAULT_COMPLETION_CACHE_SIZE,
+                        help="LLM 응답 캐시 항목 수 (0이면 사용 안 함)")
+    parser.add_argument("--completion-cache-path",
+                        help="LLM 응답 캐시 SQLite 파일 (지정하면 중단 후 다시 실행할 때도 재사용)")
+    parser.add_argument("--restart", action="store_true", help="기존 결과 파일을 무시하고 처음부터 다시 실행")
+    args = parser.parse_args(argv)
+
+    gemini_api_key = os.environ.get("GEMINI_API_KEY", "")
+    if gemini_api_key:
+        get_backend().configure(gemini_api_key)
+    session_defaults = {
+        "gemini_api_key": gemini_api_key,
+        "serper_api_key": os.environ.get("SERPER_API_KEY", ""),
+        "pipeline_mode": args.mode,
+    }
+    completion_cache = set_completion_cache(
+        CompletionCache(args.completion_cache_size, path=args.completion_cache_path)
+    )
+
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+
+    items = read_questions(args.input, args.question_col, args.id_col)
+    answered = compact_results(args.output)
+    pending = [item for item in items if item["id"] not in answered]
+    if answered:
+        print(f"기존 결과에서 {len(items) - len(pending)}건을 건너뜁니다.", file=sys.stderr)
+
+    # 질문별 소요 시간에 자료 색인 생성 시간이 섞이지 않도록 먼저 준비
+    if pending:
+        print("자료 색인 준비 중...", file=sys.stderr)
+        pipeline.wait_until_ready()
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    with open(args.output, "a", encoding="utf-8") as f:
+        for done, row in enumerate(answer_questions(pending, session_defaults, args.concurrency, not args.quick), 1):
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            latencies.append(row["timings"]["total"])
+            errors += bool(row["error"])
+            status = "오류" if row["error"] else f"{row['timings']['total']:.1f}초"
+            print(f"[{done}/{len(pending)}] {row['id']} {row['question'][:40]}: {status}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    latency = summarize_latencies(latencies)
+    print(f"{len(pending)}건 답변 완료 (오류 {errors}건, {elapsed:.1f}초, "
+          f"p50 {latency['p50']:.1f}초, p95 {latency['p95']:.1f}초) → {args.output}", file=sys.stderr)
+    if completion_cache.enabled:
+        cache_stats = completion_cache.stats()
+        print(f"LLM 응답 캐시: 적중 {cache_stats['hits']}회, 실패 {cache_stats['misses']}회, "
+              f"동시 호출 병합 {cache_stats['coalesced']}회", file=sys.stderr)
+    usage = get_usage_ledger().snapshot()
+    print(f"토큰 사용량: 호출 {usage['calls']}회, 입력 {usage['prompt_tokens']:,}, 출력 {usage['response_tokens']:,}, "
+          f"추정 비용 ${usage['cost_usd']:.4f}", file=sys.stderr)
+    search_stats = get_search_cache().stats()
+    print(f"웹 검색 캐시: 적중 {search_stats['hits']}회, 실패 {search_stats['misses']}회", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+수입신고 라인 일괄 덤핑방지관세 계산
+
+공급자명, 품명, 과세가격이 담긴 CSV/DataFrame을 받아 모든 행의 세율과 관세액을 한 번에 계산한다.
+공급자 해석은 고유 공급자명마다 한 번만 별칭 색인으로 수행하고, 품목 해당 여부와
+관세액 계산은 pandas/NumPy 벡터 연산으로 처리한다. 웹 검색은 사용하지 않는다.
+
+사용 예:
+    python bulk_rates.py declarations.csv -o rates.csv
+    python bulk_rates.py declarations.csv --supplier-col 공급자 --product-col 품명 --value-col 과세가격
+    python bulk_rates.py declarations.csv --all-applicable --value-col ""   # 품명 확인 없이, 관세액 없이
+"""
+import argparse
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from pipeline import (
+    DUMPING_DUTY_LEGAL_BASIS,
+    PRODUCT_KEYWORDS,
+    SPEC_KEYWORDS,
+    SUPPLIER_INDEX,
+    SUPPLIERS_INFO,
+)
+
+OUTPUT_COLUMNS = ["supplier_group", "is_applicable", "rate", "duty_amount", "basis", "reason"]
+MISSING_SUPPLIER_REASON = "공급자명 없음"
+SPEC_ONLY_REASON = "품목 키워드 없이 사양 키워드만 발견 (품명 확인 필요)"
+
+
+def _keyword_pattern(keywords, inflect=False):
+    """
+    품목 키워드를 하나의 대소문자 무시 정규식으로 묶는 함수
+    (영문 키워드는 단어 경계로 제한: "PS"가 "tips"에 걸리지 않도록)
+
+    Args:
+        keywords (list): 키워드 목록
+        inflect (bool): 영문 키워드의 마지막 단어에 복수형(-s, -es)을 허용하고
+            단어 사이의 공백/하이픈 차이를 허용할지 여부 (예: "printing plate" → "CTP printing-plates")
+    """
+    parts = []
+    for keyword in keywords:
+        if not keyword.isascii():
+            parts.append(re.escape(keyword))
+            continue
+        words = [re.escape(word) for word in keyword.split()]
+        if inflect:
+            body = r"[\s-]+".join(words) + "(?:e?s)?"
+        else:
+            body = r"\s+".join(words)
+        parts.append(rf"\b{body}\b")
+    return "|".join(parts)
+
+
+# 대상 물품 여부는 품목 키워드로만 판단하고, 사양 키워드("aluminum", "offset" 등)는
+# 품목 키워드 없이 나타난 행을 확인 대상으로 표시하는 데만 사용
+PRODUCT_PATTERN = _keyword_pattern(PRODUCT_KEYWORDS, inflect=True)
+SPEC_PATTERN = _keyword_pattern(SPEC_KEYWORDS)
+
+
+def resolve_suppliers(names):
+    """
+    공급자명 Series를 세율 그룹과 사유로 해석하는 함수 (고유값마다 한 번만 색인 조회)
+
+    공급자명이 비어 있는 행은 그 밖의 공급자 세율을 매기지 않고 세율 없이 "공급자명 없음"으로 표시한다.
+
+    Returns:
+        DataFrame: supplier_group, supplier_rate, supplier_reason 열
+    """
+    names = names.fillna("").astype(str)
+    resolved = {}
+    for name in names.unique():
+        if not name.strip():
+            resolved[name] = ("", np.nan, MISSING_SUPPLIER_REASON)
+            continue
+        match = SUPPLIER_INDEX.resolve(name)
+        if match is None:
+            resolved[name] = (
+                SUPPLIERS_INFO["OTHER_SUPPLIERS_DESCRIPTION"],
+                SUPPLIERS_INFO["OTHER_SUPPLIERS_RATE"],
+                "그 밖의 공급자에 해당",
+            )
+            continue
+        supplier = SUPPLIER_INDEX.supplier(match.supplier_key)
+        resolved[name] = (supplier["name_kr"], supplier["rate"], SUPPLIER_INDEX.describe(match))
+
+    table = pd.DataFrame.from_dict(
+        resolved, orient="index", columns=["supplier_group", "supplier_rate", "supplier_reason"]
+    )
+    return table.reindex(names.to_numpy()).set_index(names.index)
+
+
+def compute_bulk_rates(df, supplier_col="supplier", product_col="product", value_col="value",
+                       all_applicable=False):
+    """
+    수입신고 라인별 덤핑방지관세율과 관세액을 계산하는 함수
+
+    Args:
+        df (DataFrame): 수입신고 라인
+        supplier_col (str): 공급자명 열
+        product_col (str): 품명/규격 열 (all_applicable이면 사용하지 않음)
+        value_col (str, optional): 과세가격 열 (None이면 관세액을 계산하지 않음)
+        all_applicable (bool): 품명을 확인하지 않고 모든 행을 대상 물품으로 간주할지 여부
+
+    Returns:
+        DataFrame: 원본 열 + supplier_group, is_applicable, rate, duty_amount, basis, reason
+
+    Raises:
+        KeyError: 지정한 열이 없는 경우 (열 이름을 잘못 지정해 모든 행이 과세되는 일이 없도록)
+    """
+    required = {"공급자": supplier_col}
+    if not all_applicable:
+        required["품명"] = product_col
+    if value_col is not None:
+        required["과세가격"] = value_col
+    for label, column in required.items():
+        if column not in df.columns:
+            raise KeyError(f"{label} 열을 찾을 수 없습니다: {column}")
+
+    result = df.copy()
+    suppliers = resolve_suppliers(result[supplier_col])
+
+    if not all_applicable:
+        products = result[product_col].fillna("").astype(str)
+        applicable = products.str.contains(PRODUCT_PATTERN, case=False, regex=True).to_numpy()
+        spec_only = ~applicable & products.str.contains(SPEC_PATTERN, case=False, regex=True).to_numpy()
+    else:
+        applicable = np.ones(len(result), dtype=bool)
+        spec_only = np.zeros(len(result), dtype=bool)
+
+    rates = suppliers["supplier_rate"].to_numpy(dtype=float)
+    result["supplier_group"] = suppliers["supplier_group"].to_numpy()
+    result["is_applicable"] = applicable
+    result["rate"] = np.where(applicable, rates, 0.0)
+
+    if value_col is not None:
+        values = pd.to_numeric(result[value_col], errors="coerce").to_numpy(dtype=float)
+        result["duty_amount"] = np.round(values * result["rate"].to_numpy() / 100, 2)
+    else:
+        result["duty_amount"] = np.nan
+
+    result["basis"] = np.where(applicable, DUMPING_DUTY_LEGAL_BASIS, "")
+    result["reason"] = np.select(
+        [applicable, spec_only],
+        [suppliers["supplier_reason"].to_numpy(), SPEC_ONLY_REASON],
+        "덤핑방지관세 부과대상 물품이 아님",
+    )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수입신고 라인 일괄 덤핑방지관세 계산")
+    parser.add_argument("input", help="입력 CSV 파일")
+    parser.add_argument("-o", "--output", help="출력 CSV 파일 (생략 시 표준 출력)")
+    parser.add_argument("--supplier-col", default="supplier", help="공급자명 열 이름")
+    parser.add_argument("--product-col", default="product", help="품명/규격 열 이름")
+    parser.add_argument("--value-col", default="value", help="과세가격 열 이름 (빈 값이면 관세액을 계산하지 않음)")
+    parser.add_argument("--all-applicable", action="store_true",
+                        help="품명을 확인하지 않고 모든 행을 대상 물품으로 간주")
+    parser.add_argument("--encoding", default="utf-8-sig", help="입력 파일 인코딩")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input, encoding=args.encoding, dtype={args.supplier_col: str})
+    try:
+        result = compute_bulk_rates(df, args.supplier_col, args.product_col, args.value_col or None,
+                                    all_applicable=args.all_applicable)
+    except KeyError as e:
+        parser.error(f"{e.args[0]} (열 목록: {', '.join(map(str, df.columns))})")
+
+    if args.output:
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        result.to_csv(args.output, index=False, encoding="utf-8-sig")
+        applicable = int(result["is_applicable"].sum())
+        review = int(result["reason"].isin([MISSING_SUPPLIER_REASON, SPEC_ONLY_REASON]).sum())
+        print(f"{len(result)}건 처리 (대상 물품 {applicable}건, 확인 필요 {review}건) → {args.output}", file=sys.stderr)
+    else:
+        result.to_csv(sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
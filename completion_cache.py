@@ -0,0 +1,184 @@
+"""
+LLM 응답 캐시 (프롬프트 해시 기반 LRU, 프로세스 전체 공유)
+
+같은 모델에 같은 프롬프트를 다시 보내면 저장된 응답 텍스트를 재사용한다.
+일괄 질의응답처럼 같은 질문/자료 조합이 반복되는 작업에서 호출 수와 비용을 줄이기 위한 것으로,
+기본값은 비활성(최대 항목 수 0)이며 COMPLETION_CACHE_MAX_ENTRIES 또는 set_completion_cache()로 켠다.
+- 키: 백엔드 이름 + 모델 이름 + 프롬프트의 SHA-256
+- OrderedDict 기반 O(1) LRU 제거
+- 같은 프롬프트의 동시 호출은 한 번만 실행하고 결과를 공유 (요청 병합)
+- 실패한 호출(None)은 저장하지 않음
+- COMPLETION_CACHE_PATH 환경 변수를 지정하면 SQLite 파일에 저장하여 중단 후 다시 실행할 때도 재사용
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from search_cache import SingleFlight
+
+DEFAULT_MAX_ENTRIES = 0  # 0이면 비활성
+
+
+class CachedResponse:
+    """
+    캐시에서 꺼낸 응답 (generate_content 결과와 같은 text 속성, 토큰 사용량은 없음)
+    """
+    usage_metadata = None
+
+    def __init__(self, text):
+        self.text = text
+
+
+def completion_key(backend_name, model, prompt):
+    """
+    백엔드/모델/프롬프트로 캐시 키를 만드는 함수
+    """
+    model_name = getattr(model, "model_name", None) or type(model).__name__
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{backend_name}:{model_name}:{digest}"
+
+
+class CompletionCache:
+    """
+    프롬프트 해시 → 응답 텍스트 LRU 캐시
+
+    Args:
+        max_entries (int): 메모리에 유지할 최대 항목 수 (0이면 비활성)
+        path (str, optional): SQLite 저장 파일 경로 (없으면 메모리 전용)
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()  # 키 → 응답 텍스트
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "disk_hits": 0}
+        self._db = None
+        self.flight = SingleFlight()
+        if path and self.enabled:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completion_cache (key TEXT PRIMARY KEY, text TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        """
+        저장된 응답 텍스트를 반환하는 함수 (없으면 None)
+        """
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return text
+
+            if self._db is not None:
+                row = self._db.execute("SELECT text FROM completion_cache WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._put(key, row[0])
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, text):
+        with self._lock:
+            self._put(key, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO completion_cache (key, text) VALUES (?, ?)", (key, text)
+                )
+                self._db.commit()
+
+    def _put(self, key, text):
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_or_generate(self, key, generate):
+        """
+        저장된 응답을 반환하고, 없으면 generate()로 생성하여 저장하는 함수
+        같은 키를 동시에 요청한 호출자들은 하나의 생성 결과를 함께 사용한다.
+
+        Returns:
+            generate()의 결과 또는 CachedResponse (generate()가 None이면 None)
+        """
+        text = self.get(key)
+        if text is not None:
+            return CachedResponse(text)
+
+        def generate_once():
+            # 앞선 호출이 방금 끝나 저장된 경우 다시 생성하지 않음
+            with self._lock:
+                text = self._entries.get(key)
+            if text is not None:
+                return CachedResponse(text)
+            result = generate()
+            if result is not None:
+                self.set(key, result.text)
+            return result
+
+        return self.flight.do(key, generate_once)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM completion_cache")
+                self._db.commit()
+
+    def stats(self):
+        """
+        캐시 적중/실패 통계를 반환하는 함수
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["coalesced"] = self.flight.coalesced
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache():
+    """
+    프로세스 전체에서 공유하는 LLM 응답 캐시를 반환하는 함수
+
+    환경 변수:
+        COMPLETION_CACHE_MAX_ENTRIES: 메모리 최대 항목 수 (기본값 0: 비활성)
+        COMPLETION_CACHE_PATH: SQLite 저장 파일 경로 (지정하지 않으면 메모리 전용)
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CompletionCache(
+                    max_entries=int(os.environ.get("COMPLETION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                    path=os.environ.get("COMPLETION_CACHE_PATH") or None,
+                )
+    return _cache
+
+
+def set_completion_cache(cache):
+    """
+    LLM 응답 캐시를 교체하는 함수 (일괄 질의응답 등에서 사용)
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
+    return cache
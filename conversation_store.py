@@ -0,0 +1,204 @@
+"""
+대화 기록 저장소 (SQLite 추가 전용 로그)
+
+화면의 대화를 세션이 끝나도 남도록 SQLite에 저장하고, 최근 메시지부터 페이지 단위로 읽는다.
+- 메시지는 추가만 하고 수정/삭제하지 않음 (대화별 메시지 ID 순서가 곧 대화 순서)
+- 화면은 최근 한 페이지만 읽어 표시하고, 이전 메시지는 "이전 대화 더 보기"로 한 페이지씩 추가로 읽음
+  (대화가 길어져도 Streamlit 재실행마다 전체 기록을 다시 그리지 않음)
+- 대화 목록(제목, 최근 수정 시각, 메시지 수)으로 지난 대화를 다시 열 수 있음
+- 대화마다 소유자(브라우저별 사용자 ID)를 기록하여 목록과 조회를 소유자의 대화로 제한
+- CONVERSATION_STORE_PATH 환경 변수로 저장 파일 지정 (빈 값이면 메모리 전용)
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_STORE_PATH = "conversations.sqlite3"
+DEFAULT_PAGE_SIZE = 20       # 한 번에 읽어 표시할 메시지 수
+TITLE_MAX_LENGTH = 40        # 대화 제목 (첫 질문) 최대 길이
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL REFERENCES conversations(id),
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages(conversation_id, id);
+"""
+# 소유자 열이 없던 기존 저장 파일에도 적용되도록 열 추가 뒤에 만듦
+_OWNER_INDEX = "CREATE INDEX IF NOT EXISTS conversations_owner_updated ON conversations(owner, updated_at)"
+
+
+def conversation_title(text):
+    """
+    첫 질문으로 대화 제목을 만드는 함수 (한 줄로 줄이고 길이 제한)
+    """
+    title = " ".join(text.split())
+    return title if len(title) <= TITLE_MAX_LENGTH else title[:TITLE_MAX_LENGTH - 1] + "…"
+
+
+class ConversationStore:
+    """
+    대화 기록 저장소
+
+    Args:
+        path (str, optional): SQLite 저장 파일 경로 (없으면 메모리 전용)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(conversations)")}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE conversations ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        self._db.execute("DROP INDEX IF EXISTS conversations_updated")
+        self._db.execute(_OWNER_INDEX)
+        self._db.commit()
+
+    def create_conversation(self, owner, title=""):
+        """
+        새 대화를 만드는 함수
+
+        Args:
+            owner (str): 대화 소유자 (사용자 ID)
+            title (str): 대화 제목 (첫 질문)
+
+        Returns:
+            str: 대화 ID
+        """
+        conversation_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO conversations (id, owner, title, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (conversation_id, owner, conversation_title(title), now, now),
+            )
+            self._db.commit()
+        return conversation_id
+
+    def append_messages(self, conversation_id, messages):
+        """
+        대화에 메시지들을 한 번에 추가하는 함수 (질문과 답변을 함께 기록하여 한쪽만 남지 않도록)
+
+        Args:
+            conversation_id (str): 대화 ID
+            messages (list): {"role": ..., "content": ...} 목록
+
+        Returns:
+            list: 메시지 ID가 추가된 메시지 목록
+        """
+        now = time.time()
+        saved = []
+        with self._lock:
+            for message in messages:
+                cursor = self._db.execute(
+                    "INSERT INTO messages (conversation_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                    (conversation_id, message["role"], message["content"], now),
+                )
+                saved.append({"id": cursor.lastrowid, "role": message["role"], "content": message["content"]})
+            self._db.execute(
+                "UPDATE conversations SET updated_at = ?, message_count = message_count + ? WHERE id = ?",
+                (now, len(saved), conversation_id),
+            )
+            self._db.commit()
+        return saved
+
+    def recent_messages(self, conversation_id, limit=DEFAULT_PAGE_SIZE, before_id=None):
+        """
+        대화의 최근 메시지를 한 페이지 읽는 함수
+
+        Args:
+            conversation_id (str): 대화 ID
+            limit (int): 읽을 메시지 수
+            before_id (int, optional): 이 메시지 ID보다 이전 메시지만 읽음 (이전 페이지)
+
+        Returns:
+            list: {"id", "role", "content"} 목록 (오래된 순)
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, role, content FROM messages WHERE conversation_id = ? AND id < ? "
+                "ORDER BY id DESC LIMIT ?",
+                (conversation_id, before_id if before_id is not None else 2 ** 63 - 1, limit),
+            ).fetchall()
+        return [{"id": row[0], "role": row[1], "content": row[2]} for row in reversed(rows)]
+
+    def has_messages_before(self, conversation_id, message_id):
+        """
+        대화에 해당 메시지보다 이전 메시지가 남아 있는지 확인하는 함수
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM messages WHERE conversation_id = ? AND id < ? LIMIT 1",
+                (conversation_id, message_id),
+            ).fetchone()
+        return row is not None
+
+    def list_conversations(self, owner, limit=20):
+        """
+        소유자의 최근에 수정된 대화 목록을 반환하는 함수
+
+        Args:
+            owner (str): 대화 소유자 (사용자 ID)
+            limit (int): 최대 대화 수
+
+        Returns:
+            list: {"id", "title", "created_at", "updated_at", "message_count"} 목록 (최근 순)
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, title, created_at, updated_at, message_count FROM conversations "
+                "WHERE owner = ? AND message_count > 0 ORDER BY updated_at DESC LIMIT ?",
+                (owner, limit),
+            ).fetchall()
+        return [
+            {"id": row[0], "title": row[1], "created_at": row[2], "updated_at": row[3], "message_count": row[4]}
+            for row in rows
+        ]
+
+    def get_conversation(self, conversation_id, owner):
+        """
+        소유자의 대화 정보를 반환하는 함수 (없거나 다른 사용자의 대화이면 None)
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, title, created_at, updated_at, message_count FROM conversations "
+                "WHERE id = ? AND owner = ?",
+                (conversation_id, owner),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "title": row[1], "created_at": row[2], "updated_at": row[3], "message_count": row[4]}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store():
+    """
+    프로세스 전체에서 공유하는 대화 기록 저장소를 반환하는 함수
+
+    환경 변수:
+        CONVERSATION_STORE_PATH: SQLite 저장 파일 경로 (기본값: conversations.sqlite3, 빈 값이면 메모리 전용)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConversationStore(os.environ.get("CONVERSATION_STORE_PATH", DEFAULT_STORE_PATH) or None)
+    return _store
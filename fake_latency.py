@@ -0,0 +1,44 @@
+"""
+가짜 백엔드용 지연 시간 분포
+
+FakeBackend(llm_backend.py)와 FakeSerperServer(fake_serper.py)가 같은 분포 정의로 지연 시간을 뽑는다.
+"""
+import math
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+
+def check_distribution(distribution):
+    """
+    지원하는 지연 시간 분포인지 확인하는 함수
+
+    Raises:
+        ValueError: 지원하지 않는 분포인 경우
+    """
+    if distribution not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"지원하지 않는 지연 시간 분포입니다: {distribution}")
+
+
+def sample_latency(rng, distribution, mean, sigma):
+    """
+    지정한 분포에서 지연 시간(초)을 하나 뽑는 함수
+
+    Args:
+        rng (random.Random): 난수 생성기 (스레드 간 공유 시 호출자가 잠금)
+        distribution (str): 지연 시간 분포 ("fixed", "uniform", "lognormal", "exponential")
+        mean (float): 평균 지연 시간 (초)
+        sigma (float): 분포 폭 (uniform은 ±폭, lognormal은 로그 표준편차)
+
+    Returns:
+        float: 0 이상의 지연 시간 (초)
+    """
+    if distribution == "uniform":
+        value = rng.uniform(mean - sigma, mean + sigma)
+    elif distribution == "lognormal":
+        # 평균이 mean이 되도록 위치 모수 보정
+        value = rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) if mean > 0 else 0.0
+    elif distribution == "exponential":
+        value = rng.expovariate(1 / mean) if mean > 0 else 0.0
+    else:
+        value = mean
+    return max(0.0, value)
@@ -0,0 +1,201 @@
+"""
+로컬 가짜 Serper 검색 서버
+
+Serper API와 같은 형식(POST /search, {"q": ..., "num": ...} → {"organic": [...]})으로 응답하는 aiohttp 서버.
+기록된 organic 결과(RecordingProvider가 만든 JSONL)를 재생하고, 기록에 없는 검색어는
+검색어별로 결정적인 가상 결과를 만든다. 지연 시간 분포와 오류(HTTP 429/500) 주입을 설정할 수 있다.
+
+사용 예:
+    python fake_serper.py --port 8765 --latency lognormal --latency-mean 0.3 --error-rate 0.05
+    SEARCH_PROVIDER_URL=http://127.0.0.1:8765/search streamlit run main2.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+
+from aiohttp import web
+
+from fake_latency import LATENCY_DISTRIBUTIONS, check_distribution, sample_latency
+
+# 가상 결과 요약문에 섞을 문구 (analyze_web_info의 분류 키워드 포함)
+SYNTHETIC_SNIPPETS = [
+    "公司简介 企业简介 대표이사 김철수 설립일 2005년 3월 15일",
+    "地址 所在地 江苏省 泰兴市 经济开发区 본사 주소",
+    "股东 持股 51% 주주 현황 지분 구조",
+    "子公司 关联公司 계열사 목록 subsidiary",
+    "母公司 控股公司 parent company 지주회사",
+    "经营范围 主营产品 印刷版材 PS plate products",
+    "进出口 贸易 export 수출 실적",
+    "营收 利润 revenue 매출 영업이익",
+    "认证 专利 ISO certification 특허",
+    "新闻 公告 news announcement 공시",
+]
+_SITE_PATTERN = re.compile(r"site:(\S+)")
+
+
+def load_recordings(path):
+    """
+    RecordingProvider가 기록한 JSONL 파일을 {검색어: organic 목록}으로 읽는 함수 (같은 검색어는 마지막 기록 사용)
+    """
+    recordings = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                recordings[record["query"]] = record["organic"]
+    return recordings
+
+
+def synthetic_results(query, num):
+    """
+    검색어별로 결정적인 가상 organic 결과를 만드는 함수
+    """
+    site_match = _SITE_PATTERN.search(query)
+    site = site_match.group(1) if site_match else "example.com"
+    name = _SITE_PATTERN.sub("", query).strip()
+    digest = hashlib.sha256(query.encode("utf-8")).digest()
+    results = []
+    for index in range(num):
+        snippet = SYNTHETIC_SNIPPETS[(digest[index] + index) % len(SYNTHETIC_SNIPPETS)]
+        results.append({
+            "title": f"{name} - {site} ({index + 1})",
+            "link": f"https://{site}/firm/{digest.hex()[:8]}/{index}",
+            "snippet": f"{name} {snippet}",
+            "position": index + 1,
+        })
+    return results
+
+
+class FakeSerperServer:
+    """
+    가짜 Serper 서버
+
+    Args:
+        recordings (dict, optional): {검색어: organic 목록}
+        latency (str): 지연 시간 분포 ("fixed", "uniform", "lognormal", "exponential")
+        latency_mean (float): 평균 지연 시간 (초)
+        latency_sigma (float): 분포 폭 (uniform은 ±폭, lognormal은 로그 표준편차)
+        error_rate (float): 요청당 오류 응답 확률 (0~1)
+        seed (int): 난수 시드
+    """
+
+    def __init__(self, recordings=None, latency="fixed", latency_mean=0.0, latency_sigma=0.0,
+                 error_rate=0.0, seed=0):
+        check_distribution(latency)
+        self.recordings = recordings or {}
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.stats = {"requests": 0, "replayed": 0, "synthetic": 0, "errors": 0}
+        self._runner = None
+        self._loop = None
+        self._thread = None
+        self.url = None
+
+    def sample_latency(self):
+        return sample_latency(self._rng, self.latency, self.latency_mean, self.latency_sigma)
+
+    async def handle_search(self, request):
+        payload = await request.json()
+        query = payload.get("q", "")
+        num = int(payload.get("num", 10))
+        self.stats["requests"] += 1
+        await asyncio.sleep(self.sample_latency())
+
+        if self._rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            status = self._rng.choice([429, 500])
+            return web.json_response({"message": "Fake Serper injected error", "statusCode": status}, status=status)
+
+        if query in self.recordings:
+            self.stats["replayed"] += 1
+            organic = self.recordings[query][:num]
+        else:
+            self.stats["synthetic"] += 1
+            organic = synthetic_results(query, num)
+        return web.json_response({"searchParameters": {"q": query, "num": num}, "organic": organic})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post("/search", self.handle_search)
+        return app
+
+    def start(self, host="127.0.0.1", port=0):
+        """
+        별도 스레드의 이벤트 루프에서 서버를 시작하고 검색 엔드포인트 URL을 반환하는 함수
+        (port=0이면 빈 포트 자동 선택)
+        """
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        async def _start():
+            self._runner = web.AppRunner(self.make_app())
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, host, port)
+            await site.start()
+            bound_port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://{host}:{bound_port}/search"
+
+        def _run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(_start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="fake-serper", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        return self.url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop = None
+
+
+def add_server_arguments(parser):
+    """
+    가짜 서버 설정 인자를 추가하는 함수 (search_bench.py와 공유)
+    """
+    parser.add_argument("--recordings", help="기록된 검색 결과 JSONL (SEARCH_RECORD_PATH로 기록)")
+    parser.add_argument("--latency", default="lognormal", choices=LATENCY_DISTRIBUTIONS, help="지연 시간 분포")
+    parser.add_argument("--latency-mean", type=float, default=0.2, help="평균 지연 시간 (초)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="분포 폭")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 확률 (0~1)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+
+
+def server_from_args(args):
+    return FakeSerperServer(
+        recordings=load_recordings(args.recordings) if args.recordings else None,
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 가짜 Serper 검색 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = server_from_args(args)
+    print(f"가짜 Serper 서버: http://{args.host}:{args.port}/search (기록 {len(server.recordings)}건)")
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
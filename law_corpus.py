@@ -0,0 +1,114 @@
+"""
+법령 자료 코퍼스와 검색 색인 (프로세스 전체 공유)
+
+자료 PDF의 텍스트 추출과 청크별 TF-IDF 색인 생성을 프로세스당 한 번만 수행하고,
+모든 세션과 에이전트가 같은 객체를 복사 없이 읽는다 (st.cache_resource와 같은 방식).
+- 생성 후에는 변경하지 않는 읽기 전용 객체 (텍스트는 MappingProxyType, 청크는 tuple)
+- 처음 요청한 스레드가 만드는 동안 다른 스레드는 기다렸다가 같은 객체를 사용
+"""
+import os
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+
+from pdf_utils import extract_text_from_pdf # PDF 문서에서 텍스트 추출 기능
+
+DEFAULT_CHUNK_SIZE = 1000
+MIN_CHUNK_LENGTH = 100
+
+# 문서 하나의 검색 색인 (vec, mat, chunks = index 형태로 풀어서 사용 가능)
+LawIndex = namedtuple("LawIndex", ["vectorizer", "matrix", "chunks"])
+
+
+def build_law_index(text, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    텍스트를 절반씩 겹치는 청크로 나누고 TF-IDF 색인을 만드는 함수
+    """
+    chunks = []
+    step = chunk_size // 2
+    for i in range(0, len(text), step):
+        segment = text[i:i+chunk_size]
+        if len(segment) > MIN_CHUNK_LENGTH:
+            chunks.append(segment)
+    # scikit-learn은 불러오는 데 1초 가까이 걸리므로 색인을 만들 때(백그라운드 준비 작업) 불러옴
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    vectorizer = TfidfVectorizer()
+    matrix = vectorizer.fit_transform(chunks)
+    return LawIndex(vectorizer, matrix, tuple(chunks))
+
+
+class LawCorpus:
+    """
+    읽기 전용 법령 코퍼스
+
+    Args:
+        texts (dict): 법령명 → 추출 텍스트
+        indexes (dict): 법령명 → LawIndex
+        missing_files (list): 찾을 수 없었던 PDF 경로
+    """
+
+    def __init__(self, texts, indexes, missing_files=()):
+        self.texts = MappingProxyType(dict(texts))
+        self._indexes = MappingProxyType(dict(indexes))
+        self.missing_files = tuple(missing_files)
+
+    @classmethod
+    def build(cls, pdf_files, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        PDF 파일들에서 코퍼스를 만드는 함수
+
+        Args:
+            pdf_files (dict): 법령명 → PDF 경로
+            chunk_size (int): 청크 길이 (문자 수)
+        """
+        texts = {}
+        indexes = {}
+        missing_files = []
+        for law_name, pdf_path in pdf_files.items():
+            if os.path.exists(pdf_path):
+                text = extract_text_from_pdf(pdf_path)
+                texts[law_name] = text
+                indexes[law_name] = build_law_index(text, chunk_size)
+            else:
+                missing_files.append(pdf_path)
+        return cls(texts, indexes, missing_files)
+
+    def index(self, law_name):
+        """
+        법령의 검색 색인을 반환하는 함수 (자료가 없으면 KeyError)
+        """
+        try:
+            return self._indexes[law_name]
+        except KeyError:
+            raise KeyError(f"자료를 찾을 수 없습니다: {law_name}") from None
+
+    def __contains__(self, law_name):
+        return law_name in self._indexes
+
+    def stats(self):
+        return {
+            "documents": len(self.texts),
+            "chunks": sum(len(index.chunks) for index in self._indexes.values()),
+            "characters": sum(len(text) for text in self.texts.values()),
+            "missing_files": len(self.missing_files),
+        }
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_law_corpus(pdf_files):
+    """
+    프로세스 전체에서 공유하는 법령 코퍼스를 반환하는 함수 (처음 호출 시 생성)
+
+    Args:
+        pdf_files (dict): 법령명 → PDF 경로 (처음 생성할 때만 사용)
+    """
+    global _corpus
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                _corpus = LawCorpus.build(pdf_files)
+    return _corpus
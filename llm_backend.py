@@ -0,0 +1,230 @@
+"""
+LLM 백엔드 인터페이스
+
+파이프라인은 get_backend().get_model()로 모델을 얻고 model.generate_content(prompt)만 사용한다.
+- GeminiBackend: 실제 Google Gemini API
+- FakeBackend: API 키 없이 테스트/부하 테스트를 위한 로컬 가짜 백엔드
+  (지연 시간 분포, ResourceExhausted 주입, 프롬프트별 결정적 출력)
+
+환경 변수 LLM_BACKEND=fake 로 가짜 백엔드를 기본값으로 사용할 수 있다.
+"""
+import abc
+import hashlib
+import os
+import random
+import threading
+import time
+
+from google.api_core import exceptions as google_exceptions  # Google API 예외 처리
+
+import fake_latency
+
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+
+
+class LLMBackend(abc.ABC):
+    """
+    LLM 백엔드 기본 인터페이스 (하위 클래스는 get_model을 구현해야 함)
+    """
+    name = "base"
+
+    def configure(self, api_key):
+        """API 키 등 백엔드 설정"""
+
+    @abc.abstractmethod
+    def get_model(self):
+        """generate_content(prompt)를 제공하는 모델 객체 반환"""
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini API 백엔드
+    """
+    name = "gemini"
+
+    def __init__(self, model_name=GEMINI_MODEL_NAME):
+        self.model_name = model_name
+
+    @property
+    def genai(self):
+        # google.generativeai는 불러오는 데 오래 걸리므로 Gemini를 처음 사용할 때 불러옴
+        import google.generativeai as genai  # Google Gemini AI API를 통한 텍스트 생성 기능
+        return genai
+
+    def configure(self, api_key):
+        self.genai.configure(api_key=api_key)
+
+    def get_model(self):
+        return self.genai.GenerativeModel(self.model_name)
+
+
+class FakeUsageMetadata:
+    """
+    Gemini 응답의 usage_metadata와 같은 필드를 가진 토큰 사용량 정보
+    """
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    """
+    Gemini 응답과 같은 인터페이스(text, usage_metadata)를 가진 가짜 응답
+    """
+    def __init__(self, text, usage_metadata):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeModel:
+    """
+    FakeBackend에 생성을 위임하는 가짜 모델
+    """
+    def __init__(self, backend):
+        self._backend = backend
+
+    def generate_content(self, prompt):
+        return self._backend.generate(prompt)
+
+
+class FakeBackend(LLMBackend):
+    """
+    로컬 가짜 LLM 백엔드
+
+    Args:
+        latency (str): 지연 시간 분포 ("fixed", "uniform", "lognormal", "exponential")
+        latency_mean (float): 평균 지연 시간 (초)
+        latency_sigma (float): 분포 폭 (uniform은 ±폭, lognormal은 로그 표준편차)
+        error_rate (float): 호출당 ResourceExhausted 발생 확률 (0~1)
+        seed (int): 지연 시간/오류 주입용 난수 시드
+        chars_per_token (float): 토큰 수 추정용 문자 수
+    """
+    name = "fake"
+    LATENCY_DISTRIBUTIONS = fake_latency.LATENCY_DISTRIBUTIONS
+
+    def __init__(self, latency="fixed", latency_mean=0.0, latency_sigma=0.0,
+                 error_rate=0.0, seed=0, chars_per_token=1.5):
+        fake_latency.check_distribution(latency)
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.chars_per_token = chars_per_token
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.call_count = 0
+        self.injected_errors = 0
+
+    def get_model(self):
+        return FakeModel(self)
+
+    def sample_latency(self):
+        """
+        설정된 분포에서 지연 시간(초)을 하나 뽑는 함수
+        """
+        with self._lock:
+            return fake_latency.sample_latency(self._rng, self.latency, self.latency_mean, self.latency_sigma)
+
+    def _should_fail(self):
+        with self._lock:
+            self.call_count += 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.injected_errors += 1
+            return fail
+
+    def generate(self, prompt):
+        """
+        프롬프트에 대해 결정적인 가짜 응답을 생성하는 함수
+        """
+        time.sleep(self.sample_latency())
+        if self._should_fail():
+            raise google_exceptions.ResourceExhausted("Fake backend injected quota error")
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        question = ""
+        for line in prompt.splitlines():
+            if line.startswith("질문:"):
+                question = line[len("질문:"):].strip()
+        text = (
+            f"[가짜 응답 {digest}]\n"
+            f"질문 '{question}'에 대한 테스트용 답변입니다.\n"
+            f"- 프롬프트 길이: {len(prompt)}자\n"
+        )
+        usage = FakeUsageMetadata(
+            prompt_token_count=int(len(prompt) / self.chars_per_token) + 1,
+            candidates_token_count=int(len(text) / self.chars_per_token) + 1,
+        )
+        return FakeResponse(text, usage)
+
+
+class RetryStats:
+    """
+    generate_content_with_retry의 호출/재시도 통계 (프로세스 전체, 스레드 안전)
+    """
+    FIELDS = ("calls", "successes", "retries", "exhausted", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field, amount=1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+retry_stats = RetryStats()
+
+
+def backend_from_env():
+    """
+    환경 변수로 백엔드를 생성하는 함수
+
+    LLM_BACKEND: "gemini"(기본) 또는 "fake"
+    FAKE_LLM_LATENCY, FAKE_LLM_LATENCY_MEAN, FAKE_LLM_LATENCY_SIGMA,
+    FAKE_LLM_ERROR_RATE, FAKE_LLM_SEED: FakeBackend 설정
+    """
+    if os.environ.get("LLM_BACKEND", "gemini").lower() == "fake":
+        return FakeBackend(
+            latency=os.environ.get("FAKE_LLM_LATENCY", "fixed"),
+            latency_mean=float(os.environ.get("FAKE_LLM_LATENCY_MEAN", "0")),
+            latency_sigma=float(os.environ.get("FAKE_LLM_LATENCY_SIGMA", "0")),
+            error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", "0")),
+            seed=int(os.environ.get("FAKE_LLM_SEED", "0")),
+        )
+    return GeminiBackend()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    현재 프로세스에서 사용하는 LLM 백엔드를 반환하는 함수
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_env()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    LLM 백엔드를 교체하는 함수 (부하 테스트 등에서 사용)
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    return backend
@@ -0,0 +1,186 @@
+"""
+가짜 LLM 백엔드를 사용한 질의응답 파이프라인 부하 테스트
+
+N명의 가상 사용자가 동시에 질문 목록을 process_user_input에 순서대로 보내고
+처리량, 지연 시간 분위수, 재시도 현황을 보고한다. Gemini API 키가 필요 없다.
+
+사용 예:
+    python load_test.py --users 20 --latency lognormal --latency-mean 0.8 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline
+from llm_backend import FakeBackend, retry_stats, set_backend
+from scheduler import get_llm_scheduler, get_question_scheduler
+
+DEFAULT_QUESTIONS = [
+    "화펑의 덤핑방지관세율은 얼마인가요?",
+    "코닥 관계사에는 어떤 회사들이 있나요?",
+    "덤핑방지관세 부과기간은 언제까지인가요?",
+    "최종판정에서 산업피해는 어떻게 판단되었나요?",
+    "관세법상 덤핑방지관세 부과 요건을 설명해주세요.",
+]
+
+
+def percentile(values, pct):
+    """
+    정렬된 값 목록에서 nearest-rank 방식으로 분위수를 계산하는 함수
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(latencies):
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+    }
+
+
+def run_user(user_id, questions, mode, think_time, records, records_lock):
+    """
+    가상 사용자 한 명의 대화를 순서대로 실행하는 함수 (워커 스레드에서 실행)
+    """
+    session = pipeline.use_session(pipeline.new_session(gemini_api_key="fake", pipeline_mode=mode))
+    for index, question in enumerate(questions):
+        session.chat_history.append({"role": "user", "content": question})
+        history = "\n".join(f"{m['role']}: {m['content']}" for m in session.chat_history)
+        started = time.perf_counter()
+        error = None
+        try:
+            answer = asyncio.run(pipeline.process_user_input(question, history))
+        except Exception as e:
+            answer, error = None, str(e)
+        elapsed = time.perf_counter() - started
+        if answer:
+            session.chat_history.append({"role": "assistant", "content": answer})
+        if answer and answer.startswith(pipeline.LOAD_SHED_NOTICE):
+            path = "shed"  # 대기열이 길어 빠른 답변으로 대신한 질문
+        else:
+            path = "followup" if session.is_followup_question else "initial"
+        with records_lock:
+            records.append({
+                "user": user_id,
+                "index": index,
+                "path": path,
+                "latency": elapsed,
+                "ok": bool(answer) and error is None,
+                "error": error,
+            })
+        if think_time:
+            time.sleep(think_time)
+
+
+def run_load_test(users, questions, mode=pipeline.PIPELINE_MODE_MULTI_AGENT, think_time=0.0):
+    """
+    가상 사용자들을 동시에 실행하고 결과 보고서를 반환하는 함수
+    """
+    # 법령 코퍼스와 색인은 프로세스에서 한 번만 만들어 모든 가상 사용자가 공유
+    pipeline.load_law_data()
+
+    records = []
+    records_lock = threading.Lock()
+    retry_stats.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        futures = [
+            executor.submit(run_user, user_id, questions, mode, think_time, records, records_lock)
+            for user_id in range(users)
+        ]
+        for future in futures:
+            future.result()
+    duration = time.perf_counter() - started
+
+    ok = [r for r in records if r["ok"]]
+    report = {
+        "users": users,
+        "requests": len(records),
+        "failed": len(records) - len(ok),
+        "duration": duration,
+        "throughput": len(records) / duration if duration else 0.0,
+        "latency": summarize_latencies([r["latency"] for r in records]),
+        "latency_by_path": {
+            path: summarize_latencies([r["latency"] for r in records if r["path"] == path])
+            for path in sorted({r["path"] for r in records})
+        },
+        "retries": retry_stats.snapshot(),
+        "scheduler": {"questions": get_question_scheduler().stats(), "llm": get_llm_scheduler().stats()},
+    }
+    return report
+
+
+def print_report(report):
+    print(f"가상 사용자: {report['users']}명, 요청: {report['requests']}건, 실패: {report['failed']}건")
+    print(f"총 소요 시간: {report['duration']:.2f}초, 처리량: {report['throughput']:.2f} 질문/초")
+    sections = [("전체", report["latency"])] + list(report["latency_by_path"].items())
+    for name, stats in sections:
+        print(
+            f"[{name}] n={stats['count']} mean={stats['mean']:.3f}s p50={stats['p50']:.3f}s "
+            f"p90={stats['p90']:.3f}s p95={stats['p95']:.3f}s p99={stats['p99']:.3f}s max={stats['max']:.3f}s"
+        )
+    retries = report["retries"]
+    print(
+        f"LLM 호출: {retries['calls']}회, 성공: {retries['successes']}회, 재시도: {retries['retries']}회, "
+        f"한도 초과 실패: {retries['exhausted']}회, 기타 오류: {retries['errors']}회"
+    )
+    for name, stats in (("상세 답변", report["scheduler"]["questions"]), ("LLM 호출", report["scheduler"]["llm"])):
+        print(
+            f"대기열({name}, 동시 {stats['capacity']}): 대기 {stats['queued']}회, "
+            f"평균 대기 {stats['mean_wait']:.3f}s, 최대 대기 {stats['max_wait']:.3f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 LLM 백엔드를 사용한 파이프라인 부하 테스트")
+    parser.add_argument("--users", type=int, default=10, help="동시 가상 사용자 수")
+    parser.add_argument("--questions", help="질문 목록 파일 (한 줄에 한 질문)")
+    parser.add_argument("--rounds", type=int, default=1, help="사용자별 질문 목록 반복 횟수")
+    parser.add_argument("--mode", choices=list(pipeline.PIPELINE_MODE_LABELS), default=pipeline.PIPELINE_MODE_MULTI_AGENT)
+    parser.add_argument("--latency", choices=FakeBackend.LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=0.5, help="LLM 호출 평균 지연 시간 (초)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="ResourceExhausted 주입 확률")
+    parser.add_argument("--retry-delay", type=float, default=0.1, help="ResourceExhausted 재시도 대기 시간 (초)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="질문 사이 대기 시간 (초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="보고서를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        questions = DEFAULT_QUESTIONS
+    questions = questions * args.rounds
+
+    set_backend(FakeBackend(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ))
+    pipeline.RETRY_DELAY = args.retry_delay
+
+    report = run_load_test(args.users, questions, mode=args.mode, think_time=args.think_time)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
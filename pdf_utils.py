@@ -1,10 +1,10 @@
-import PyPDF2
 import os
 
 def extract_text_from_pdf(pdf_path):
     """
     PDF 파일에서 텍스트를 추출하는 함수
     """
+    import PyPDF2  # PDF를 처음 읽을 때 불러옴
     text = ""
     try:
         with open(pdf_path, 'rb') as file:
@@ -0,0 +1,2335 @@
+"""
+덤핑 전문가 챗봇의 질의응답 파이프라인
+
+main2.py(Streamlit UI)와 부하 테스트 등 UI 밖의 실행 환경이 함께 사용하는 모듈.
+세션 상태는 st.session_state에 직접 접근하지 않고 use_session()으로 지정된 객체를 사용한다.
+"""
+import streamlit as st                     # 캐싱 및 오류 표시를 위한 Streamlit
+import os                                   # 운영체제 관련 기능 사용
+from pdf_utils import extract_text_from_pdf # PDF 문서에서 텍스트 추출 기능
+import asyncio                              # 비동기 처리를 위한 asyncio 라이브러리
+import contextvars                          # 실행 흐름별 세션 상태 지정
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from law_corpus import get_law_corpus                        # 프로세스 전체 공유 법령 코퍼스/색인
+from warmup import get_warmup                                # 서버 시작 시 백그라운드 준비 작업
+from datetime import datetime
+import time                                # API 호출 제한을 위한 시간 처리
+import re                                  # 정규 표현식을 위한 re 모듈
+import uuid                                # 세션 ID 생성
+import hashlib                             # 질문 ID 생성
+from google.api_core import exceptions as google_exceptions  # Google API 예외 처리
+from llm_backend import get_backend, retry_stats  # LLM 백엔드 (Gemini / 로컬 가짜 백엔드)
+from supplier_index import NameNgramIndex, SupplierAliasIndex  # 공급자 별칭 색인 / 이름 n-gram 색인
+from aho_corasick import AhoCorasick               # 다중 키워드 검색 오토마톤
+from search_cache import get_search_cache, normalize_query  # 프로세스 전체 공유 웹 검색 캐시
+from completion_cache import CachedResponse, completion_key, get_completion_cache  # 프롬프트 해시 기반 LLM 응답 캐시
+from async_runtime import get_async_runtime        # 공유 이벤트 루프 + HTTP 연결 풀
+from search_provider import get_search_provider    # 웹 검색 제공자 (Serper / 로컬 가짜 서버)
+from relationship_graph import format_relationship_path, get_relationship_graph  # 기업 관계 그래프
+from tracing import current_span, export_trace, span, start_trace, traced  # 질문별 단계 소요 시간 추적
+from token_usage import UsageBreakdown, get_usage_ledger, record_usage, usage_scope  # 토큰 사용량/비용 집계
+from scheduler import get_llm_scheduler, get_question_scheduler, shed_queue_depth  # 사용자별 공정 대기열
+from conversation_store import DEFAULT_PAGE_SIZE, get_conversation_store  # 대화 기록 저장소 (SQLite)
+from profiling import DEFAULT_PROFILE_DIR, profile_run  # 질문별 CPU 프로파일링 (cProfile)
+
+# --- 답변 생성 시간 설정 ---
+INITIAL_RESPONSE_TIMEOUT = 10  # 초기 답변 제한 시간 (초)
+FOLLOWUP_RESPONSE_TIMEOUT = 60  # 후속 답변 제한 시간 (초)
+
+# --- 세션 상태 ---
+_current_session = contextvars.ContextVar("current_session", default=None)
+
+class HeadlessSessionState(dict):
+    """
+    Streamlit 실행 환경 밖(부하 테스트, CLI 등)에서 st.session_state를 대신하는 세션 상태
+    속성 접근(state.key)과 딕셔너리 접근(state["key"])을 모두 지원
+    """
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+def init_session_state(state):
+    """
+    세션 상태의 기본값을 채우는 함수 (이미 있는 값은 유지)
+    """
+    defaults = {
+        "gemini_api_key": "",
+        "serper_api_key": "",
+        "chat_history": [],              # 화면에 읽어 둔 최근 대화 메시지
+        "conversation_id": None,         # 저장소의 대화 ID (첫 답변을 저장할 때 생성)
+        "owner": None,                   # 대화 기록 소유자 (화면: 브라우저별 사용자 ID, 없으면 세션 ID)
+        "history_limit": DEFAULT_PAGE_SIZE,  # 화면에 유지할 메시지 수 ("이전 대화 더 보기"로 증가)
+        "is_followup_question": False,
+        "last_question_time": None,
+        "pipeline_mode": "multi_agent",  # 답변 생성 방식 (문서별 에이전트 / 컨텍스트 패킹)
+        "tracing": False,                # 질문별 단계 소요 시간 기록 여부
+        "last_trace": None,              # 마지막 질문의 트레이스
+        "profiling": False,              # 질문별 CPU 프로파일링 여부
+        "last_profile": None,            # 마지막 질문의 CPU 프로파일
+        "session_id": uuid.uuid4().hex,  # 사용량 집계용 세션 ID
+        "usage": UsageBreakdown(),       # 세션 전체 토큰 사용량
+        "last_usage": None,              # 마지막 질문의 토큰 사용량
+        "llm_errors": [],                # 마지막 질문에서 실패한 LLM 호출 (대체 문구로 답변한 경우 포함)
+    }
+    for key, value in defaults.items():
+        if key not in state:
+            state[key] = value
+    return state
+
+def new_session(**values):
+    """
+    UI 밖에서 사용할 새 세션 상태를 만드는 함수
+    """
+    return init_session_state(HeadlessSessionState(values))
+
+def use_session(state):
+    """
+    현재 실행 흐름(스레드/비동기 태스크)에서 사용할 세션 상태를 지정하는 함수
+    """
+    _current_session.set(state)
+    return state
+
+def get_session():
+    """
+    현재 실행 흐름의 세션 상태를 반환하는 함수
+    """
+    state = _current_session.get()
+    if state is None:
+        raise RuntimeError("세션 상태가 지정되지 않았습니다. use_session()을 먼저 호출하세요.")
+    return state
+
+# --- 진행 상황 알림 ---
+# 스트리밍 API 등에서 답변 생성 단계를 받아 보기 위한 수신 함수 (지정하지 않으면 아무 일도 하지 않음)
+_progress_listener = contextvars.ContextVar("progress_listener", default=None)
+
+def set_progress_listener(listener):
+    """
+    현재 실행 흐름의 진행 상황 수신 함수 listener(event, data)를 지정하는 함수
+    """
+    return _progress_listener.set(listener)
+
+def emit_progress(event, **data):
+    listener = _progress_listener.get()
+    if listener is not None:
+        listener(event, data)
+
+# --- 대화 기록 ---
+CONVERSATION_HISTORY_MESSAGES = 20  # 프롬프트의 이전 대화에 포함할 최근 메시지 수
+
+def conversation_owner(session):
+    """
+    세션의 대화 기록 소유자를 반환하는 함수 (지정되지 않았으면 세션 ID)
+    """
+    return session.owner or session.session_id
+
+def open_conversation(conversation_id):
+    """
+    저장된 대화를 열어 최근 한 페이지를 세션에 읽는 함수 (현재 사용자의 대화만 열 수 있음)
+
+    Returns:
+        bool: 대화를 열었는지 여부 (없거나 다른 사용자의 대화이면 False)
+    """
+    session = get_session()
+    if get_conversation_store().get_conversation(conversation_id, conversation_owner(session)) is None:
+        return False
+    session.conversation_id = conversation_id
+    session.chat_history = get_conversation_store().recent_messages(conversation_id, DEFAULT_PAGE_SIZE)
+    session.history_limit = DEFAULT_PAGE_SIZE
+    return True
+
+def start_new_conversation():
+    """
+    새 대화를 시작하는 함수 (저장소의 대화는 첫 답변을 저장할 때 생성)
+    """
+    session = get_session()
+    session.conversation_id = None
+    session.chat_history = []
+    session.history_limit = DEFAULT_PAGE_SIZE
+
+def has_earlier_messages():
+    """
+    화면에 읽어 둔 메시지보다 이전 메시지가 저장소에 남아 있는지 확인하는 함수
+    """
+    session = get_session()
+    if not session.conversation_id or not session.chat_history or "id" not in session.chat_history[0]:
+        return False
+    return get_conversation_store().has_messages_before(session.conversation_id, session.chat_history[0]["id"])
+
+def load_earlier_messages():
+    """
+    이전 메시지를 한 페이지 더 읽어 세션 대화 기록 앞에 붙이는 함수
+    """
+    session = get_session()
+    if not has_earlier_messages():
+        return
+    earlier = get_conversation_store().recent_messages(
+        session.conversation_id, DEFAULT_PAGE_SIZE, before_id=session.chat_history[0]["id"]
+    )
+    session.chat_history = earlier + session.chat_history
+    session.history_limit += len(earlier)
+
+def save_conversation_turn(question, answer):
+    """
+    질문과 답변을 저장소에 추가하고 세션 대화 기록에 반영하는 함수
+    (화면에는 최근 history_limit개 메시지만 유지, 나머지는 저장소에서 다시 읽음)
+    """
+    session = get_session()
+    store = get_conversation_store()
+    if not session.conversation_id:
+        session.conversation_id = store.create_conversation(conversation_owner(session), title=question)
+    session.chat_history.extend(store.append_messages(session.conversation_id, [
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer},
+    ]))
+    if len(session.chat_history) > session.history_limit:
+        del session.chat_history[:-session.history_limit]
+
+def conversation_history(question):
+    """
+    최근 대화와 현재 질문으로 프롬프트에 넣을 이전 대화 문자열을 만드는 함수
+    """
+    messages = get_session().chat_history[-CONVERSATION_HISTORY_MESSAGES:]
+    return "\n".join([f"{m['role']}: {m['content']}" for m in messages] + [f"user: {question}"])
+
+# --- 카테고리 정의 ---
+LAW_CATEGORIES = {
+    "덤핑방지관세": {
+        "중국산 더블레이어 인쇄제판용 평면 모양 사진플레이트에 대한 덤핑방지관세 부과에 관한 규칙": "docs/중국산 더블레이어 인쇄제판용 평면 모양 사진플레이트에 대한 덤핑방지관세 부과에 관한 규칙(기획재정부령)(제00940호)(20221025).pdf",
+    },
+    "덤핑판정": {
+        "중국산 더블레이어 인쇄제판용 평면모양 사진플레이트 최종판정": "docs/중국산 더블레이어 인쇄제판용 평면모양 사진플레이트_최종판정의결서.pdf",
+    },
+    "관련법령": {
+        "관세법": "docs/관세법(법률)(제20608호)(20250401).pdf",
+        "관세법 시행령": "docs/관세법 시행령(대통령령)(제35363호)(20250722).pdf",
+        "관세법 시행규칙": "docs/관세법 시행규칙(기획재정부령)(제01110호)(20250321).pdf",
+        "불공정무역행위 조사 및 산업피해구제에 관한 법률": "docs/불공정무역행위 조사 및 산업피해구제에 관한 법률(법률)(제20693호)(20250722).pdf",
+    }
+}
+
+# 카테고리별 키워드 정보
+CATEGORY_KEYWORDS = {
+    "덤핑방지관세": ["더블레이어", "인쇄제판용", "평면모양", "사진플레이트", "덤핑방지관세", "덤핑마진", "정상가격", "수출가격", "덤핑률"],
+    "덤핑판정": ["더블레이어", "최종판정", "예비판정", "산업피해", "실질적 피해", "인과관계", "국내산업", "조사대상물품", "덤핑수입"],
+    "관련법령": ["관세법", "시행령", "시행규칙", "불공정무역", "산업피해구제", "무역위원회", "조사절차", "덤핑규정"]
+}
+
+# 카테고리별 우선순위 설정
+CATEGORY_PRIORITY = {
+    "덤핑방지관세": 1,  # 가장 높은 우선순위
+    "덤핑판정": 2,
+    "관련법령": 3
+}
+
+# 공급자별 덤핑방지관세율 정보
+SUPPLIERS_INFO = {
+    "MAJOR_SUPPLIERS": {
+        "러차이": {
+            "name_kr": "러차이",
+            "name_en": "Jiangsu Lecai Printing Material Co., Ltd.",
+            "name_cn": "江苏乐彩印刷材料有限公司",
+            "aliases": ["Lecai", "乐彩"],
+            "rate": 4.10,
+            "description": "러차이 및 그 기업의 제품을 수출하는 자"
+        },
+        "코닥": {
+            "name_kr": "코닥",
+            "name_en": "Kodak (China) Graphic Communications Company Limited",
+            "aliases": ["Kodak", "柯达", "乐凯华光"],
+            "rate": 3.60,
+            "description": "코닥과 그 관계사",
+            "related_companies": [
+                "코닥 인베스트먼트[Kodak (China) Investment Co., Ltd.]",
+                "코닥 코리아(Kodak Korea Ltd.)",
+                "이스트만 코닥(Eastman Kodak Company)",
+                "화광(Lucky Huaguang Graphics Co., Ltd.)",
+                "화광 난양(Lucky Huaguang Nanyang Trading Co., Ltd.)",
+                "화광 바오리(Suzhou Huaguang Baoli Printing Plate Material Co., Ltd.)",
+                "종인(Zhongyin Printing Equipment Co., Ltd.)",
+                "아그파 화광[Agfa Huaguang (Shanghai) Printing Equipment Co., Ltd.]",
+                "화푸(Henan Huafu Packaging Technology Co., Ltd.)",
+                "코닥 일렉트로닉[Kodak Electronic Products (Shanghai) Company Limited]"
+            ]
+        },
+        "화펑": {
+            "name_kr": "화펑",
+            "name_en": "Chongqing Huafeng Dijet Printing Material Co., Ltd.",
+            "aliases": ["Huafeng"],
+            "rate": 7.61,
+            "description": "화펑과 그 관계사",
+            "related_companies": [
+                "화펑PM(Chongqing Huafeng Printing Material Co., Ltd.)"
+            ]
+        }
+    },
+    "OTHER_SUPPLIERS_RATE": 4.87,
+    "OTHER_SUPPLIERS_DESCRIPTION": "그 밖의 공급자"
+}
+
+# 공급자별 세율의 법적 근거
+DUMPING_DUTY_LEGAL_BASIS = (
+    "관세법 제51조, 「중국산 더블레이어 인쇄제판용 평면 모양 사진플레이트에 대한 "
+    "덤핑방지관세 부과에 관한 규칙」(기획재정부령 제940호, 2022.10.25.)"
+)
+
+# 덤핑방지관세 대상 물품 판단 키워드
+PRODUCT_KEYWORDS = ["인쇄제판용", "평면모양", "사진플레이트", "printing plate", "PS plate"]
+SPEC_KEYWORDS = ["PS", "presensitized", "감광", "알루미늄", "aluminum", "offset"]
+
+# 공급자 별칭 색인 (한글/영문/중문명 및 관계사명 → 세율 그룹)
+SUPPLIER_INDEX = SupplierAliasIndex(SUPPLIERS_INFO)
+SUPPLIER_NAME_INDEX = NameNgramIndex.from_suppliers(SUPPLIERS_INFO)  # 관계사명까지 포함한 유사 이름 색인
+
+# API 호출 제한을 위한 설정
+MAX_RETRIES = 3
+RETRY_DELAY = float(os.environ.get("LLM_RETRY_DELAY", "20"))  # seconds
+
+def get_model_with_retry():
+    """
+    재시도 로직이 포함된 LLM 모델 반환 함수
+    """
+    for attempt in range(MAX_RETRIES):
+        try:
+            return get_backend().get_model()
+        except google_exceptions.ResourceExhausted:
+            if attempt < MAX_RETRIES - 1:
+                time.sleep(RETRY_DELAY)
+            else:
+                raise
+
+# 토큰 사용량 집계용 호출 주체 구분
+AGENT_LABELS = {
+    "law_agent": "문서별 에이전트",
+    "head_agent": "헤드 에이전트",
+    "packed": "컨텍스트 패킹",
+    "summarizer": "문서 요약",
+    "quick_response": "빠른 답변",
+    "llm": "기타",
+}
+
+@traced("llm.generate", record_args=("agent", "document"))
+def generate_content_with_retry(model, prompt, agent="llm", document=None):
+    """
+    재시도 로직이 포함된 content 생성 함수 (LLM 응답 캐시가 켜져 있으면 같은 프롬프트의 응답 재사용)
+    
+    Args:
+        model: LLM 모델
+        prompt (str): 프롬프트
+        agent (str): 토큰 사용량 집계용 호출 주체 (AGENT_LABELS의 키)
+        document (str, optional): 토큰 사용량 집계용 대상 문서명
+    """
+    current_span().set(prompt_chars=len(prompt))
+    cache = get_completion_cache()
+    if cache.enabled:
+        key = completion_key(get_backend().name, model, prompt)
+        result = cache.get_or_generate(key, lambda: _generate_content_with_retry(model, prompt, agent, document))
+        if isinstance(result, CachedResponse):
+            current_span().set(cached=True)
+            record_usage(result, agent, document, cached=True, session_id=current_session_id())
+        return result
+    return _generate_content_with_retry(model, prompt, agent, document)
+
+def _generate_content_with_retry(model, prompt, agent, document):
+    retry_stats.incr("calls")
+    for attempt in range(MAX_RETRIES):
+        try:
+            # 프로세스 전체 LLM 동시 호출 수 제한 (재시도 대기 중에는 자리를 반납)
+            with get_llm_scheduler().slot(current_session_id()):
+                result = model.generate_content(prompt)
+            usage = record_usage(result, agent, document, model=getattr(model, "model_name", None),
+                                 session_id=current_session_id())
+            retry_stats.incr("successes")
+            current_span().set(attempts=attempt + 1, prompt_tokens=usage.prompt_tokens,
+                               response_tokens=usage.response_tokens)
+            return result
+        except google_exceptions.ResourceExhausted:
+            if attempt < MAX_RETRIES - 1:
+                retry_stats.incr("retries")
+                time.sleep(RETRY_DELAY)
+                continue
+            else:
+                retry_stats.incr("exhausted")
+                record_llm_failure(f"{agent}: API 호출 한도 초과")
+                st.error("API 호출 한도에 도달했습니다. 잠시 후 다시 시도해주세요.")
+                return None
+        except Exception as e:
+            retry_stats.incr("errors")
+            record_llm_failure(f"{agent}: {e}")
+            st.error(f"오류가 발생했습니다: {str(e)}")
+            return None
+
+def record_llm_failure(message):
+    """
+    LLM 호출 실패를 현재 세션의 질문 오류 목록에 기록하는 함수
+    (답변은 대체 문구로 계속 만들어지므로, 일괄 처리 등에서 실패한 답변을 구분하는 데 사용)
+    """
+    state = _current_session.get()
+    if state is not None:
+        state.setdefault("llm_errors", []).append(message)
+
+def current_session_id():
+    """
+    현재 실행 흐름의 세션 ID를 반환하는 함수 (세션이 지정되지 않았으면 None)
+    """
+    state = _current_session.get()
+    return state.get("session_id") if state is not None else None
+
+def record_question_usage(usage):
+    """
+    질문 하나의 토큰 사용량을 세션 집계에 합치는 함수
+    """
+    session = get_session()
+    session.last_usage = usage
+    session.usage.merge(usage)
+    get_usage_ledger().count_question()
+
+@traced("dumping_rate", record_args=("supplier_name",))
+def get_dumping_rate(supplier_name, product_info=None, special_relationship=None, use_web_search=True):
+    """
+    공급자의 덤핑방지관세율을 반환하는 함수
+    
+    Args:
+        supplier_name (str): 공급자 이름
+        product_info (dict, optional): 제품 정보
+        special_relationship (str, optional): 특수관계가 있는 주요 공급자 이름
+        use_web_search (bool): 웹 검색 사용 여부
+    
+    Returns:
+        dict: 세율 정보를 포함한 딕셔너리
+    """
+    result = {
+        "search_date": datetime.now().strftime("%Y-%m-%d"),
+        "data_sources": ["Local Database"],
+        "is_applicable": True,  # 덤핑방지관세 적용 여부
+        "reason": ""
+    }
+    
+    # 제품 정보 분석
+    if product_info:
+        product_analysis = analyze_product_info(product_info, use_web_search)
+        result["product_analysis"] = product_analysis
+        
+        # 덤핑방지관세 대상이 아닌 경우
+        if not product_analysis["is_target_product"]:
+            result.update({
+                "is_applicable": False,
+                "rate": 0,
+                "reason": "덤핑방지관세 부과대상 물품이 아님",
+                "details": product_analysis["reason"]
+            })
+            return result
+    
+    # 웹 검색 수행
+    if use_web_search and get_session().serper_api_key:
+        web_info = analyze_web_info(supplier_name, "company")
+        if web_info["status"] == "success":
+            result["web_search_info"] = web_info
+            result["data_sources"].append("Web Search")
+    
+    # 주요 공급자 검색 (관계사 포함 별칭 색인)
+    match = SUPPLIER_INDEX.resolve(supplier_name)
+    if match:
+        supplier_info = SUPPLIER_INDEX.supplier(match.supplier_key)
+        result.update({
+            "rate": supplier_info["rate"],
+            "supplier_type": "major",
+            "supplier_info": supplier_info,
+            "matched_alias": match.alias,
+            "reason": SUPPLIER_INDEX.describe(match)
+        })
+        return result
+    
+    # 특수관계 검사
+    if special_relationship:
+        match = SUPPLIER_INDEX.resolve(special_relationship)
+        if match:
+            supplier_info = SUPPLIER_INDEX.supplier(match.supplier_key)
+            result.update({
+                "rate": supplier_info["rate"],
+                "supplier_type": "special_relationship",
+                "related_supplier": supplier_info,
+                "reason": f"{supplier_info['name_kr']}와(과)의 특수관계로 인해 해당 공급자의 세율 적용"
+            })
+            return result
+    
+    # 그 밖의 공급자
+    result.update({
+        "rate": SUPPLIERS_INFO["OTHER_SUPPLIERS_RATE"],
+        "supplier_type": "other",
+        "reason": "그 밖의 공급자에 해당"
+    })
+    return result
+
+SEARCH_CACHE_EMPTY_TTL = 300  # 결과 없는 검색의 캐시 유효 기간 (초)
+SEARCH_TOTAL_TIMEOUT = 60     # 검색어 묶음 전체 제한 시간 (초)
+# 점진적 검색: 우선순위 사이트 결과가 충분하거나 소프트 마감이 지나면 남은 검색 취소
+SEARCH_PROGRESSIVE = os.environ.get("SEARCH_PROGRESSIVE", "1") != "0"  # 0이면 모든 검색 결과를 기다림
+SEARCH_SOFT_DEADLINE = 8      # 소프트 마감 (초)
+SEARCH_MIN_PRIORITY_HITS = 3  # 조기 반환에 필요한 우선순위 사이트 결과 수
+SEARCH_CACHE_PARTIAL_TTL = 3600  # 일부 검색만 반영된 결과의 캐시 시간 (초)
+PRIORITY_SITES = ["qcc.com", "tianyancha.com", "cninfo.com.cn"]  # 중국 기업 정보 사이트 (최우선)
+
+def is_priority_result(result):
+    return any(site in result.get("link", "") for site in PRIORITY_SITES)
+
+@traced("web_search", record_args=("query", "search_type"))
+def search_info(query, api_key, search_type="company", progressive=None):
+    """
+    Serper API를 사용하여 정보를 검색하는 함수
+    
+    Args:
+        query (str): 검색어
+        api_key (str): Serper API 키
+        search_type (str): 검색 유형 ("company" 또는 "product")
+        progressive (bool, optional): 점진적 검색 여부 (기본값: SEARCH_PROGRESSIVE)
+    
+    Returns:
+        dict: 검색 결과 정보
+    """
+    if progressive is None:
+        progressive = SEARCH_PROGRESSIVE
+    
+    # 프로세스 전체 공유 캐시에 결과가 있으면 반환하고,
+    # 같은 검색어를 동시에 조회 중인 호출이 있으면 그 결과를 함께 사용
+    cache = get_search_cache()
+    return cache.get_or_fetch(
+        query, search_type,
+        lambda: fetch_search_results(query, api_key, search_type, progressive, cache)
+    )
+
+def fetch_search_results(query, api_key, search_type, progressive, cache):
+    """
+    Serper API로 실제 검색을 수행하고 결과를 캐시에 저장하는 함수 (search_info 내부용)
+    """
+    provider = get_search_provider()
+    results = []
+    partial = {"cancelled": 0}  # 조기 반환으로 취소된 검색 수
+    
+    # 검색 쿼리 최적화
+    search_queries = []
+    if search_type == "company":
+        # 중국 기업 정보 사이트 (최우선)
+        search_queries.extend([
+            f"{query} site:qcc.com",
+            f"{query} site:tianyancha.com",
+            f"{query} site:cninfo.com.cn"
+        ])
+        
+        # 한국 기업 정보 사이트
+        search_queries.extend([
+            f"{query} site:dart.fss.or.kr",
+            f"{query} site:nicebizinfo.com"
+        ])
+    else:  # product
+        # 제품 검색 최적화
+        search_queries.extend([
+            f"{query} 사진플레이트 PS plate 규격",
+            f"{query} printing plate specifications",
+            f"{query} 印刷版 规格"
+        ])
+    
+    # 병렬 검색 실행을 위한 함수
+    async def search_query(http_session, query):
+        try:
+            async with runtime.host_limit(provider.url):
+                return await provider.search(http_session, query, api_key, num=5)
+        except asyncio.TimeoutError:
+            print(f"Timeout for query: {query}")
+            return []
+        except Exception as e:
+            print(f"Error searching with query '{query}': {str(e)}")
+            return []
+
+    # 비동기 검색 실행 (공유 런타임의 연결 풀 사용)
+    async def run_searches():
+        http_session = await runtime.get_session()
+        tasks = [asyncio.ensure_future(search_query(http_session, q)) for q in search_queries]
+        if not progressive:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # 예외 처리 및 유효한 결과만 반환
+            valid_results = []
+            for r in results:
+                if isinstance(r, list):
+                    valid_results.extend(r)
+            return valid_results
+        return await collect_progressively(tasks)
+
+    # 완료되는 순서대로 결과를 모으고, 충분하면 남은 검색을 취소
+    async def collect_progressively(tasks):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SEARCH_SOFT_DEADLINE
+        valid_results = []
+        priority_hits = 0
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                # 마감이 지났는데 아직 결과가 없으면 첫 결과가 올 때까지 대기 (전체 타임아웃은 별도 적용)
+                wait_timeout = max(remaining, 0) if remaining > 0 or valid_results else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    valid_results.extend(task.result())
+                    priority_hits += sum(1 for r in task.result() if is_priority_result(r))
+                if search_type == "company" and priority_hits >= SEARCH_MIN_PRIORITY_HITS:
+                    break
+                if loop.time() >= deadline and valid_results:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            partial["cancelled"] = len(pending)
+        return valid_results
+
+    # 백그라운드 이벤트 루프에서 실행 (전체 타임아웃 적용)
+    runtime = get_async_runtime()
+    with span("web_search.fetch", queries=len(search_queries)) as fetch_span:
+        try:
+            results = runtime.run(run_searches(), timeout=SEARCH_TOTAL_TIMEOUT)
+        except asyncio.TimeoutError:
+            print("Total search timeout")
+            results = []
+        except Exception as e:
+            print(f"Error in search execution: {str(e)}")
+            results = []
+        fetch_span.set(results=len(results), cancelled=partial.get("cancelled", 0))
+    
+    # 중복 결과 제거 및 정렬
+    seen_links = set()
+    unique_results = []
+    for result in results:
+        link = result.get("link", "")
+        if link not in seen_links:
+            seen_links.add(link)
+            # 중국 기업 정보 사이트 우선순위 부여
+            priority = 0 if is_priority_result(result) else 1
+            result["priority"] = priority
+            unique_results.append(result)
+    
+    # 우선순위에 따라 정렬
+    unique_results.sort(key=lambda x: (x["priority"], -len(x.get("snippet", ""))))
+    
+    # 상위 10개 결과만 유지
+    final_results = unique_results[:10]
+    
+    # 결과 캐싱
+    search_result = {
+        "organic": final_results,
+        "query": query,
+        "search_type": search_type
+    }
+    
+    # 결과가 없는 경우(네트워크 오류 등)는 짧게만, 일부 검색만 반영된 경우는 조금 짧게 캐싱
+    if not final_results:
+        cache_ttl = SEARCH_CACHE_EMPTY_TTL
+    elif partial["cancelled"]:
+        cache_ttl = SEARCH_CACHE_PARTIAL_TTL
+    else:
+        cache_ttl = None
+    cache.set(query, search_type, search_result, ttl=cache_ttl)
+    
+    return search_result
+
+# --- 웹 검색 결과 분류기 ---
+# 분류별 키워드 (제목+요약을 소문자로 바꾼 텍스트에서 부분 문자열로 검색)
+WEB_INFO_CATEGORY_KEYWORDS = {
+    "profile": ["회사소개", "기업개요", "company profile", "about us", "企业简介", "公司简介"],
+    "address": ["주소", "소재지", "address", "location", "所在地", "地址"],
+    "head_office": ["본사"],
+    "shareholders": ["주주", "지분", "출자", "shareholder", "股东", "持股"],
+    "subsidiaries": ["자회사", "계열사", "subsidiary", "affiliate", "子公司", "关联公司"],
+    "parent_companies": ["모회사", "지주회사", "parent company", "holding company", "母公司", "控股公司"],
+    "business_scope": ["사업영역", "주요제품", "business scope", "products", "经营范围", "主营产品"],
+    "trade_info": ["수출", "수입", "무역", "export", "import", "trade", "进出口", "贸易"],
+    "financial_info": ["매출", "영업이익", "당기순이익", "revenue", "profit", "营收", "利润"],
+    "certifications": ["인증", "특허", "certification", "patent", "认证", "专利"],
+    "news": ["뉴스", "공시", "보도", "news", "update", "announcement", "新闻", "公告"],
+}
+# 요약문을 그대로 company_details[분류]에 모으는 분류
+WEB_INFO_DETAIL_CATEGORIES = [
+    "shareholders", "subsidiaries", "parent_companies", "business_scope",
+    "trade_info", "financial_info", "certifications",
+]
+
+def _build_web_info_classifier():
+    automaton = AhoCorasick()
+    for category, keywords in WEB_INFO_CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add(keyword.lower(), category)
+    return automaton.build()
+
+WEB_INFO_CLASSIFIER = _build_web_info_classifier()
+
+# 기본 정보 추출용 정규식
+REPRESENTATIVE_PATTERN = re.compile(r"대표[자이사]*[:\s]*([\w\s]+)")
+ESTABLISHMENT_DATE_PATTERN = re.compile(r"설립[일자]*[:\s]*(\d{4}[년\s]*\d{1,2}[월\s]*\d{1,2}[일]*)")
+BUSINESS_NUMBER_PATTERN = re.compile(r"사업자[등록]*번호[:\s]*(\d{3}-\d{2}-\d{5})")
+
+def classify_search_results(results):
+    """
+    검색 결과 목록의 각 항목(제목+요약)에 해당하는 분류를 모두 찾는 함수
+    모든 항목을 구분 문자(\\0)로 이어 오토마톤 한 번 순회로 처리한다.
+    
+    Args:
+        results (list): Serper organic 검색 결과 목록
+    
+    Returns:
+        list: 항목별 분류 이름 집합
+    """
+    texts = [(r.get("title", "") + " " + r.get("snippet", "")).lower() for r in results]
+    tags = [set() for _ in texts]
+    # 각 항목이 끝나는 위치 (이어 붙인 텍스트 기준)
+    boundaries = []
+    position = 0
+    for text in texts:
+        position += len(text)
+        boundaries.append(position)
+        position += 1  # 구분자
+    index = 0
+    for _, end, _, category in WEB_INFO_CLASSIFIER.iter("\0".join(texts)):
+        while end > boundaries[index]:
+            index += 1
+        tags[index].add(category)
+    return tags
+
+# --- 요청 단위 메모이제이션 ---
+# 질문 하나를 처리하는 동안 같은 회사 분석(analyze_web_info)을 한 번만 수행하고,
+# 분석 도중 같은 회사를 다시 분석하려는 순환 호출을 차단한다.
+# contextvars를 사용하므로 같은 요청에서 생성된 비동기 작업/스레드(to_thread)가 함께 사용한다.
+_request_memo = contextvars.ContextVar("request_memo", default=None)
+_IN_PROGRESS = object()
+
+@contextmanager
+def request_scope():
+    """
+    요청 단위 메모이제이션 범위를 여는 컨텍스트 매니저 (이미 열려 있으면 바깥 범위를 그대로 사용)
+    """
+    memo = _request_memo.get()
+    if memo is not None:
+        yield memo
+        return
+    memo = {}
+    token = _request_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _request_memo.reset(token)
+
+@traced("web_info", record_args=("query", "search_type"))
+def analyze_web_info(query, search_type="company"):
+    """
+    웹 검색 결과를 분석하여 정보를 추출하는 함수
+    같은 요청 안에서는 검색어별로 한 번만 분석한다.
+    
+    Args:
+        query (str): 검색어
+        search_type (str): 검색 유형 ("company" 또는 "product")
+    
+    Returns:
+        dict: 분석된 정보
+    """
+    with request_scope() as memo:
+        memo_key = ("web_info", search_type, normalize_query(query))
+        cached = memo.get(memo_key)
+        if cached is _IN_PROGRESS:
+            # 같은 검색어 분석 중 다시 호출된 경우 (순환 호출)
+            return {
+                "status": "error",
+                "message": "같은 검색어에 대한 분석이 이미 진행 중입니다.",
+                "search_date": datetime.now().strftime("%Y-%m-%d")
+            }
+        if cached is not None:
+            return cached
+        
+        memo[memo_key] = _IN_PROGRESS
+        try:
+            result = _analyze_web_info(query, search_type)
+        except BaseException:
+            memo.pop(memo_key, None)
+            raise
+        memo[memo_key] = result
+        return result
+
+def _analyze_web_info(query, search_type):
+    if not get_session().serper_api_key:
+        return {
+            "status": "error",
+            "message": "Serper API 키가 설정되지 않았습니다.",
+            "search_date": datetime.now().strftime("%Y-%m-%d")
+        }
+    
+    search_results = search_info(query, get_session().serper_api_key, search_type)
+    
+    if "error" in search_results:
+        return {
+            "status": "error",
+            "message": f"검색 중 오류 발생: {search_results['error']}",
+            "search_date": datetime.now().strftime("%Y-%m-%d")
+        }
+    
+    result_info = {
+        "query": query,
+        "search_date": datetime.now().strftime("%Y-%m-%d"),
+        "status": "success",
+        "company_details": {
+            "basic_info": {
+                "company_name": "",
+                "company_name_en": "",
+                "establishment_date": "",
+                "business_number": "",
+                "representative": "",
+                "website": "",
+                "contact": "",
+                "main_business": []
+            },
+            "addresses": [],            # 주소 정보
+            "registration": [],         # 사업자/법인 등록 정보
+            "shareholders": [],         # 주주 정보
+            "subsidiaries": [],         # 자회사 정보
+            "parent_companies": [],     # 모회사 정보
+            "business_scope": [],       # 사업 범위
+            "trade_info": [],          # 무역 정보
+            "financial_info": [],      # 재무 정보
+            "certifications": []       # 인증 정보
+        },
+        "special_relationships": [],    # 특수관계 정보
+        "news_and_updates": [],        # 최신 뉴스 및 업데이트
+        "raw_search_results": search_results
+    }
+    
+    details = result_info["company_details"]
+    search_date = result_info["search_date"]
+    organic_results = search_results.get("organic", [])
+    
+    try:
+        # 검색 결과 전체를 한 번에 분류
+        for result, tags in zip(organic_results, classify_search_results(organic_results)):
+            title = result.get("title", "")
+            snippet = result.get("snippet", "")
+            link = result.get("link", "")
+            
+            if search_type == "company":
+                # 기본 정보 추출
+                if "profile" in tags:
+                    basic_info = details["basic_info"]
+                    # 대표자명 추출
+                    rep_match = REPRESENTATIVE_PATTERN.search(snippet)
+                    if rep_match:
+                        basic_info["representative"] = rep_match.group(1).strip()
+                    
+                    # 설립일 추출
+                    date_match = ESTABLISHMENT_DATE_PATTERN.search(snippet)
+                    if date_match:
+                        basic_info["establishment_date"] = date_match.group(1)
+                    
+                    # 사업자번호 추출
+                    biz_match = BUSINESS_NUMBER_PATTERN.search(snippet)
+                    if biz_match:
+                        basic_info["business_number"] = biz_match.group(1)
+                
+                # 주소 정보
+                if "address" in tags:
+                    details["addresses"].append({
+                        "address": snippet,
+                        "source": link,
+                        "type": "본사" if "head_office" in tags else "사업장"
+                    })
+                
+                # 주주, 자회사/계열사, 모회사, 사업 범위, 무역, 재무, 인증 정보
+                for category in WEB_INFO_DETAIL_CATEGORIES:
+                    if category in tags:
+                        details[category].append({
+                            "info": snippet,
+                            "source": link,
+                            "date_found": search_date
+                        })
+            
+            # 최신 뉴스 및 업데이트
+            if "news" in tags:
+                result_info["news_and_updates"].append({
+                    "title": title,
+                    "content": snippet,
+                    "source": link,
+                    "date_found": search_date
+                })
+    
+    except Exception as e:
+        result_info["analysis_error"] = str(e)
+    
+    # 특수관계 분석 (방금 수집한 웹 정보를 그대로 전달하여 재검색 방지)
+    if search_type == "company":
+        special_relationship = check_special_relationship({"name": query}, web_info=result_info)
+        if special_relationship["has_special_relationship"]:
+            result_info["special_relationships"] = special_relationship["relationships"]
+            # 발견한 관계를 관계 그래프에 저장 (세션 캐시가 만료되어도 유지)
+            get_relationship_graph(SUPPLIERS_INFO).record_relationships(
+                query, special_relationship["relationships"]
+            )
+    
+    return result_info
+
+def format_company_info(company_info):
+    """
+    기업 정보를 보기 좋게 포맷팅하는 함수
+    
+    Args:
+        company_info (dict): analyze_web_info 함수의 결과
+    
+    Returns:
+        str: 포맷팅된 기업 정보
+    """
+    if company_info["status"] != "success":
+        return f"기업 정보 검색 실패: {company_info.get('message', '알 수 없는 오류')}"
+    
+    formatted_info = []
+    formatted_info.append(f"## 🏢 {company_info['query']} 기업 정보")
+    formatted_info.append(f"*검색 일자: {company_info['search_date']}*")
+    formatted_info.append("---")
+    
+    # 기본 정보
+    basic_info = company_info["company_details"]["basic_info"]
+    if any(basic_info.values()):
+        formatted_info.append("### 📋 기본 정보")
+        if basic_info["company_name"]: 
+            formatted_info.append(f"- 기업명: {basic_info['company_name']}")
+        if basic_info["company_name_en"]: 
+            formatted_info.append(f"- 영문명: {basic_info['company_name_en']}")
+        if basic_info["establishment_date"]: 
+            formatted_info.append(f"- 설립일: {basic_info['establishment_date']}")
+        if basic_info["business_number"]: 
+            formatted_info.append(f"- 사업자등록번호: {basic_info['business_number']}")
+        if basic_info["representative"]: 
+            formatted_info.append(f"- 대표자: {basic_info['representative']}")
+        formatted_info.append("")
+    
+    # 주소 정보
+    if company_info["company_details"]["addresses"]:
+        formatted_info.append("### 📍 사업장 정보")
+        for addr in company_info["company_details"]["addresses"]:
+            formatted_info.append(f"- {addr['type']}: {addr['address']}")
+        formatted_info.append("")
+    
+    # 주주 및 지분 정보
+    if company_info["company_details"]["shareholders"]:
+        formatted_info.append("### 👥 주주 및 지분 정보")
+        for shareholder in company_info["company_details"]["shareholders"]:
+            formatted_info.append(f"- {shareholder['info']}")
+        formatted_info.append("")
+    
+    # 자회사/계열사 정보
+    if company_info["company_details"]["subsidiaries"]:
+        formatted_info.append("### 🔄 자회사/계열사 정보")
+        for subsidiary in company_info["company_details"]["subsidiaries"]:
+            formatted_info.append(f"- {subsidiary['info']}")
+        formatted_info.append("")
+    
+    # 모회사 정보
+    if company_info["company_details"]["parent_companies"]:
+        formatted_info.append("### ⬆️ 모회사 정보")
+        for parent in company_info["company_details"]["parent_companies"]:
+            formatted_info.append(f"- {parent['info']}")
+        formatted_info.append("")
+    
+    # 사업 범위
+    if company_info["company_details"]["business_scope"]:
+        formatted_info.append("### 🎯 사업 범위")
+        for scope in company_info["company_details"]["business_scope"]:
+            formatted_info.append(f"- {scope['info']}")
+        formatted_info.append("")
+    
+    # 무역 정보
+    if company_info["company_details"]["trade_info"]:
+        formatted_info.append("### 🌐 무역 활동")
+        for trade in company_info["company_details"]["trade_info"]:
+            formatted_info.append(f"- {trade['info']}")
+        formatted_info.append("")
+    
+    # 재무 정보
+    if company_info["company_details"]["financial_info"]:
+        formatted_info.append("### 💰 재무 정보")
+        for finance in company_info["company_details"]["financial_info"]:
+            formatted_info.append(f"- {finance['info']}")
+        formatted_info.append("")
+    
+    # 인증 정보
+    if company_info["company_details"]["certifications"]:
+        formatted_info.append("### 📜 인증 및 특허")
+        for cert in company_info["company_details"]["certifications"]:
+            formatted_info.append(f"- {cert['info']}")
+        formatted_info.append("")
+    
+    # 특수관계 정보
+    if company_info.get("special_relationships"):
+        formatted_info.append("### ⚠️ 덤핑방지관세 대상 기업과의 특수관계")
+        for relationship in company_info["special_relationships"]:
+            formatted_info.append(f"- 관련 기업: **{relationship['major_supplier']}**")
+            formatted_info.append(f"  - 신뢰도 점수: {relationship['confidence_score']:.2f}")
+            for rel in relationship["relationships_found"]:
+                formatted_info.append(f"  - {rel['description']}: {rel['detail']}")
+        formatted_info.append("")
+    
+    # 최신 뉴스
+    if company_info["news_and_updates"]:
+        formatted_info.append("### 📰 최신 소식")
+        for news in company_info["news_and_updates"][:5]:  # 최근 5개만 표시
+            formatted_info.append(f"- {news['title']}")
+            formatted_info.append(f"  {news['content']}")
+        formatted_info.append("")
+    
+    return "\n".join(formatted_info)
+
+RELATIONSHIP_GRAPH_MAX_HOPS = 2  # 관계 그래프 검사 최대 단계 수
+
+@traced("special_relationship")
+def check_special_relationship(company_info, use_web_search=True, web_info=None):
+    """
+    특수관계 여부를 검사하는 함수
+    
+    Args:
+        company_info (dict): 회사 정보를 포함한 딕셔너리
+        use_web_search (bool): 웹 검색 사용 여부
+        web_info (dict, optional): 이미 수집한 analyze_web_info 결과 (있으면 웹 검색 생략)
+    
+    Returns:
+        dict: 특수관계 분석 결과
+    """
+    session = get_session()
+    relationships = []
+    
+    # 캐시 키 생성
+    cache_key = f"special_relationship_{company_info['name']}"
+    if 'relationship_cache' not in session:
+        session.relationship_cache = {}
+    
+    # 캐시된 결과가 있으면 반환
+    if cache_key in session.relationship_cache:
+        cached_result = session.relationship_cache[cache_key]
+        # 캐시 유효기간 확인 (24시간)
+        if (datetime.now() - cached_result['timestamp']).total_seconds() < 86400:
+            return cached_result['data']
+    
+    # 웹 검색을 통한 추가 정보 수집
+    if web_info is None and use_web_search and session.serper_api_key:
+        web_info = analyze_web_info(company_info["name"], "company")
+    
+    graph = get_relationship_graph(SUPPLIERS_INFO)
+    
+    # 주요 공급자들과의 관계 검사
+    for supplier_key, supplier_info in SUPPLIERS_INFO["MAJOR_SUPPLIERS"].items():
+        relationship = {
+            "major_supplier": supplier_info["name_kr"],
+            "major_supplier_en": supplier_info["name_en"],
+            "relationships_found": [],
+            "confidence_score": 0.0,  # 관계 신뢰도 점수
+            "evidence": []  # 증거 자료 저장
+        }
+        
+        # 1. 기본 검사 (회사명 유사성)
+        name_similarity = calculate_name_similarity(company_info["name"], supplier_info)
+        if name_similarity > 0.7:
+            relationship["relationships_found"].append({
+                "type": "name_similarity",
+                "description": "회사명 유사성 발견",
+                "confidence": name_similarity,
+                "details": f"유사도 점수: {name_similarity:.2f}"
+            })
+            relationship["confidence_score"] += name_similarity
+            relationship["evidence"].append({
+                "type": "name_match",
+                "source": "기업명 분석",
+                "details": f"검사 대상: {company_info['name']}, 주요 공급자: {supplier_info['name_kr']}/{supplier_info['name_en']}"
+            })
+        
+        # 1-1. 관계 그래프 검사 (공급자 표의 관계사 및 이전 웹 검색에서 발견한 관계)
+        path = graph.find_path(company_info["name"], supplier_info["name_kr"], RELATIONSHIP_GRAPH_MAX_HOPS)
+        if path and len(path) > 1:
+            path_confidence = 0.9 if len(path) == 2 else 0.8
+            path_text = format_relationship_path(path)
+            relationship["relationships_found"].append({
+                "type": "relationship_graph",
+                "description": f"관계 그래프상 {len(path) - 1}단계 관계",
+                "confidence": path_confidence,
+                "detail": path_text
+            })
+            relationship["confidence_score"] += path_confidence
+            relationship["evidence"].append({
+                "type": "relationship_graph",
+                "source": "관계 그래프",
+                "details": path_text
+            })
+        
+        # 2. 웹 검색 결과 분석
+        if web_info and web_info["status"] == "success":
+            # 2.1 주소 정보 분석
+            for address in web_info["company_details"]["addresses"]:
+                address_similarity = calculate_address_similarity(address["address"], supplier_info.get("address", ""))
+                if address_similarity > 0.8:
+                    relationship["relationships_found"].append({
+                        "type": "address_match",
+                        "description": "주소 일치",
+                        "confidence": address_similarity,
+                        "source": address.get("source", ""),
+                        "detail": address["address"]
+                    })
+                    relationship["confidence_score"] += address_similarity
+                    relationship["evidence"].append({
+                        "type": "address_match",
+                        "source": address.get("source", "주소 정보 분석"),
+                        "details": f"일치 점수: {address_similarity:.2f}"
+                    })
+            
+            # 2.2 주주/지분 관계 분석
+            for shareholder in web_info["company_details"]["shareholders"]:
+                if analyze_shareholder_relationship(shareholder, supplier_info):
+                    relationship["relationships_found"].append({
+                        "type": "shareholding",
+                        "description": "주주/지분 관계 발견",
+                        "confidence": 0.9,
+                        "source": shareholder.get("source", ""),
+                        "detail": web_info_text(shareholder)
+                    })
+                    relationship["confidence_score"] += 0.9
+                    relationship["evidence"].append({
+                        "type": "shareholding",
+                        "source": shareholder.get("source", "주주 정보 분석"),
+                        "details": web_info_text(shareholder)
+                    })
+            
+            # 2.3 자회사/모회사 관계 분석
+            for subsidiary in web_info["company_details"]["subsidiaries"]:
+                if analyze_company_relationship(subsidiary, supplier_info):
+                    relationship["relationships_found"].append({
+                        "type": "subsidiary",
+                        "description": "자회사 관계 발견",
+                        "confidence": 0.9,
+                        "source": subsidiary.get("source", ""),
+                        "detail": web_info_text(subsidiary)
+                    })
+                    relationship["confidence_score"] += 0.9
+                    relationship["evidence"].append({
+                        "type": "subsidiary",
+                        "source": subsidiary.get("source", "자회사 정보 분석"),
+                        "details": web_info_text(subsidiary)
+                    })
+            
+            for parent in web_info["company_details"]["parent_companies"]:
+                if analyze_company_relationship(parent, supplier_info):
+                    relationship["relationships_found"].append({
+                        "type": "parent_company",
+                        "description": "모회사 관계 발견",
+                        "confidence": 0.9,
+                        "source": parent.get("source", ""),
+                        "detail": web_info_text(parent)
+                    })
+                    relationship["confidence_score"] += 0.9
+                    relationship["evidence"].append({
+                        "type": "parent_company",
+                        "source": parent.get("source", "모회사 정보 분석"),
+                        "details": web_info_text(parent)
+                    })
+        
+        # 관계가 발견되고 신뢰도가 충분한 경우에만 결과에 추가
+        if relationship["relationships_found"]:
+            # 신뢰도 점수 정규화 (0~1 범위)
+            relationship["confidence_score"] = min(1.0, relationship["confidence_score"] / len(relationship["relationships_found"]))
+            # 높은 신뢰도(0.7 이상) 관계만 포함
+            if relationship["confidence_score"] >= 0.7:
+                # 낮은 신뢰도 관계는 제외
+                relationship["relationships_found"] = [
+                    r for r in relationship["relationships_found"]
+                    if r["confidence"] >= 0.7
+                ]
+                if relationship["relationships_found"]:  # 높은 신뢰도 관계가 남아있는 경우만 추가
+                    relationships.append(relationship)
+    
+    result = {
+        "has_special_relationship": len(relationships) > 0,
+        "relationships": relationships,
+        "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+        "data_sources": ["Local Database"]
+    }
+    
+    if web_info:
+        result["data_sources"].append("Web Search")
+    
+    # 특수관계가 있는 경우에만 상세 정보 포함
+    if result["has_special_relationship"]:
+        high_confidence_relationships = [r for r in relationships if r["confidence_score"] >= 0.8]
+        result.update({
+            "high_confidence_relationship": len(high_confidence_relationships) > 0,
+            "relationship_summary": {
+                "total_relationships": len(relationships),
+                "high_confidence_relationships": len(high_confidence_relationships),
+                "highest_confidence_score": max([r["confidence_score"] for r in relationships])
+            }
+        })
+        # 웹 검색 정보는 유의미한 특수관계가 있는 경우에만 포함
+        if web_info:
+            result["web_search_info"] = web_info
+    else:
+        # 특수관계가 없는 경우 간단한 결과만 반환
+        result = {
+            "has_special_relationship": False,
+            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+            "message": "유의미한 특수관계가 발견되지 않았습니다."
+        }
+    
+    # 결과 캐싱
+    session.relationship_cache[cache_key] = {
+        'data': result,
+        'timestamp': datetime.now()
+    }
+    
+    return result
+
+def calculate_name_similarity(name1, supplier_info):
+    """
+    회사명 유사도를 계산하는 함수
+    주요 공급자의 한글/영문/중문명, 별칭, 관계사명 중 가장 비슷한 이름과의
+    문자 n-gram 유사도(포함 관계면 1.0)를 반환한다.
+    """
+    supplier_key = next(
+        (key for key, info in SUPPLIERS_INFO["MAJOR_SUPPLIERS"].items() if info is supplier_info),
+        supplier_info["name_kr"]
+    )
+    return supplier_name_scores(name1).get(supplier_key, 0.0)
+
+@lru_cache(maxsize=1024)
+def supplier_name_scores(name):
+    """
+    회사명과 주요 공급자 그룹별 최고 이름 유사도를 {공급자 키: 점수} 형태로 반환하는 함수
+    (공급자마다 반복 호출되므로 이름별로 한 번만 계산)
+    """
+    return SUPPLIER_NAME_INDEX.scores(name)
+
+def calculate_address_similarity(addr1, addr2):
+    """
+    주소 유사도를 계산하는 함수
+    """
+    if not addr1 or not addr2:
+        return 0.0
+    
+    addr1 = addr1.lower()
+    addr2 = addr2.lower()
+    
+    # 정확한 일치 검사
+    if addr1 == addr2:
+        return 1.0
+    
+    # 부분 일치 검사
+    addr1_words = set(re.findall(r'\w+', addr1))
+    addr2_words = set(re.findall(r'\w+', addr2))
+    
+    # 주소 유사도
+    similarity = len(addr1_words & addr2_words) / max(len(addr1_words), len(addr2_words))
+    
+    return similarity
+
+def web_info_text(entry):
+    """
+    analyze_web_info의 주주·자회사·모회사 항목에서 검색 결과 요약문을 꺼내는 함수
+    """
+    return entry.get("info") or entry.get("description", "")
+
+def mentions_supplier(text, supplier_info):
+    """
+    텍스트에 주요 공급자가 별칭이나 관계사명으로 언급되었는지 확인하는 함수
+    """
+    return any(SUPPLIER_INDEX.supplier(m.supplier_key) is supplier_info for m in SUPPLIER_INDEX.find_all(text))
+
+def analyze_shareholder_relationship(shareholder, supplier_info):
+    """
+    주주 관계를 분석하는 함수
+    """
+    description = web_info_text(shareholder).lower()
+    name_kr = supplier_info["name_kr"].lower()
+    name_en = supplier_info["name_en"].lower()
+    
+    # 주요 키워드
+    keywords = ["주주", "지분", "출자", "shareholder", "stake", "ownership", "股东", "持股"]
+    
+    if any(keyword in description for keyword in keywords):
+        if name_kr in description or name_en in description or mentions_supplier(description, supplier_info):
+            return True
+    
+    return False
+
+def analyze_company_relationship(company, supplier_info):
+    """
+    회사 관계를 분석하는 함수
+    """
+    description = web_info_text(company).lower()
+    name_kr = supplier_info["name_kr"].lower()
+    name_en = supplier_info["name_en"].lower()
+    
+    # 주요 키워드
+    keywords = ["자회사", "계열사", "모회사", "지주회사", "subsidiary", "affiliate", "parent", 
+               "子公司", "关联公司", "母公司", "控股公司"]
+    
+    if any(keyword in description for keyword in keywords):
+        if name_kr in description or name_en in description or mentions_supplier(description, supplier_info):
+            return True
+    
+    return False
+
+def analyze_product_info(product_info, use_web_search=True):
+    """
+    제품 정보를 분석하여 덤핑방지관세 대상 여부를 판단하는 함수
+    
+    Args:
+        product_info (dict): 제품 정보를 포함한 딕셔너리
+        use_web_search (bool): 웹 검색 사용 여부
+    
+    Returns:
+        dict: 제품 분석 결과
+    """
+    result = {
+        "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+        "data_sources": ["Local Database"],
+        "product_name": product_info.get("name", ""),
+        "model": product_info.get("model", ""),
+        "specifications": product_info.get("specifications", {}),
+        "is_target_product": False,
+        "reason": "",
+        "dumping_duty_info": None
+    }
+    
+    # 웹 검색을 통한 추가 정보 수집
+    if use_web_search and get_session().serper_api_key:
+        search_query = f"{result['product_name']} {result.get('model', '')}".strip()
+        web_info = analyze_web_info(search_query, "product")
+        
+        if web_info and web_info["status"] == "success":
+            result["data_sources"].append("Web Search")
+            result["web_search_info"] = web_info
+            
+            # 기술 사양 정보 추가
+            if web_info.get("technical_specs"):
+                result["specifications"].update({
+                    "web_found_specs": web_info["technical_specs"]
+                })
+            
+            # 덤핑방지관세 관련 정보 추가
+            if web_info.get("dumping_duty_info"):
+                result["dumping_duty_info"] = web_info["dumping_duty_info"]
+    
+    # 제품이 덤핑방지관세 대상인지 판단
+    # 1. 제품명 기반 검사
+    if any(keyword in str(result["product_name"]).lower() for keyword in PRODUCT_KEYWORDS):
+        result["is_target_product"] = True
+        result["reason"] = "제품명에서 대상 품목 키워드 발견"
+    
+    # 2. 사양 기반 검사
+    if result["specifications"]:
+        spec_text = str(result["specifications"]).lower()
+        if any(keyword in spec_text for keyword in SPEC_KEYWORDS):
+            result["is_target_product"] = True
+            result["reason"] = "제품 사양에서 대상 품목 특성 발견"
+    
+    # 3. 웹 검색 결과 기반 검사
+    if result.get("web_search_info"):
+        if result["web_search_info"].get("dumping_duty_info"):
+            result["is_target_product"] = True
+            result["reason"] = "웹 검색 결과에서 덤핑방지관세 대상 확인"
+    
+    return result
+
+# 자료 PDF 목록 (법령명 → 경로)
+def law_pdf_files():
+    pdf_files = {}
+    for cat_files in LAW_CATEGORIES.values():
+        pdf_files.update(cat_files)
+    return pdf_files
+
+# 프로세스 전체 공유 코퍼스 (처음 호출 시 PDF 추출 및 색인 생성)
+def get_corpus():
+    return get_law_corpus(law_pdf_files())
+
+# PDF 로드 (모든 세션이 같은 코퍼스를 복사 없이 사용)
+def load_law_data(category=None):
+    corpus = get_corpus()
+    if corpus.missing_files:
+        st.warning(f"다음 파일들을 찾을 수 없습니다: {', '.join(corpus.missing_files)}")
+    return corpus.texts
+
+# 쿼리 유사 청크 검색 (유사도 점수 포함)
+def rank_relevant_chunks(query, vectorizer, tfidf_matrix, text_chunks, top_k=3, threshold=0.005):
+    from sklearn.metrics.pairwise import cosine_similarity  # 첫 화면 표시를 늦추지 않도록 처음 사용할 때 불러옴
+    q_vec = vectorizer.transform([query])
+    sims = cosine_similarity(q_vec, tfidf_matrix).flatten()
+    indices = sims.argsort()[-top_k:][::-1]
+    sel = [(float(sims[i]), text_chunks[i]) for i in indices if sims[i] > threshold]
+    if not sel:
+        sel = [(float(sims[i]), text_chunks[i]) for i in indices]
+    return sel
+
+# 쿼리 유사 청크 검색
+@traced("retrieval.search")
+def search_relevant_chunks(query, vectorizer, tfidf_matrix, text_chunks, top_k=3, threshold=0.005):
+    sel = rank_relevant_chunks(query, vectorizer, tfidf_matrix, text_chunks, top_k, threshold)
+    return "\n\n".join(chunk for _, chunk in sel)
+
+# 법령별 검색 색인 반환 (공유 코퍼스)
+@traced("retrieval.index", record_args=("law_name",))
+def get_law_embeddings(law_name):
+    return get_corpus().index(law_name)
+
+# --- 서버 시작 시 준비 작업 ---
+# 모두 프로세스 공유 싱글턴이므로 준비 중에 질문이 들어와도 중복 생성되지 않고 완료를 기다린다.
+WARMUP_STEPS = [
+    ("law_corpus", get_corpus),                                        # 자료 PDF 추출 및 TF-IDF 색인
+    ("relationship_graph", lambda: get_relationship_graph(SUPPLIERS_INFO)),  # 기업 관계 그래프
+    ("async_runtime", get_async_runtime),                              # 웹 검색용 이벤트 루프
+    ("llm_backend", get_backend),                                      # LLM 백엔드
+]
+
+def start_warmup():
+    """
+    백그라운드 준비 작업을 시작하는 함수 (프로세스당 한 번만 실행)
+    """
+    return get_warmup(WARMUP_STEPS).start()
+
+def wait_until_ready(timeout=None):
+    """
+    준비 작업이 끝날 때까지 기다리는 함수
+    """
+    return get_warmup(WARMUP_STEPS).wait_until_ready(timeout)
+
+def readiness():
+    """
+    준비 상태(상태 점검 정보)를 반환하는 함수
+    """
+    return get_warmup(WARMUP_STEPS).health()
+
+# --- 컨텍스트 패킹 모드 설정 ---
+PIPELINE_MODE_MULTI_AGENT = "multi_agent"  # 문서별 에이전트 + 헤드 에이전트
+PIPELINE_MODE_PACKED = "packed"            # 전체 문서 청크를 단일 프롬프트로 패킹
+PIPELINE_MODE_LABELS = {
+    PIPELINE_MODE_MULTI_AGENT: "문서별 에이전트 + 헤드 에이전트",
+    PIPELINE_MODE_PACKED: "컨텍스트 패킹 (단일 호출)",
+}
+PACKED_CONTEXT_TOKEN_BUDGET = 30000  # 패킹 프롬프트 전체 토큰 예산
+PACKED_CHUNKS_PER_DOCUMENT = 3       # 문서당 후보 청크 수
+CHARS_PER_TOKEN = 1.5                # 한국어 혼합 텍스트 기준 보수적 토큰 추정치
+
+def estimate_tokens(text):
+    """
+    문자 수 기반으로 토큰 수를 추정하는 함수 (API 호출 없이 예산 계산용)
+    """
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+@traced("retrieval.pack")
+def build_packed_context(question, history="", token_budget=PACKED_CONTEXT_TOKEN_BUDGET,
+                         per_document=PACKED_CHUNKS_PER_DOCUMENT):
+    """
+    모든 문서의 상위 청크를 출처 태그와 함께 하나의 컨텍스트로 묶는 함수
+    예산을 넘으면 유사도가 낮은 청크부터 제외하며, 자료 PDF가 없는 문서는 건너뜀
+    
+    Args:
+        question (str): 사용자 질문
+        history (str): 이전 대화 (토큰 예산 계산에 포함)
+        token_budget (int): 프롬프트 전체 토큰 예산
+        per_document (int): 문서당 후보 청크 수
+    
+    Returns:
+        dict: 패킹된 컨텍스트, 출처 목록, 제외한 청크 수, 예산 초과 여부(청크가 하나도 들어가지 않은 경우)
+    """
+    corpus = get_corpus()
+    candidates = []
+    for category in LAW_CATEGORIES.values():
+        for law_name in category:
+            if law_name not in corpus:
+                continue
+            vec, mat, chunks = get_law_embeddings(law_name)
+            for score, chunk in rank_relevant_chunks(question, vec, mat, chunks, top_k=per_document):
+                candidates.append((score, law_name, chunk))
+    
+    # 문서와 관계없이 유사도 높은 청크부터 채우고, 예산을 넘는 지점부터 낮은 순위 청크는 제외
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    remaining = token_budget - estimate_tokens(question) - estimate_tokens(history) - 1000  # 지침 분량
+    
+    source_tags = {}
+    packed_chunks = []
+    for score, law_name, chunk in candidates:
+        cost = estimate_tokens(chunk)
+        if cost > remaining:
+            break
+        remaining -= cost
+        if law_name not in source_tags:
+            source_tags[law_name] = f"S{len(source_tags) + 1}"
+        packed_chunks.append((source_tags[law_name], law_name, chunk))
+    
+    context = "\n\n".join(f"[{tag}] {law_name}\n{chunk}" for tag, law_name, chunk in packed_chunks)
+    return {
+        "context": context,
+        "sources": [{"tag": tag, "law_name": law_name} for law_name, tag in source_tags.items()],
+        "chunk_count": len(packed_chunks),
+        "dropped": len(candidates) - len(packed_chunks),
+        "overflow": bool(candidates) and not packed_chunks
+    }
+
+@traced("packed_answer")
+def get_packed_response(question, history, packed):
+    """
+    패킹된 컨텍스트로 단일 LLM 호출하여 출처가 인용된 답변을 생성하는 함수
+    """
+    source_list = "\n".join(f"- [{s['tag']}] {s['law_name']}" for s in packed["sources"])
+    prompt = f"""
+당신은 중국산 인쇄제판용 평면모양 사진플레이트 덤핑 전문가입니다. 아래 자료는 여러 문서에서 질문과 관련된 부분만 발췌한 것이며, 각 발췌문 앞에 출처 태그([S1] 등)가 붙어 있습니다.
+
+# 출처 목록
+{source_list}
+
+# 발췌 자료
+{packed["context"]}
+
+{mentioned_supplier_rates(question)}
+
+이전 대화:
+{history}
+
+질문: {question}
+
+# 응답 지침
+1. 답변 구조:
+   - 핵심 답변 (2-3문장으로 질문의 핵심을 먼저 답변)
+   - 상세 설명 (관련 법령, 규정, 판정 내용을 인용하여 구체적 설명)
+   - 참고 사항 (주의사항이나 예외사항이 있다면 명시)
+
+2. 인용 요구사항:
+   - 자료에 근거한 모든 문장 끝에 해당 출처 태그를 표시 (예: [S1], [S2])
+   - 발췌 자료에 없는 내용은 추측하지 말고 자료에서 확인되지 않는다고 명시
+   - 관련 조항은 조항 번호와 함께 인용
+
+3. 형식:
+   - 중요 수치, 기한, 조항은 굵게 강조
+   - 전문 용어는 풀어서 설명
+"""
+    model = get_model()
+    result = generate_content_with_retry(model, prompt, agent="packed")
+    if not result:
+        return "답변을 생성할 수 없습니다. 잠시 후 다시 시도해주세요."
+    return f"{result.text}\n\n**참고 자료**\n{source_list}"
+
+# Gemini 모델 반환 함수 수정
+def get_model():
+    return get_model_with_retry()
+
+@traced("summarize", record_args=("pdf_path",))
+def summarize_pdf_content(pdf_path, chunk_size=3000):
+    """
+    PDF 문서의 내용을 요약하는 함수
+    
+    Args:
+        pdf_path (str): PDF 파일 경로
+        chunk_size (int): 각 청크의 크기
+    
+    Returns:
+        str: 요약된 내용
+    """
+    try:
+        # PDF 텍스트 (공유 코퍼스에 있으면 다시 추출하지 않음)
+        law_name = next((name for name, path in law_pdf_files().items() if path == pdf_path), None)
+        full_text = get_corpus().texts.get(law_name) if law_name else None
+        if full_text is None:
+            full_text = extract_text_from_pdf(pdf_path)
+        if not full_text:
+            return "PDF 내용을 추출할 수 없습니다."
+
+        # 텍스트를 청크로 분할
+        chunks = []
+        for i in range(0, len(full_text), chunk_size):
+            chunk = full_text[i:i + chunk_size]
+            if len(chunk.strip()) > 100:  # 의미 있는 내용이 있는 청크만 포함
+                chunks.append(chunk)
+
+        # 각 청크 요약
+        model = get_model()
+        summaries = []
+        
+        for chunk in chunks:
+            prompt = f"""
+다음 텍스트를 요약해주세요. 핵심 내용만 간단명료하게 작성하되, 중요한 수치나 결정사항은 반드시 포함해주세요.
+
+텍스트:
+{chunk}
+
+요약 형식:
+- bullet point 형식으로 작성
+- 각 요점은 1-2문장으로 제한
+- 중요 수치와 결정사항 강조
+"""
+            result = generate_content_with_retry(model, prompt, agent="summarizer", document=law_name)
+            if result:
+                summaries.append(result.text)
+            time.sleep(1)  # API 호출 제한 방지
+
+        # 전체 요약 생성
+        if not summaries:
+            return "문서 요약을 생성할 수 없습니다."
+
+        final_summary_prompt = f"""
+다음은 문서의 각 부분 요약입니다. 이를 바탕으로 전체 문서의 핵심 내용을 종합적으로 요약해주세요.
+
+각 부분 요약:
+{' '.join(summaries)}
+
+요약 형식:
+1. 문서 개요 (1-2문장)
+2. 주요 결정사항 (bullet points)
+3. 중요 수치 및 데이터 (bullet points)
+4. 결론 (1-2문장)
+"""
+        final_result = generate_content_with_retry(model, final_summary_prompt, agent="summarizer", document=law_name)
+        return final_result.text if final_result else "최종 요약을 생성할 수 없습니다."
+
+    except Exception as e:
+        return f"요약 중 오류가 발생했습니다: {str(e)}"
+
+# 빠른 요약 생성 함수
+@traced("quick_summary")
+def generate_quick_summary(responses, question):
+    """
+    수집된 응답들을 빠르게 요약하는 함수
+    """
+    if not responses:
+        return get_quick_response(question)
+    
+    # 응답의 관련성 점수 계산
+    scored_responses = []
+    for law_name, response in responses:
+        # 응답 텍스트에서 질문 키워드 매칭 수 계산
+        question_keywords = set(re.findall(r'\w+', question.lower()))
+        response_text = response.lower()
+        matched_keywords = sum(1 for keyword in question_keywords 
+                             if len(keyword) > 1 and keyword in response_text)
+        relevance_score = matched_keywords / len(question_keywords) if question_keywords else 0
+        
+        # 응답 길이도 점수에 반영 (너무 짧은 응답은 제외)
+        length_score = min(len(response) / 1000, 1.0)  # 1000자를 기준으로 정규화
+        
+        total_score = (relevance_score * 0.7) + (length_score * 0.3)  # 관련성 70%, 길이 30% 반영
+        scored_responses.append((law_name, response, total_score))
+    
+    # 점수가 높은 순으로 정렬
+    scored_responses.sort(key=lambda x: x[2], reverse=True)
+    
+    # 상위 2개 응답만 선택
+    top_responses = scored_responses[:2]
+    
+    # 요약 생성
+    summary_parts = []
+    for law_name, response, score in top_responses:
+        # 응답에서 핵심 문장 추출 (처음 2-3문장)
+        sentences = re.split(r'[.!?]\s+', response)
+        key_sentences = sentences[:3]
+        summary = '. '.join(key_sentences) + '.'
+        
+        summary_parts.append(f"[{law_name}]\n{summary}")
+    
+    formatted_summary = "\n\n".join(summary_parts)
+    
+    return f"""
+시간 제한으로 인해 현재까지 찾은 가장 관련성 높은 정보를 기반으로 답변 드립니다.
+더 자세한 정보를 원하시면 추가 질문을 해주세요.
+
+{formatted_summary}
+"""
+
+# --- 질문 의도 라우팅 (공급자/세율 질문은 LLM 없이 즉시 답변) ---
+INTENT_RATE = "rate"                # 공급자별 세율 질문
+INTENT_RELATED = "related"          # 관계사 목록 질문
+INTENT_LLM = "llm"                  # 에이전트 파이프라인이 필요한 질문
+
+RATE_INTENT_KEYWORDS = ["세율", "관세율", "덤핑률", "몇 %", "몇%", "몇 퍼센트", "tax rate", "duty rate", "税率"]
+RELATED_INTENT_KEYWORDS = ["관계사", "계열사", "관련 회사", "관련회사", "related compan", "关联公司"]
+OTHER_SUPPLIER_KEYWORDS = ["그 밖의 공급자", "그밖의 공급자", "기타 공급자", "다른 공급자"]
+RATE_TABLE_KEYWORDS = ["공급자별", "업체별", "회사별", "전체", "모든", "각 공급자"]
+# 공급자 둘 이상을 비교하거나 고르는 질문은 세율을 넣어 LLM에 맡김 ("화펑과 러차이 중 세율이 높은 곳은?")
+COMPARISON_KEYWORDS = ["높은", "낮은", "높아", "낮아", "큰 곳", "작은 곳", "중 어디", "중 어느", "어느 쪽", "어느 곳",
+                       "보다", "차이", "비교", "higher", "lower", "compare", "difference", "versus", "vs", "比较"]
+COMPARISON_PATTERN = re.compile("|".join(
+    rf"\b{re.escape(keyword)}\b" if keyword.isascii() else re.escape(keyword) for keyword in COMPARISON_KEYWORDS
+))
+# 해석·설명이 필요한 질문은 공급자 표만으로 답하지 않음
+LLM_ONLY_KEYWORDS = ["왜", "이유", "근거가", "산정", "계산 방법", "판정", "절차", "설명해", "비교해", "요약", "정리",
+                     "특수관계", "해당하는지", "해당되나", "적용되나", "적용되는지", "how", "why"]
+# 영문 키워드는 단어 단위로만 확인 ("show"의 "how"는 제외)
+LLM_ONLY_PATTERN = re.compile("|".join(
+    rf"\b{re.escape(keyword)}\b" if keyword.isascii() else re.escape(keyword) for keyword in LLM_ONLY_KEYWORDS
+))
+
+@traced("route")
+def route_question(question):
+    """
+    질문을 공급자 표로 즉시 답변할 수 있는지 판단하는 함수
+    
+    Args:
+        question (str): 사용자 질문
+    
+    Returns:
+        dict: 의도(intent)와 질문에서 찾은 공급자 목록(supplier_keys)
+    """
+    question_lower = question.lower()
+    route = {"intent": INTENT_LLM, "supplier_keys": [], "matches": {}, "include_other": False}
+    if LLM_ONLY_PATTERN.search(question_lower):
+        return route
+    
+    for match in SUPPLIER_INDEX.find_all(question):
+        route["matches"].setdefault(match.supplier_key, match)
+    supplier_keys = list(route["matches"])
+    route["supplier_keys"] = supplier_keys
+    route["include_other"] = any(keyword in question for keyword in OTHER_SUPPLIER_KEYWORDS)
+    
+    if len(supplier_keys) + route["include_other"] >= 2:
+        # 공급자명 안의 글자("러차이"의 "차이")가 비교 표현으로 잡히지 않도록 제외하고 확인
+        remainder = question_lower
+        for match in route["matches"].values():
+            remainder = remainder.replace(match.alias.lower(), " ")
+        if COMPARISON_PATTERN.search(remainder):
+            return route
+    if any(keyword in question_lower for keyword in RELATED_INTENT_KEYWORDS) and supplier_keys:
+        route["intent"] = INTENT_RELATED
+    elif any(keyword in question_lower for keyword in RATE_INTENT_KEYWORDS):
+        # 공급자를 특정하지 않은 세율 질문은 전체 세율표를 묻는 경우에만 즉시 답변
+        # (표에 없는 회사의 세율은 특수관계 검토가 필요하므로 에이전트에 맡김)
+        if supplier_keys or route["include_other"] or any(keyword in question for keyword in RATE_TABLE_KEYWORDS):
+            route["intent"] = INTENT_RATE
+    return route
+
+def format_supplier_rate_table():
+    """
+    공급자별 덤핑방지관세율 표를 마크다운으로 만드는 함수
+    """
+    lines = ["| 공급자 | 적용 대상 | 세율 |", "|---|---|---|"]
+    for supplier in SUPPLIERS_INFO["MAJOR_SUPPLIERS"].values():
+        lines.append(f"| {supplier['name_kr']} ({supplier['name_en']}) | {supplier['description']} | **{supplier['rate']:.2f}%** |")
+    lines.append(f"| {SUPPLIERS_INFO['OTHER_SUPPLIERS_DESCRIPTION']} | - | **{SUPPLIERS_INFO['OTHER_SUPPLIERS_RATE']:.2f}%** |")
+    return "\n".join(lines)
+
+@traced("supplier_table")
+def answer_from_supplier_table(route):
+    """
+    라우팅 결과를 바탕으로 SUPPLIERS_INFO에서 바로 답변을 만드는 함수 (LLM 호출 없음)
+    """
+    parts = []
+    if route["intent"] == INTENT_RELATED:
+        for supplier_key in route["supplier_keys"]:
+            supplier = SUPPLIER_INDEX.supplier(supplier_key)
+            related = supplier.get("related_companies", [])
+            parts.append(f"### {supplier['name_kr']} ({supplier['name_en']})")
+            parts.append(f"- 덤핑방지관세율: **{supplier['rate']:.2f}%** ({supplier['description']})")
+            if related:
+                parts.append("- 같은 세율이 적용되는 관계사:")
+                parts.extend(f"  - {company}" for company in related)
+            else:
+                parts.append("- 규칙에 별도로 열거된 관계사가 없습니다.")
+    elif route["supplier_keys"]:
+        for supplier_key in route["supplier_keys"]:
+            supplier = SUPPLIER_INDEX.supplier(supplier_key)
+            parts.append(
+                f"**{supplier['name_kr']}**({supplier['name_en']})의 덤핑방지관세율은 **{supplier['rate']:.2f}%**입니다."
+            )
+            parts.append(f"- 적용 대상: {supplier['description']}")
+            match = route["matches"][supplier_key]
+            if match.alias_type == "related_company":
+                parts.append(f"- '{match.alias}'은(는) {supplier['name_kr']}의 관계사로 같은 세율이 적용됩니다.")
+        if route["include_other"]:
+            parts.append(
+                f"- {SUPPLIERS_INFO['OTHER_SUPPLIERS_DESCRIPTION']}: **{SUPPLIERS_INFO['OTHER_SUPPLIERS_RATE']:.2f}%**"
+            )
+    else:
+        parts.append("공급자별 덤핑방지관세율은 다음과 같습니다.")
+        parts.append("")
+        parts.append(format_supplier_rate_table())
+    
+    parts.append("")
+    parts.append(f"**법적 근거**: {DUMPING_DUTY_LEGAL_BASIS}")
+    parts.append("")
+    parts.append("※ 공급자 세율표 기준 답변입니다. 특정 수출자의 특수관계 해당 여부 등은 구체적으로 질문해주세요.")
+    return "\n".join(parts)
+
+def mentioned_supplier_rates(question):
+    """
+    질문에 언급된 주요 공급자의 세율을 프롬프트에 넣을 문자열로 만드는 함수 (언급이 없으면 빈 문자열)
+    """
+    lines = []
+    for supplier_key in dict.fromkeys(match.supplier_key for match in SUPPLIER_INDEX.find_all(question)):
+        supplier = SUPPLIER_INDEX.supplier(supplier_key)
+        lines.append(
+            f"- {supplier['name_kr']} ({supplier['name_en']}): {supplier['rate']:.2f}% ({supplier['description']})"
+        )
+    if not lines:
+        return ""
+    lines.append(f"- {SUPPLIERS_INFO['OTHER_SUPPLIERS_DESCRIPTION']}: {SUPPLIERS_INFO['OTHER_SUPPLIERS_RATE']:.2f}%")
+    return "공급자 세율 정보 (공급자 세율표 기준, 이 수치를 그대로 사용):\n" + "\n".join(lines)
+
+def answer_question(session, question, detailed=None, listener=None):
+    """
+    UI 밖(API 서버, 일괄 질의응답)의 워커 스레드에서 질문 하나를 처리하는 함수
+    LLM 호출이 실패해 대체 문구로 답한 경우 session.llm_errors에 오류가 남는다.
+
+    Args:
+        session: new_session()으로 만든 세션 상태
+        question (str): 질문
+        detailed (bool, optional): process_user_input과 같음
+        listener (callable, optional): 진행 상황 수신 함수 listener(event, data)
+
+    Returns:
+        str: 답변
+    """
+    use_session(session)
+    if listener is not None:
+        set_progress_listener(listener)
+    # 준비 작업 중이면 완료를 기다림 (코퍼스를 중복으로 만들지 않음)
+    wait_until_ready()
+    history = conversation_history(question)
+    answer = asyncio.run(process_user_input(question, history, detailed=detailed))
+    if answer:
+        session.chat_history.extend([
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer},
+        ])
+    return answer
+
+# 비동기 처리를 위한 새로운 함수
+async def process_user_input(user_input, history, detailed=None):
+    """
+    사용자 질문에 대한 답변을 생성하는 함수
+    
+    Args:
+        user_input (str): 질문
+        history (str): 이전 대화
+        detailed (bool, optional): True면 항상 자료 기반 상세 답변, False면 항상 빠른 답변,
+            None이면 직전 질문과의 간격(30초)으로 결정
+    """
+    get_session().llm_errors = []
+    # 질문 하나 동안 같은 회사 조회 결과를 공유하고 토큰 사용량을 모음
+    with request_scope(), usage_scope() as usage:
+        trace = None
+        profile = None
+        try:
+            with ExitStack() as stack:
+                if profiling_enabled():
+                    profile = stack.enter_context(profile_run(question_id(user_input), PROFILE_DIR))
+                if tracing_enabled():
+                    trace = stack.enter_context(start_trace("process_user_input", question=user_input))
+                return await _process_user_input(user_input, history, detailed)
+        finally:
+            record_question_usage(usage)
+            if trace is not None:
+                record_trace(trace)
+            if profile is not None:
+                record_profile(profile)
+
+# --- 단계별 소요 시간 추적 ---
+TRACING_ENABLED = os.environ.get("TRACING", "") == "1"      # 모든 세션에서 추적
+TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH") or None  # 트레이스 JSON Lines 저장 경로
+
+def tracing_enabled():
+    """
+    현재 질문의 단계별 소요 시간을 기록할지 여부 (환경 변수 또는 세션 설정)
+    """
+    return TRACING_ENABLED or bool(get_session().get("tracing"))
+
+def record_trace(trace):
+    """
+    끝난 트레이스를 세션에 보관하고, 저장 경로가 지정되어 있으면 파일에 추가하는 함수
+    """
+    get_session().last_trace = trace
+    if TRACE_EXPORT_PATH:
+        try:
+            export_trace(trace, TRACE_EXPORT_PATH)
+        except OSError as e:
+            print(f"Error exporting trace: {str(e)}")
+
+# --- 질문별 CPU 프로파일링 ---
+PROFILING_ENABLED = os.environ.get("PROFILING", "") == "1"           # 모든 질문을 프로파일링
+PROFILE_DIR = os.environ.get("PROFILE_DIR", DEFAULT_PROFILE_DIR) or None  # .prof 저장 폴더 (빈 값이면 저장 안 함)
+
+def question_id(question):
+    """
+    질문 내용으로 안정적인 질문 ID를 만드는 함수 (정규화 후 해시, 프로파일 파일/일괄 답변 결과에서 사용)
+    """
+    return hashlib.sha256(normalize_query(question).encode("utf-8")).hexdigest()[:12]
+
+def profiling_enabled():
+    """
+    현재 질문을 CPU 프로파일링할지 여부 (환경 변수 또는 세션 설정)
+    """
+    return PROFILING_ENABLED or bool(get_session().get("profiling"))
+
+def record_profile(profile):
+    """
+    끝난 CPU 프로파일을 세션에 보관하는 함수 (파일 저장은 profile_run에서 처리)
+    """
+    get_session().last_profile = profile
+
+async def _process_user_input(user_input, history, detailed=None):
+    session = get_session()
+    
+    # 현재 시간과 마지막 질문 시간의 차이 계산
+    current_time = time.time()
+    if detailed is not None:
+        session.is_followup_question = detailed
+    elif session.last_question_time:
+        time_diff = current_time - session.last_question_time
+        session.is_followup_question = time_diff < 30
+    
+    # 공급자/세율 질문은 공급자 표에서 즉시 답변
+    route = route_question(user_input)
+    emit_progress("route", intent=route["intent"], suppliers=route["supplier_keys"])
+    if route["intent"] != INTENT_LLM:
+        session.last_question_time = current_time
+        return answer_from_supplier_table(route)
+    
+    # 1차 질문인 경우 빠른 응답 생성
+    if not session.is_followup_question:
+        emit_progress("quick_response")
+        try:
+            async with asyncio.timeout(INITIAL_RESPONSE_TIMEOUT):
+                # 빠른 초기 응답 생성
+                answer = get_quick_response(user_input)
+                session.last_question_time = current_time
+                return answer
+        except asyncio.TimeoutError:
+            record_llm_failure("quick_response: 응답 시간 초과")
+            return "죄송합니다. 응답 시간이 초과되었습니다. 다시 질문해주세요."
+    
+    # 대기 중인 상세 답변이 너무 많으면 빠른 답변으로 대신함 (부하 차단)
+    if should_shed_load():
+        emit_progress("shed", waiting=get_question_scheduler().waiting)
+        session.last_question_time = current_time
+        return f"{LOAD_SHED_NOTICE}\n\n{get_quick_response(user_input)}"
+    
+    # 후속 질문인 경우 선택된 답변 생성 방식 사용 (동시 실행 수 제한, 사용자별 순서 대기)
+    with question_slot():
+        emit_progress("pipeline", mode=session.pipeline_mode)
+        if session.pipeline_mode == PIPELINE_MODE_PACKED:
+            answer = await run_packed_pipeline(user_input, history)
+        else:
+            answer = await run_multi_agent_pipeline(user_input, history)
+    
+    session.last_question_time = current_time
+    return answer
+
+LOAD_SHED_NOTICE = "※ 현재 질문이 많아 간단한 답변을 먼저 드립니다. 잠시 후 다시 질문하시면 자료 기반의 자세한 답변을 드립니다."
+
+def should_shed_load():
+    """
+    대기 중인 상세 답변 수가 부하 차단 기준 이상인지 여부
+    """
+    depth = shed_queue_depth()
+    return depth > 0 and get_question_scheduler().waiting >= depth
+
+@contextmanager
+def question_slot():
+    """
+    상세 답변 실행 자리를 얻을 때까지 기다리는 함수 (대기 중에는 "queued" 진행 상황으로 순번 알림)
+    """
+    scheduler = get_question_scheduler()
+    with span("queue.wait") as wait_span:
+        waited = scheduler.acquire(
+            current_session_id(), on_wait=lambda position: emit_progress("queued", position=position)
+        )
+        wait_span.set(waited=round(waited, 3))
+    if waited:
+        emit_progress("admitted", waited=round(waited, 3))
+    try:
+        yield
+    finally:
+        scheduler.release()
+
+@traced("pipeline.multi_agent")
+async def run_multi_agent_pipeline(user_input, history):
+    """
+    문서별 에이전트 응답을 모아 헤드 에이전트가 통합 답변을 생성하는 기존 방식
+    """
+    relevant_categories = analyze_question_categories(user_input)
+    partial_responses = []
+    found_relevant_answer = False
+    
+    try:
+        async with asyncio.timeout(FOLLOWUP_RESPONSE_TIMEOUT):
+            # 우선순위가 높은 카테고리부터 처리
+            for category in sorted(relevant_categories, key=lambda x: CATEGORY_PRIORITY[x]):
+                if found_relevant_answer:
+                    break
+                    
+                async for response in stream_agent_responses(user_input, history, category):
+                    partial_responses.append(response)
+                    relevant = is_response_relevant(response[1], user_input)
+                    emit_progress("agent_response", law_name=response[0], relevant=relevant)
+                    if relevant:
+                        found_relevant_answer = True
+                        break
+            
+            if not found_relevant_answer:
+                remaining_categories = set(LAW_CATEGORIES.keys()) - set(relevant_categories)
+                for category in sorted(remaining_categories, key=lambda x: CATEGORY_PRIORITY[x]):
+                    async for response in stream_agent_responses(user_input, history, category):
+                        partial_responses.append(response)
+                        emit_progress("agent_response", law_name=response[0], relevant=False)
+            
+            emit_progress("head_agent", responses=len(partial_responses))
+            answer = get_head_agent_response(partial_responses, user_input, history)
+            
+    except asyncio.TimeoutError:
+        record_llm_failure("multi_agent: 응답 시간 초과")
+        if partial_responses:
+            answer = generate_quick_summary(partial_responses, user_input)
+        else:
+            answer = get_quick_response(user_input)
+    return answer
+
+@traced("pipeline.packed")
+async def run_packed_pipeline(user_input, history):
+    """
+    모든 문서의 상위 청크를 하나의 프롬프트로 묶어 단일 호출로 답변하는 방식
+    예산에 맞지 않는 낮은 순위 청크는 제외하고, 청크가 하나도 들어가지 않을 때만 문서별 에이전트 방식으로 전환
+    """
+    packed = build_packed_context(user_input, history)
+    emit_progress("packed_context", chunks=packed["chunk_count"], dropped=packed["dropped"],
+                  overflow=packed["overflow"], sources=packed["sources"])
+    if packed["overflow"]:
+        return await run_multi_agent_pipeline(user_input, history)
+    
+    try:
+        async with asyncio.timeout(FOLLOWUP_RESPONSE_TIMEOUT):
+            return get_packed_response(user_input, history, packed)
+    except asyncio.TimeoutError:
+        record_llm_failure("packed: 응답 시간 초과")
+        return get_quick_response(user_input)
+
+async def benchmark_pipeline_modes(question, history):
+    """
+    동일한 질문을 두 가지 답변 생성 방식으로 실행하여 지연 시간과 토큰 사용량을 비교하는 함수
+    
+    Returns:
+        list: 방식별 측정 결과
+    """
+    session = get_session()
+    results = []
+    runners = [
+        (PIPELINE_MODE_MULTI_AGENT, run_multi_agent_pipeline),
+        (PIPELINE_MODE_PACKED, run_packed_pipeline),
+    ]
+    # 벤치마크 호출도 세션 사용량에 포함
+    with usage_scope() as benchmark_usage:
+        try:
+            for mode, runner in runners:
+                started = time.perf_counter()
+                with usage_scope() as usage:
+                    await runner(question, history)
+                elapsed = time.perf_counter() - started
+                tally = usage.total
+                results.append({
+                    "답변 생성 방식": PIPELINE_MODE_LABELS[mode],
+                    "지연 시간(초)": round(elapsed, 2),
+                    "LLM 호출 수": tally.calls,
+                    "입력 토큰": tally.prompt_tokens,
+                    "출력 토큰": tally.response_tokens,
+                    "전체 토큰": tally.total_tokens,
+                    "추정 비용(USD)": round(tally.cost, 4)
+                })
+        finally:
+            session.usage.merge(benchmark_usage)
+    return results
+
+def analyze_question_categories(question):
+    """
+    질문을 분석하여 관련된 카테고리를 우선순위대로 반환
+    """
+    relevant_categories = []
+    question_lower = question.lower()
+    
+    # 카테고리별 키워드 매칭
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(keyword in question_lower for keyword in keywords):
+            relevant_categories.append(category)
+    
+    # 매칭된 카테고리가 없으면 기본 우선순위 반환
+    if not relevant_categories:
+        return list(CATEGORY_PRIORITY.keys())
+    
+    return relevant_categories
+
+def is_response_relevant(response, question):
+    """
+    응답의 관련성을 검사하는 함수
+    """
+    # 응답이 너무 짧으면 관련성이 낮다고 판단
+    if len(response) < 100:
+        return False
+        
+    # 질문의 주요 키워드가 응답에 포함되어 있는지 확인
+    question_keywords = set(re.findall(r'\w+', question.lower()))
+    response_text = response.lower()
+    
+    # 핵심 키워드 매칭 수 계산
+    matched_keywords = sum(1 for keyword in question_keywords 
+                         if len(keyword) > 1 and keyword in response_text)
+    
+    # 키워드 매칭 비율이 30% 이상이면 관련성이 높다고 판단
+    return matched_keywords / len(question_keywords) >= 0.3 if question_keywords else False
+
+async def stream_agent_responses(question, history, category):
+    """
+    특정 카테고리의 문서에 대해서만 응답을 생성하는 함수
+    """
+    for law_name, pdf_path in LAW_CATEGORIES[category].items():
+        try:
+            response = await asyncio.wait_for(
+                get_law_agent_response_async(law_name, question, history),
+                timeout=1.0  # 각 문서당 1초로 제한
+            )
+            yield response
+        except asyncio.TimeoutError:
+            continue
+        except Exception as e:
+            print(f"Error processing {law_name}: {str(e)}")
+            continue
+
+@traced("quick_response")
+def get_quick_response(question):
+    """
+    빠른 초기 응답을 생성하는 함수
+    """
+    model = get_model()
+    prompt = f"""
+다음 질문에 대해 10초 이내로 핵심적인 답변만 간단히 제공해주세요.
+필요한 경우 "더 자세한 정보를 원하시면 추가 질문을 해주세요"라는 문구를 포함해주세요.
+
+{mentioned_supplier_rates(question)}
+
+질문: {question}
+
+답변 형식:
+1. 핵심 답변 (1-2문장)
+2. 관련 키워드
+3. 추가 질문 유도
+"""
+    try:
+        result = generate_content_with_retry(model, prompt, agent="quick_response")
+        return result.text if result else "죄송합니다. 빠른 답변을 생성할 수 없습니다. 다시 질문해주세요."
+    except Exception as e:
+        record_llm_failure(f"quick_response: {e}")
+        return f"죄송합니다. 오류가 발생했습니다: {str(e)}"
+
+# 법령별 에이전트 응답 (async) 수정
+@traced("agent", record_args=("law_name",))
+async def get_law_agent_response_async(law_name, question, history):
+    vec, mat, chunks = get_law_embeddings(law_name)
+    
+    # 문서 요약 요청 확인
+    if "요약" in question.lower() or "정리" in question.lower():
+        pdf_path = None
+        for category in LAW_CATEGORIES.values():
+            if law_name in category:
+                pdf_path = category[law_name]
+                break
+        
+        if pdf_path:
+            summary = summarize_pdf_content(pdf_path)
+            return law_name, summary
+    
+    context = search_relevant_chunks(question, vec, mat, chunks)
+    
+    # 질문에 언급된 공급자의 세율 정보 (언급이 없으면 전체 세율표)
+    supplier_info = None
+    mentioned = {m.supplier_key: m.alias for m in SUPPLIER_INDEX.find_all(question)}
+    if mentioned:
+        supplier_info = [get_dumping_rate(alias, use_web_search=False) for alias in mentioned.values()]
+    elif any(keyword in question.lower() for keyword in ["공급자", "수출자", "제조자", "세율", "관세율"]):
+        supplier_info = format_supplier_rate_table()
+    
+    prompt = f"""
+당신은 중국산 인쇄제판용 평면모양 사진플레이트 덤핑 전문가입니다. 주어진 모든 자료를 종합적으로 분석하여 답변해주세요.
+
+아래는 질문과 관련된 자료 내용입니다:
+{context}
+
+{"공급자 세율 정보:" + str(supplier_info) if supplier_info else ""}
+
+이전 대화:
+{history}
+
+질문: {question}
+
+# 응답 지침
+1. 답변 구조:
+   - 핵심 내용 요약 (2-3문장)
+   - 법적 근거 (관련 조항 구체적 인용)
+   - 세부 설명 (실무적 관점 포함)
+   - 예외사항 또는 주의사항
+
+2. 형식:
+   - 중요 수치, 기한, 조항은 굵게 강조
+   - 전문 용어는 풀어서 설명
+   - 단계적 설명이 필요한 경우 번호 매기기
+   - 관련 조항은 정확한 출처와 함께 인용
+
+3. 내용:
+   - 해당 법령의 특수성 반영
+   - 다른 법령과의 관계 설명
+   - 실무적 적용 방법 제시
+   - 최신 개정사항 반영
+
+4. 실용성:
+   - 실제 사례 연계 (가능한 경우)
+   - 실무자 관점의 해석 추가
+   - 구체적인 적용 방법 설명
+   - 관련 판례나 결정례 인용
+
+5. 전문성:
+   - 국제무역법적 맥락 고려
+   - 산업 특성 반영
+   - WTO 협정 등 국제규범과의 관계
+   - 유사 사례나 비교법적 분석
+"""
+    model = get_model()
+    result = generate_content_with_retry(model, prompt, agent="law_agent", document=law_name)
+    return law_name, result.text if result else "답변을 생성할 수 없습니다."
+
+# --- 헤드 에이전트 입력 압축 설정 ---
+EVIDENCE_MAX_SENTENCES = 40      # 헤드 에이전트에 전달할 최대 문장 수
+EVIDENCE_DEDUP_THRESHOLD = 0.8   # 이 값 이상 유사한 문장은 중복으로 간주
+EVIDENCE_MIN_SENTENCE_LENGTH = 15
+
+def split_sentences(text):
+    """
+    에이전트 답변을 문장 단위로 분리하는 함수 (줄바꿈 및 문장부호 기준)
+    """
+    sentences = []
+    for part in re.split(r'(?<=[.!?])\s+|\n+', text):
+        sentence = part.strip().strip("-*# ").strip()
+        if len(sentence) >= EVIDENCE_MIN_SENTENCE_LENGTH:
+            sentences.append(sentence)
+    return sentences
+
+@traced("head_agent.compress")
+def compress_agent_responses(responses, question, max_sentences=EVIDENCE_MAX_SENTENCES,
+                             dedup_threshold=EVIDENCE_DEDUP_THRESHOLD):
+    """
+    에이전트 답변들에서 질문과 관련된 문장만 남기고 중복 문장을 제거하는 함수 (LLM 호출 없음)
+    
+    Args:
+        responses (list): (법령명, 답변) 튜플 목록
+        question (str): 사용자 질문
+        max_sentences (int): 남길 최대 문장 수
+        dedup_threshold (float): 중복 판단 코사인 유사도 기준
+    
+    Returns:
+        list: (법령명, 압축된 근거) 튜플 목록
+    """
+    sentences = []
+    for order, (law_name, response) in enumerate(responses):
+        for sentence in split_sentences(response):
+            sentences.append((order, law_name, sentence))
+    if len(sentences) <= 1:
+        return responses
+    
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    
+    # 문자 n-gram TF-IDF: 띄어쓰기와 조사 변화가 많은 한국어 문장 비교용
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3))
+    try:
+        matrix = vectorizer.fit_transform([s for _, _, s in sentences] + [question])
+    except ValueError:
+        return responses
+    sentence_matrix = matrix[:-1]
+    relevance = cosine_similarity(sentence_matrix, matrix[-1]).flatten()
+    pairwise = cosine_similarity(sentence_matrix)
+    
+    # 관련성 높은 문장부터 선택하되 이미 선택된 문장과 겹치는 문장은 제외
+    selected = []
+    for idx in relevance.argsort()[::-1]:
+        if len(selected) >= max_sentences:
+            break
+        if any(pairwise[idx, j] >= dedup_threshold for j in selected):
+            continue
+        selected.append(idx)
+    
+    # 문서 순서와 문서 내 문장 순서 유지
+    evidence = {}
+    for idx in sorted(selected):
+        order, law_name, sentence = sentences[idx]
+        evidence.setdefault((order, law_name), []).append(f"- {sentence}")
+    return [(law_name, "\n".join(lines)) for (_, law_name), lines in sorted(evidence.items())]
+
+# 헤드 에이전트 통합 답변 수정
+@traced("head_agent")
+def get_head_agent_response(responses, question, history):
+    evidence = compress_agent_responses(responses, question)
+    combined = "\n\n".join([f"=== {n} 관련 정보 ===\n{r}" for n, r in evidence])
+    prompt = f"""
+당신은 중국산 인쇄제판용 평면모양 사진플레이트 덤핑 전문가입니다. 여러 자료의 정보를 통합하여 포괄적이고 정확한 답변을 제공합니다.
+
+{combined}
+
+{mentioned_supplier_rates(question)}
+
+이전 대화:
+{history}
+
+질문: {question}
+
+# 응답 지침
+1. 답변은 다음 구조로 작성하세요:
+   - 핵심 답변 (2-3문장으로 질문의 핵심을 먼저 답변)
+   - 상세 설명 (관련 법령, 규정, 판례 등을 인용하여 구체적 설명)
+   - 관련 정보 (추가로 알아두면 좋은 정보나 연관된 내용)
+   - 참고 사항 (주의사항이나 예외사항이 있다면 명시)
+
+2. 형식 요구사항:
+   - 각 섹션은 명확한 제목으로 구분
+   - 중요한 수치나 날짜는 굵은 글씨로 강조
+   - 법령 인용 시 출처를 명확히 표시
+   - 목록화가 가능한 내용은 번호나 글머리 기호로 구분
+
+3. 내용 요구사항:
+   - 모든 주장에 대한 근거 제시
+   - 실무적으로 중요한 정보 강조
+   - 최신 개정사항이나 변경점 반영
+   - 실제 사례나 예시 포함 (가능한 경우)
+
+4. 전문성 요구사항:
+   - 전문 용어는 풀어서 설명
+   - 법적 해석이 필요한 경우 관련 법령 함께 제시
+   - 산업 현장의 실무적 관점 반영
+   - 국제무역법적 맥락 고려
+
+5. 가독성 요구사항:
+   - 단락을 적절히 구분하여 가독성 확보
+   - 복잡한 내용은 단계적으로 설명
+   - 필요시 표나 구분선 사용
+   - 전체적인 문맥의 흐름 유지
+"""
+    model = get_model()
+    result = generate_content_with_retry(model, prompt, agent="head_agent")
+    return result.text if result else "답변을 생성할 수 없습니다. 잠시 후 다시 시도해주세요."
+
+# 모든 에이전트 병렬 실행
+async def gather_agent_responses(question, history):
+    tasks = []
+    # 모든 카테고리의 모든 문서에 대해 태스크 생성
+    for category in LAW_CATEGORIES.values():
+        for law_name, pdf_path in category.items():
+            tasks.append(get_law_agent_response_async(law_name, question, history))
+    return await asyncio.gather(*tasks)
@@ -0,0 +1,114 @@
+"""
+질문별 CPU 프로파일링 (cProfile, 선택 실행)
+
+특정 질문이 느릴 때 CPU 시간이 어디에 쓰이는지(PDF 파싱, TF-IDF 변환, analyze_web_info의 정규식,
+JSON 처리 등) 확인하기 위해 process_user_input 한 번을 cProfile로 감싸 측정한다.
+- 결정적 프로파일러(cProfile)는 켠 스레드의 호출만 기록하므로, 질문을 처리하는 스레드의 이벤트 루프
+  (문서별 에이전트, 컨텍스트 패킹, 헤드 에이전트 등)가 모두 포함되고 다른 사용자의 질문은 섞이지 않는다
+  (공유 웹 검색 루프 스레드의 작업은 포함되지 않으며, 기다린 시간이 runtime.run 호출 시간으로 나타남)
+- 결과는 <저장 폴더>/<질문 ID>.prof 파일(pstats 형식)로 저장하여 snakeviz 등으로 자세히 분석
+- 상위 함수 목록(누적/자체 시간)은 화면에 바로 표시
+"""
+import cProfile
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_TOP = 25
+SORT_KEYS = {"cumulative": 3, "self": 2, "calls": 1}  # pstats 항목 (cc, nc, tt, ct) 위치
+
+
+def function_label(func):
+    """
+    pstats 함수 키 (파일, 줄, 함수명)를 "파일명:줄(함수명)" 형태로 만드는 함수 (내장 함수는 이름만)
+    """
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+class QuestionProfile:
+    """
+    질문 하나의 CPU 프로파일
+
+    Attributes:
+        question_id (str): 질문 ID
+        path (str): 저장한 .prof 파일 경로 (저장하지 않았으면 None)
+        duration (float): 측정한 시간 (초)
+        stats (pstats.Stats): 프로파일 통계 (측정이 끝나기 전에는 None)
+    """
+
+    def __init__(self, question_id, path=None):
+        self.question_id = question_id
+        self.path = path
+        self.duration = None
+        self.stats = None
+
+    @property
+    def total_calls(self):
+        return self.stats.total_calls if self.stats else 0
+
+    def top_functions(self, limit=DEFAULT_TOP, sort="cumulative"):
+        """
+        시간이 많이 걸린 함수 목록을 반환하는 함수
+
+        Args:
+            limit (int): 반환할 함수 수
+            sort (str): "cumulative"(하위 호출 포함), "self"(함수 자체), "calls"(호출 수)
+
+        Returns:
+            list: {"function", "calls", "self_time", "cumulative_time"} 목록
+        """
+        if self.stats is None:
+            return []
+        index = SORT_KEYS[sort]
+        entries = sorted(self.stats.stats.items(), key=lambda item: -item[1][index])[:limit]
+        return [
+            {
+                "function": function_label(func),
+                "calls": calls,
+                "self_time": round(self_time, 6),
+                "cumulative_time": round(cumulative_time, 6),
+            }
+            for func, (_, calls, self_time, cumulative_time, _) in entries
+        ]
+
+
+@contextmanager
+def profile_run(question_id, directory=DEFAULT_PROFILE_DIR):
+    """
+    with 블록을 cProfile로 측정하고 <directory>/<question_id>.prof로 저장하는 함수
+
+    Args:
+        question_id (str): 질문 ID (파일 이름)
+        directory (str, optional): 저장 폴더 (없으면 저장하지 않고 화면 표시용으로만 사용)
+
+    Yields:
+        QuestionProfile: 블록이 끝나면 stats/duration이 채워지는 프로파일
+    """
+    profile = QuestionProfile(question_id, os.path.join(directory, f"{question_id}.prof") if directory else None)
+    # 같은 스레드에 이미 다른 프로파일러가 켜져 있으면 덮어쓰지 않고 측정하지 않음
+    if sys.getprofile() is not None:
+        yield profile
+        return
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield profile
+    finally:
+        profiler.disable()
+        profile.duration = time.perf_counter() - started
+        profile.stats = pstats.Stats(profiler)
+        if profile.path:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                profile.stats.dump_stats(profile.path)
+            except OSError as e:
+                print(f"Error saving profile: {str(e)}")
+                profile.path = None
@@ -0,0 +1,308 @@
+"""
+기업 관계 그래프 (SQLite 저장 + 메모리 인접 목록)
+
+공급자 표의 관계사(related_companies)와 웹 검색에서 발견한 주주·자회사·모회사·주소 일치 관계를
+회사 노드와 유형이 있는 간선(근거, 출처, 시각 포함)으로 저장한다.
+- 회사 이름은 normalize_company_name으로 정규화하여 같은 회사의 여러 표기를 하나의 노드로 묶음
+- 시작 시 SQLite의 간선을 메모리 인접 목록으로 읽어 두고, 다중 홉 질의("X가 코닥에서 2단계 이내인가?")는
+  웹 검색 없이 메모리 BFS로 처리
+- 기본은 메모리 전용이며, RELATIONSHIP_GRAPH_PATH 환경 변수로 저장 파일을 지정하면 SQLite에 저장
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from supplier_index import normalize_company_name, split_related_company
+
+DEFAULT_GRAPH_PATH = None  # 저장 파일 (지정하지 않으면 메모리 전용)
+
+# 간선 유형
+EDGE_RELATED_COMPANY = "related_company"   # 공급자 표의 관계사
+EDGE_SHAREHOLDING = "shareholding"         # 주주/지분 관계
+EDGE_SUBSIDIARY = "subsidiary"             # 자회사/계열사 관계
+EDGE_PARENT = "parent"                     # 모회사 관계
+EDGE_ADDRESS_MATCH = "address_match"       # 주소 일치
+
+EDGE_LABELS = {
+    EDGE_RELATED_COMPANY: "관계사",
+    EDGE_SHAREHOLDING: "주주/지분 관계",
+    EDGE_SUBSIDIARY: "자회사 관계",
+    EDGE_PARENT: "모회사 관계",
+    EDGE_ADDRESS_MATCH: "주소 일치",
+}
+
+# check_special_relationship 결과의 관계 유형 → 간선 유형
+RELATIONSHIP_EDGE_TYPES = {
+    "shareholding": EDGE_SHAREHOLDING,
+    "subsidiary": EDGE_SUBSIDIARY,
+    "parent_company": EDGE_PARENT,
+    "address_match": EDGE_ADDRESS_MATCH,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    key TEXT PRIMARY KEY,           -- 정규화된 대표 이름
+    name TEXT NOT NULL              -- 표시용 이름
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,         -- 정규화된 별칭
+    company_key TEXT NOT NULL REFERENCES companies(key)
+);
+CREATE TABLE IF NOT EXISTS edges (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    type TEXT NOT NULL,
+    evidence TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (src, dst, type)
+);
+CREATE INDEX IF NOT EXISTS edges_dst ON edges(dst);
+"""
+
+
+class RelationshipGraph:
+    """
+    회사 관계 그래프
+
+    Args:
+        path (str, optional): SQLite 저장 파일 경로 (없으면 메모리 전용)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._names = {}      # 회사 키 → 표시용 이름
+        self._aliases = {}    # 정규화 별칭 → 회사 키
+        self._adjacency = {}  # 회사 키 → {이웃 키: {간선 유형}} (방향 무시)
+        self._load()
+
+    def _load(self):
+        for key, name in self._db.execute("SELECT key, name FROM companies"):
+            self._names[key] = name
+            self._aliases[key] = key
+        for alias, company_key in self._db.execute("SELECT alias, company_key FROM aliases"):
+            self._aliases[alias] = company_key
+        for src, dst, edge_type in self._db.execute("SELECT src, dst, type FROM edges"):
+            self._link(src, dst, edge_type)
+
+    def _link(self, src, dst, edge_type):
+        self._adjacency.setdefault(src, {}).setdefault(dst, set()).add(edge_type)
+        self._adjacency.setdefault(dst, {}).setdefault(src, set()).add(edge_type)
+
+    def resolve(self, name):
+        """
+        회사 이름(별칭 포함)을 회사 키로 해석하는 함수 (없으면 None)
+        """
+        return self._aliases.get(normalize_company_name(name))
+
+    def add_company(self, name, aliases=()):
+        """
+        회사를 추가하고 회사 키를 반환하는 함수 (이미 있으면 별칭만 추가)
+        """
+        with self._lock:
+            key = self.resolve(name)
+            if key is None:
+                key = normalize_company_name(name)
+                if not key:
+                    raise ValueError(f"회사 이름이 비어 있습니다: {name!r}")
+                self._names[key] = name
+                self._aliases[key] = key
+                self._db.execute("INSERT OR IGNORE INTO companies (key, name) VALUES (?, ?)", (key, name))
+            for alias in aliases:
+                normalized = normalize_company_name(alias)
+                if normalized and normalized not in self._aliases:
+                    self._aliases[normalized] = key
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO aliases (alias, company_key) VALUES (?, ?)", (normalized, key)
+                    )
+            self._db.commit()
+            return key
+
+    def add_edge(self, src_name, dst_name, edge_type, evidence="", source=""):
+        """
+        두 회사 사이에 유형이 있는 간선을 추가하는 함수 (이미 있으면 근거와 마지막 확인 시각 갱신)
+        """
+        now = time.time()
+        with self._lock:
+            src = self.add_company(src_name)
+            dst = self.add_company(dst_name)
+            if src == dst:
+                return
+            self._db.execute(
+                "INSERT INTO edges (src, dst, type, evidence, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (src, dst, type) DO UPDATE SET "
+                "evidence = excluded.evidence, source = excluded.source, last_seen = excluded.last_seen",
+                (src, dst, edge_type, evidence or "", source or "", now, now)
+            )
+            self._db.commit()
+            self._link(src, dst, edge_type)
+
+    def edges(self, name):
+        """
+        회사에 연결된 간선 목록을 근거와 함께 반환하는 함수
+        """
+        key = self.resolve(name)
+        if key is None:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT src, dst, type, evidence, source, first_seen, last_seen FROM edges "
+                "WHERE src = ? OR dst = ?", (key, key)
+            ).fetchall()
+        return [{
+            "company": self._names[src],
+            "related_company": self._names[dst],
+            "type": edge_type,
+            "evidence": evidence,
+            "source": source,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+        } for src, dst, edge_type, evidence, source, first_seen, last_seen in rows]
+
+    def find_path(self, name, target, max_hops=2):
+        """
+        두 회사 사이의 최단 관계 경로를 찾는 함수 (메모리 BFS)
+
+        Args:
+            name (str): 시작 회사
+            target (str): 대상 회사 (예: "코닥")
+            max_hops (int): 최대 단계 수
+
+        Returns:
+            list: [(회사명, 다음 회사로의 간선 유형 집합), ..., (대상 회사명, None)] 또는 None
+        """
+        start, goal = self.resolve(name), self.resolve(target)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [(self._names[start], None)]
+        previous = {start: None}
+        queue = deque([(start, 0)])
+        with self._lock:
+            while queue:
+                node, depth = queue.popleft()
+                if depth == max_hops:
+                    continue
+                for neighbor in self._adjacency.get(node, ()):
+                    if neighbor in previous:
+                        continue
+                    previous[neighbor] = node
+                    if neighbor == goal:
+                        return self._build_path(previous, goal)
+                    queue.append((neighbor, depth + 1))
+        return None
+
+    def _build_path(self, previous, goal):
+        keys = []
+        node = goal
+        while node is not None:
+            keys.append(node)
+            node = previous[node]
+        keys.reverse()
+        path = []
+        for index, key in enumerate(keys):
+            edge_types = None
+            if index + 1 < len(keys):
+                edge_types = sorted(self._adjacency[key][keys[index + 1]])
+            path.append((self._names[key], edge_types))
+        return path
+
+    def within_hops(self, name, target, max_hops=2):
+        return self.find_path(name, target, max_hops) is not None
+
+    def neighborhood(self, name, max_hops=2):
+        """
+        회사에서 max_hops 단계 이내의 모든 회사를 {회사명: 단계 수} 형태로 반환하는 함수
+        """
+        start = self.resolve(name)
+        if start is None:
+            return {}
+        distances = {start: 0}
+        queue = deque([start])
+        with self._lock:
+            while queue:
+                node = queue.popleft()
+                if distances[node] == max_hops:
+                    continue
+                for neighbor in self._adjacency.get(node, ()):
+                    if neighbor not in distances:
+                        distances[neighbor] = distances[node] + 1
+                        queue.append(neighbor)
+        del distances[start]
+        return {self._names[key]: distance for key, distance in distances.items()}
+
+    def seed_from_suppliers(self, suppliers_info):
+        """
+        공급자 표의 주요 공급자, 별칭, 관계사를 그래프에 반영하는 함수
+        """
+        for supplier in suppliers_info["MAJOR_SUPPLIERS"].values():
+            aliases = [supplier.get(field) for field in ("name_en", "name_cn") if supplier.get(field)]
+            self.add_company(supplier["name_kr"], aliases + list(supplier.get("aliases", [])))
+            for entry in supplier.get("related_companies", []):
+                names = split_related_company(entry)
+                self.add_company(names[0], names[1:])
+                self.add_edge(names[0], supplier["name_kr"], EDGE_RELATED_COMPANY,
+                              evidence=entry, source="공급자 표")
+
+    def record_relationships(self, company_name, relationships):
+        """
+        check_special_relationship 결과의 관계를 간선으로 저장하는 함수
+        (주주, 자회사, 모회사, 주소 일치 관계만 저장)
+        """
+        for relationship in relationships:
+            for found in relationship.get("relationships_found", []):
+                edge_type = RELATIONSHIP_EDGE_TYPES.get(found.get("type"))
+                if edge_type is None:
+                    continue
+                self.add_edge(
+                    company_name, relationship["major_supplier"], edge_type,
+                    evidence=found.get("detail", ""), source=found.get("source", "")
+                )
+
+    def stats(self):
+        with self._lock:
+            edge_count = self._db.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+        return {"companies": len(self._names), "edges": edge_count}
+
+
+def format_relationship_path(path):
+    """
+    find_path 결과를 "화광 —관계사→ 코닥" 형태의 문자열로 만드는 함수
+    """
+    parts = []
+    for name, edge_types in path:
+        parts.append(name)
+        if edge_types:
+            parts.append(f"—{'/'.join(EDGE_LABELS.get(t, t) for t in edge_types)}→")
+    return " ".join(parts)
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_relationship_graph(suppliers_info=None):
+    """
+    프로세스 전체에서 공유하는 관계 그래프를 반환하는 함수
+    처음 만들 때 공급자 표(suppliers_info)를 반영한다.
+
+    환경 변수:
+        RELATIONSHIP_GRAPH_PATH: SQLite 저장 파일 경로 (지정하지 않거나 빈 값이면 메모리 전용)
+    """
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                graph = RelationshipGraph(os.environ.get("RELATIONSHIP_GRAPH_PATH", DEFAULT_GRAPH_PATH) or None)
+                if suppliers_info is not None:
+                    graph.seed_from_suppliers(suppliers_info)
+                _graph = graph
+    return _graph
+
@@ -0,0 +1,210 @@
+"""
+프로세스 전체 요청 스케줄러 (사용자별 공정 대기열 + 동시 실행 한도)
+
+여러 사용자가 동시에 질문하면 세션마다 최대 아홉 번의 Gemini 호출(재시도 포함)이 조율 없이 나가
+ResourceExhausted가 발생하고 모든 사용자의 답변이 느려진다. 이를 막기 위해
+- 상세 답변(문서별 에이전트/컨텍스트 패킹) 실행 수와 LLM 동시 호출 수를 프로세스 전체에서 제한하고
+- 자리가 나면 사용자(세션)별 대기열을 돌아가며(round-robin) 허가하여, 질문을 많이 보낸 사용자가
+  다른 사용자의 순서를 밀어내지 않게 하며
+- 대기 중에는 예상 순번을 콜백으로 알리고
+- 대기열이 너무 길면 새 질문을 빠른 답변으로 돌릴 수 있게 대기 수를 제공한다 (부하 차단)
+
+호출하는 쪽은 모두 스레드(Streamlit 스크립트, API/일괄 처리 워커)이므로 threading.Condition으로 구현한다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+DEFAULT_MAX_QUESTIONS = 4      # 동시에 실행할 상세 답변 수
+DEFAULT_MAX_LLM_CALLS = 8      # 동시에 진행할 LLM 호출 수
+DEFAULT_SHED_QUEUE_DEPTH = 8   # 대기 중인 질문이 이 수 이상이면 새 질문은 빠른 답변 (0이면 사용 안 함)
+WAIT_POLL_INTERVAL = 0.5       # 대기 순번 확인 간격 (초)
+
+
+class _Ticket:
+    __slots__ = ("user", "granted", "enqueued_at")
+
+    def __init__(self, user):
+        self.user = user
+        self.granted = False
+        self.enqueued_at = time.perf_counter()
+
+
+class FairScheduler:
+    """
+    사용자별 공정 대기열을 가진 동시 실행 한도
+
+    Args:
+        capacity (int): 동시에 실행할 수 있는 작업 수
+        name (str): 통계 표시용 이름
+    """
+
+    def __init__(self, capacity, name=""):
+        self.capacity = capacity
+        self.name = name
+        self._active = 0
+        self._queues = OrderedDict()  # 사용자 → 대기 티켓 deque (순서가 round-robin 순서)
+        self._cond = threading.Condition()
+        self._stats = {"admitted": 0, "queued": 0, "timeouts": 0, "max_wait": 0.0, "total_wait": 0.0}
+
+    @property
+    def waiting(self):
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def acquire(self, user=None, on_wait=None, timeout=None):
+        """
+        실행 자리를 얻을 때까지 기다리는 함수
+
+        Args:
+            user (str): 사용자(세션) ID (같은 사용자의 작업은 순서대로, 사용자 사이에는 돌아가며 허가)
+            on_wait (callable, optional): 대기 중 예상 순번이 바뀔 때마다 on_wait(순번)으로 호출 (1부터)
+            timeout (float, optional): 최대 대기 시간 (초과하면 TimeoutError)
+
+        Returns:
+            float: 대기한 시간 (초)
+        """
+        with self._cond:
+            if self._active < self.capacity and not self._queues:
+                self._active += 1
+                self._stats["admitted"] += 1
+                return 0.0
+            ticket = _Ticket(user)
+            self._queues.setdefault(user, deque()).append(ticket)
+            self._stats["queued"] += 1
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_position = None
+        while True:
+            with self._cond:
+                if not ticket.granted:
+                    position = self._position(ticket)
+                    if deadline is not None and time.monotonic() >= deadline:
+                        self._remove(ticket)
+                        self._stats["timeouts"] += 1
+                        raise TimeoutError(f"{self.name} 대기 시간 초과")
+            if ticket.granted:
+                break
+            # 콜백은 잠금 밖에서 호출 (화면 갱신 등이 다른 대기자를 막지 않도록)
+            if on_wait is not None and position != last_position:
+                on_wait(position)
+                last_position = position
+            with self._cond:
+                if not ticket.granted:
+                    wait = WAIT_POLL_INTERVAL if deadline is None else min(WAIT_POLL_INTERVAL, max(0.0, deadline - time.monotonic()))
+                    self._cond.wait(wait)
+
+        waited = time.perf_counter() - ticket.enqueued_at
+        with self._cond:
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+            self._stats["total_wait"] += waited
+        return waited
+
+    def release(self):
+        """
+        실행 자리를 반납하고 다음 대기자를 허가하는 함수
+        """
+        with self._cond:
+            self._active -= 1
+            self._grant_next()
+
+    @contextmanager
+    def slot(self, user=None, on_wait=None):
+        """
+        with 블록 동안 실행 자리를 차지하는 함수
+        """
+        self.acquire(user, on_wait)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _grant_next(self):
+        while self._active < self.capacity and self._queues:
+            user, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            # 허가받은 사용자는 대기열 맨 뒤로 (남은 작업이 없으면 제거)
+            del self._queues[user]
+            if queue:
+                self._queues[user] = queue
+            ticket.granted = True
+            self._active += 1
+            self._stats["admitted"] += 1
+        self._cond.notify_all()
+
+    def _position(self, ticket):
+        """
+        round-robin 순서에서 티켓이 허가받을 예상 순번 (1부터)
+        """
+        users = list(self._queues)
+        index = self._queues[ticket.user].index(ticket)
+        own = users.index(ticket.user)
+        ahead = 0
+        for order, user in enumerate(users):
+            if user == ticket.user:
+                continue
+            # 앞선 사용자는 같은 회차에서 먼저, 뒤의 사용자는 이전 회차까지만 먼저 허가받음
+            ahead += min(len(self._queues[user]), index + 1 if order < own else index)
+        return ahead + index + 1
+
+    def _remove(self, ticket):
+        queue = self._queues.get(ticket.user)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.user]
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "capacity": self.capacity,
+                "active": self._active,
+                "waiting": sum(len(queue) for queue in self._queues.values()),
+                "waiting_users": len(self._queues),
+            })
+        stats["mean_wait"] = stats["total_wait"] / stats["queued"] if stats["queued"] else 0.0
+        del stats["total_wait"]
+        return stats
+
+
+_question_scheduler = None
+_llm_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_question_scheduler():
+    """
+    상세 답변 실행 수를 제한하는 프로세스 공유 스케줄러 (SCHEDULER_MAX_QUESTIONS)
+    """
+    global _question_scheduler
+    if _question_scheduler is None:
+        with _scheduler_lock:
+            if _question_scheduler is None:
+                _question_scheduler = FairScheduler(
+                    int(os.environ.get("SCHEDULER_MAX_QUESTIONS", DEFAULT_MAX_QUESTIONS)), name="질문"
+                )
+    return _question_scheduler
+
+
+def get_llm_scheduler():
+    """
+    LLM 동시 호출 수를 제한하는 프로세스 공유 스케줄러 (SCHEDULER_MAX_LLM_CALLS)
+    """
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        with _scheduler_lock:
+            if _llm_scheduler is None:
+                _llm_scheduler = FairScheduler(
+                    int(os.environ.get("SCHEDULER_MAX_LLM_CALLS", DEFAULT_MAX_LLM_CALLS)), name="LLM 호출"
+                )
+    return _llm_scheduler
+
+
+def shed_queue_depth():
+    """
+    부하 차단 기준 대기 질문 수 (SCHEDULER_SHED_QUEUE_DEPTH, 0이면 사용 안 함)
+    """
+    return int(os.environ.get("SCHEDULER_SHED_QUEUE_DEPTH", DEFAULT_SHED_QUEUE_DEPTH))
@@ -0,0 +1,205 @@
+"""
+거래처 목록 일괄 특수관계 검사
+
+수백 개의 중국 수출업체명을 받아 주요 공급자 그룹(코닥, 러차이, 화펑)과의 특수관계를
+기존 check_special_relationship 로직(회사명, 주소, 주주, 자회사/모회사 분석)으로 검사한다.
+- 스레드 수를 제한한 병렬 조회 (웹 검색 결과는 프로세스 공유 캐시와 요청 병합으로 재사용)
+- 결과는 완료되는 대로 CSV/JSONL 보고서에 한 줄씩 기록
+- 같은 출력 파일로 다시 실행하면 이미 검사한 회사는 건너뛰고 이어서 진행
+
+사용 예:
+    python screening.py exporters.txt -o screening.csv
+    python screening.py exporters.csv --name-col 업체명 -o screening.jsonl --concurrency 16
+    SERPER_API_KEY=... python screening.py exporters.txt -o screening.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pipeline
+from search_cache import normalize_query
+
+DEFAULT_CONCURRENCY = 8
+
+REPORT_COLUMNS = [
+    "name", "alias_match", "has_special_relationship", "high_confidence", "related_suppliers",
+    "confidence_score", "relationship_types", "evidence_sources", "data_sources",
+    "error", "elapsed", "screened_at",
+]
+
+
+def screen_company(name, session):
+    """
+    회사 하나의 특수관계 검사 결과를 보고서 행으로 만드는 함수 (워커 스레드에서 실행)
+
+    Args:
+        name (str): 검사할 회사명
+        session: 공유 세션 상태 (Serper API 키, 특수관계 캐시)
+
+    Returns:
+        dict: REPORT_COLUMNS 형식의 보고서 행
+    """
+    pipeline.use_session(session)
+    started = time.perf_counter()
+    row = {column: "" for column in REPORT_COLUMNS}
+    row["name"] = name
+    # 공급자 표의 관계사/별칭 표기와 직접 일치하는지 (웹 검색 없이 확인)
+    match = pipeline.SUPPLIER_INDEX.resolve(name)
+    if match:
+        row["alias_match"] = f"{pipeline.SUPPLIER_INDEX.supplier(match.supplier_key)['name_kr']} ({match.alias})"
+    try:
+        with pipeline.request_scope():
+            result = pipeline.check_special_relationship(
+                {"name": name}, use_web_search=bool(session.serper_api_key)
+            )
+        relationships = result.get("relationships", [])
+        row.update({
+            "has_special_relationship": result["has_special_relationship"],
+            "high_confidence": result.get("high_confidence_relationship", False),
+            "related_suppliers": ";".join(r["major_supplier"] for r in relationships),
+            "confidence_score": round(max((r["confidence_score"] for r in relationships), default=0.0), 3),
+            "relationship_types": ";".join(sorted({
+                found["type"] for r in relationships for found in r["relationships_found"]
+            })),
+            "evidence_sources": ";".join(sorted({
+                evidence["source"] for r in relationships for evidence in r["evidence"] if evidence.get("source")
+            })),
+            "data_sources": ";".join(result.get("data_sources", ["Local Database"])),
+        })
+    except Exception as e:
+        row.update({"has_special_relationship": False, "error": str(e)})
+    row["elapsed"] = round(time.perf_counter() - started, 3)
+    row["screened_at"] = datetime.now().isoformat(timespec="seconds")
+    return row
+
+
+def screen_companies(names, serper_api_key="", concurrency=DEFAULT_CONCURRENCY):
+    """
+    회사명 목록을 병렬로 검사하고 완료되는 순서대로 결과 행을 반환하는 제너레이터
+
+    Args:
+        names (list): 회사명 목록 (정규화 기준 중복은 한 번만 검사)
+        serper_api_key (str): Serper API 키 (없으면 웹 검색 없이 회사명만 비교)
+        concurrency (int): 동시에 검사할 회사 수
+
+    Yields:
+        dict: 보고서 행
+    """
+    session = pipeline.new_session(serper_api_key=serper_api_key)
+    unique_names = {}
+    for name in names:
+        key = normalize_query(name)
+        if key and key not in unique_names:
+            unique_names[key] = name.strip()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(screen_company, name, session) for name in unique_names.values()]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def read_names(path, name_col=None, encoding="utf-8-sig"):
+    """
+    입력 파일에서 회사명 목록을 읽는 함수
+    (.csv는 name_col 열 또는 첫 번째 열, 그 외는 한 줄에 회사명 하나)
+    """
+    with open(path, encoding=encoding, newline="") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            column = name_col or reader.fieldnames[0]
+            return [row[column] for row in reader if row.get(column)]
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def report_format(path):
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def load_screened_names(path):
+    """
+    기존 보고서에서 이미 검사한 회사명(정규화)을 읽는 함수 (이어서 실행용)
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if report_format(path) == "jsonl":
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    return {normalize_query(row["name"]) for row in rows if not row.get("error")}
+
+
+class ReportWriter:
+    """
+    보고서 행을 CSV/JSONL 파일에 한 줄씩 추가 기록하는 도우미
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = report_format(path)
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        # 엑셀에서 한글이 깨지지 않도록 새 CSV 파일에는 BOM 포함
+        encoding = "utf-8-sig" if self.format == "csv" and write_header else "utf-8"
+        self._file = open(path, "a", encoding=encoding, newline="")
+        if self.format == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=REPORT_COLUMNS)
+            if write_header:
+                self._writer.writeheader()
+
+    def write(self, row):
+        if self.format == "csv":
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="거래처 목록 일괄 특수관계 검사")
+    parser.add_argument("input", help="회사명 목록 파일 (한 줄에 하나 또는 CSV)")
+    parser.add_argument("-o", "--output", required=True, help="보고서 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("--name-col", help="CSV 입력의 회사명 열 이름 (기본값: 첫 번째 열)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시 검사 수")
+    parser.add_argument("--serper-api-key", default=os.environ.get("SERPER_API_KEY", ""),
+                        help="Serper API 키 (기본값: SERPER_API_KEY 환경 변수, 없으면 회사명만 비교)")
+    parser.add_argument("--restart", action="store_true", help="기존 보고서를 무시하고 처음부터 다시 검사")
+    args = parser.parse_args(argv)
+
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+
+    names = read_names(args.input, args.name_col)
+    screened = load_screened_names(args.output)
+    pending = [name for name in names if normalize_query(name) not in screened]
+    total = len({normalize_query(name) for name in pending if normalize_query(name)})
+    if screened:
+        print(f"기존 보고서에서 {len(screened)}건을 건너뜁니다.", file=sys.stderr)
+
+    found = 0
+    started = time.perf_counter()
+    with ReportWriter(args.output) as writer:
+        for done, row in enumerate(screen_companies(pending, args.serper_api_key, args.concurrency), 1):
+            writer.write(row)
+            found += bool(row["has_special_relationship"])
+            status = "오류" if row["error"] else ("특수관계" if row["has_special_relationship"] else "-")
+            print(f"[{done}/{total}] {row['name']}: {status}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f"{total}건 검사 완료 (특수관계 {found}건, {elapsed:.1f}초) → {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
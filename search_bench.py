@@ -0,0 +1,127 @@
+"""
+웹 검색 처리량 벤치마크 (오프라인)
+
+로컬 가짜 Serper 서버(fake_serper.py)를 띄우고 search_info 또는 analyze_web_info를
+여러 스레드에서 동시에 호출하여 초당 조회 수, 지연 시간 분위수, 캐시 적중률/요청 병합 효과,
+실제 HTTP 요청 수를 보고한다. 검색 대상 회사는 Zipf 분포로 뽑아 인기 회사가 반복되게 한다.
+
+사용 예:
+    python search_bench.py --lookups 500 --concurrency 32 --companies 100 --latency-mean 0.2
+    python search_bench.py --level analyze --error-rate 0.05 --json
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline
+from fake_serper import add_server_arguments, server_from_args
+from load_test import summarize_latencies
+from search_cache import get_search_cache
+from search_provider import SerperProvider, get_search_provider, set_search_provider
+
+FAKE_API_KEY = "fake-serper-key"
+
+
+def make_workload(lookups, companies, skew, seed):
+    """
+    Zipf 분포로 회사명 조회 순서를 만드는 함수 (순위 r의 가중치 1/r^skew)
+    """
+    rng = random.Random(seed)
+    names = [f"测试印刷材料{index:04d}" for index in range(companies)]
+    weights = [1 / (rank ** skew) for rank in range(1, companies + 1)]
+    return rng.choices(names, weights=weights, k=lookups)
+
+
+def run_benchmark(workload, concurrency, level="search"):
+    """
+    조회 목록을 동시에 실행하고 조회별 지연 시간을 반환하는 함수
+    """
+    session = pipeline.new_session(serper_api_key=FAKE_API_KEY)
+
+    def lookup(name):
+        pipeline.use_session(session)
+        started = time.perf_counter()
+        if level == "analyze":
+            with pipeline.request_scope():
+                result = pipeline.analyze_web_info(name, "company")
+            ok = result["status"] == "success" and bool(result["raw_search_results"]["organic"])
+        else:
+            ok = bool(pipeline.search_info(name, FAKE_API_KEY, "company")["organic"])
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lookup, workload))
+    return results, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="웹 검색 처리량 벤치마크 (가짜 Serper 서버)")
+    parser.add_argument("--lookups", type=int, default=300, help="전체 조회 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 조회 스레드 수")
+    parser.add_argument("--companies", type=int, default=50, help="서로 다른 회사 수")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf 분포 지수 (클수록 인기 회사에 집중)")
+    parser.add_argument("--level", choices=["search", "analyze"], default="search",
+                        help="search: search_info만, analyze: analyze_web_info(분류+특수관계 포함)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = server_from_args(args)
+    url = server.start()
+    previous_provider = get_search_provider()
+    set_search_provider(SerperProvider(url=url))
+    cache = get_search_cache()
+    cache.clear()
+    before = cache.stats()
+    workload = make_workload(args.lookups, args.companies, args.skew, args.seed)
+
+    # 검색 실패 로그는 보고서와 섞이지 않도록 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, elapsed = run_benchmark(workload, args.concurrency, args.level)
+
+    set_search_provider(previous_provider)
+    server.stop()
+    after = cache.stats()
+
+    latencies = [latency for latency, _ in results]
+    report = {
+        "level": args.level,
+        "lookups": len(results),
+        "distinct_companies": len(set(workload)),
+        "empty_results": sum(1 for _, ok in results if not ok),
+        "elapsed": elapsed,
+        "lookups_per_second": len(results) / elapsed if elapsed else 0.0,
+        "latency": summarize_latencies(latencies),
+        "cache": {
+            "hits": after["hits"] - before["hits"],
+            "misses": after["misses"] - before["misses"],
+            "coalesced": after["coalesced"] - before["coalesced"],
+            "hit_rate": (after["hits"] - before["hits"]) / len(results) if results else 0.0,
+        },
+        "server": dict(server.stats),
+    }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    latency = report["latency"]
+    cache_report = report["cache"]
+    print(f"조회 {report['lookups']}건 (회사 {report['distinct_companies']}곳, 빈 결과 {report['empty_results']}건), "
+          f"{elapsed:.2f}초 → {report['lookups_per_second']:.1f}건/초")
+    print(f"지연 시간: 평균 {latency['mean'] * 1000:.1f}ms, p50 {latency['p50'] * 1000:.1f}ms, "
+          f"p95 {latency['p95'] * 1000:.1f}ms, p99 {latency['p99'] * 1000:.1f}ms, 최대 {latency['max'] * 1000:.1f}ms")
+    print(f"캐시: 적중 {cache_report['hits']}회, 실패 {cache_report['misses']}회, "
+          f"동시 조회 병합 {cache_report['coalesced']}회, 적중률 {cache_report['hit_rate']:.0%}")
+    server_stats = report["server"]
+    print(f"가짜 서버: 요청 {server_stats['requests']}건 (재생 {server_stats['replayed']}, "
+          f"가상 {server_stats['synthetic']}, 오류 {server_stats['errors']})")
+
+
+if __name__ == "__main__":
+    main()
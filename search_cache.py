@@ -0,0 +1,222 @@
+"""
+웹 검색 결과 캐시 (프로세스 전체 공유, 선택적 디스크 저장)
+
+세션마다 따로 두던 검색 캐시를 프로세스 전체에서 공유하여, 한 사용자가 조회한 회사 정보를
+다른 사용자도 바로 사용할 수 있게 한다.
+- 정규화된 검색어 + 검색 유형을 키로 사용
+- OrderedDict 기반 O(1) LRU 제거
+- 항목별 TTL
+- 적중/실패 통계
+- 같은 검색어의 동시 조회는 한 번만 실행하고 결과를 공유 (요청 병합)
+- SEARCH_CACHE_PATH 환경 변수를 지정하면 SQLite 파일에 저장하여 프로세스 재시작 후에도 유지
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL = 21600  # 6시간
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    검색어를 캐시 키용으로 정규화하는 함수 (유니코드 정규화, 소문자화, 공백 정리)
+    """
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def make_cache_key(query, search_type):
+    return f"{search_type}:{normalize_query(query)}"
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 호출을 하나로 합치는 도우미
+    먼저 들어온 호출만 실제로 실행하고, 실행 중에 들어온 호출은 같은 결과(또는 예외)를 기다린다.
+    """
+
+    def __init__(self):
+        self._inflight = {}  # 키 → Future
+        self._lock = threading.Lock()
+        self.coalesced = 0   # 다른 호출의 결과를 공유받은 횟수
+
+    def do(self, key, fn):
+        """
+        key에 대해 진행 중인 호출이 있으면 그 결과를, 없으면 fn()을 실행한 결과를 반환하는 함수
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class SearchCache:
+    """
+    LRU + TTL 검색 결과 캐시
+
+    Args:
+        max_entries (int): 메모리에 유지할 최대 항목 수
+        ttl (float): 기본 유효 기간 (초)
+        path (str, optional): SQLite 저장 파일 경로 (없으면 메모리 전용)
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # 키 → (만료 시각, 데이터)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "disk_hits": 0}
+        self._db = None
+        self.flight = SingleFlight()
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, query, search_type):
+        """
+        캐시된 검색 결과를 반환하는 함수 (없거나 만료되었으면 None)
+        """
+        key = make_cache_key(query, search_type)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, data = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return data
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT data, expires_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    data = json.loads(row[0])
+                    self._put(key, data, row[1])
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return data
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, query, search_type, data, ttl=None):
+        """
+        검색 결과를 캐시에 저장하는 함수
+        """
+        key = make_cache_key(query, search_type)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._put(key, data, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, data, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(data, ensure_ascii=False), expires_at)
+                )
+                self._db.commit()
+
+    def _put(self, key, data, expires_at):
+        self._entries[key] = (expires_at, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self):
+        """
+        캐시 적중/실패 통계를 반환하는 함수
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["coalesced"] = self.flight.coalesced
+        return stats
+
+    def get_or_fetch(self, query, search_type, fetch):
+        """
+        캐시된 결과를 반환하고, 없으면 fetch()로 조회하는 함수
+        같은 검색어를 동시에 조회하는 호출자들은 하나의 조회 결과를 함께 사용한다.
+        fetch()는 결과 저장(set)까지 직접 처리한다.
+        """
+        data = self.get(query, search_type)
+        if data is not None:
+            return data
+
+        def fetch_once():
+            # 앞선 조회가 방금 끝나 저장된 경우 다시 조회하지 않음
+            with self._lock:
+                entry = self._entries.get(make_cache_key(query, search_type))
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+            return fetch()
+
+        return self.flight.do(make_cache_key(query, search_type), fetch_once)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """
+    프로세스 전체에서 공유하는 검색 캐시를 반환하는 함수
+
+    환경 변수:
+        SEARCH_CACHE_PATH: SQLite 저장 파일 경로 (지정하지 않으면 메모리 전용)
+        SEARCH_CACHE_MAX_ENTRIES: 메모리 최대 항목 수
+        SEARCH_CACHE_TTL: 기본 유효 기간 (초)
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache(
+                    max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                    ttl=float(os.environ.get("SEARCH_CACHE_TTL", DEFAULT_TTL)),
+                    path=os.environ.get("SEARCH_CACHE_PATH") or None,
+                )
+    return _cache
@@ -0,0 +1,128 @@
+"""
+웹 검색 제공자 인터페이스
+
+search_info는 get_search_provider().search(...)로 검색어 하나의 organic 결과를 얻는다.
+- SerperProvider: Serper API (기본값: google.serper.dev, URL을 바꾸면 로컬 가짜 서버 사용 가능)
+- RecordingProvider: 다른 제공자의 결과를 JSONL 파일에 기록 (fake_serper.py 재생용)
+
+환경 변수 SEARCH_PROVIDER_URL 로 Serper 호환 엔드포인트(예: http://127.0.0.1:8765/search)를 지정할 수 있고,
+SEARCH_RECORD_PATH 를 지정하면 실제 검색 결과를 기록한다.
+"""
+import abc
+import json
+import os
+import threading
+
+SERPER_URL = "https://google.serper.dev/search"
+SEARCH_REQUEST_TIMEOUT = 20  # 검색어 하나의 요청 제한 시간 (초)
+
+
+class SearchProvider(abc.ABC):
+    """
+    웹 검색 제공자 기본 인터페이스 (하위 클래스는 search를 구현해야 함)
+    """
+    name = "base"
+    url = ""
+
+    @abc.abstractmethod
+    async def search(self, http_session, query, api_key, num=5):
+        """
+        검색어 하나의 organic 결과 목록을 반환하는 함수 (공유 런타임 루프에서 실행)
+        """
+
+
+class SerperProvider(SearchProvider):
+    """
+    Serper API 검색 제공자
+
+    Args:
+        url (str): Serper 호환 검색 엔드포인트
+        timeout (float): 요청 제한 시간 (초)
+    """
+    name = "serper"
+
+    def __init__(self, url=SERPER_URL, timeout=SEARCH_REQUEST_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    async def search(self, http_session, query, api_key, num=5):
+        payload = json.dumps({
+            "q": query,
+            "num": num,  # 결과 수 제한
+            "gl": "kr",
+            "hl": "ko"
+        })
+        headers = {
+            'X-API-KEY': api_key,
+            'Content-Type': 'application/json'
+        }
+        import aiohttp  # 비동기 HTTP 요청을 위한 aiohttp 라이브러리
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with http_session.post(self.url, headers=headers, data=payload, timeout=timeout) as response:
+            response.raise_for_status()
+            result = await response.json()
+            return result.get("organic", [])
+
+
+class RecordingProvider(SearchProvider):
+    """
+    다른 제공자의 검색 결과를 JSONL 파일에 기록하는 제공자 (fake_serper.py --recordings 입력 형식)
+
+    Args:
+        provider (SearchProvider): 실제 검색을 수행할 제공자
+        path (str): 기록 파일 경로
+    """
+    name = "recording"
+
+    def __init__(self, provider, path):
+        self.provider = provider
+        self.url = provider.url
+        self.path = path
+        self._lock = threading.Lock()
+
+    async def search(self, http_session, query, api_key, num=5):
+        organic = await self.provider.search(http_session, query, api_key, num)
+        line = json.dumps({"query": query, "organic": organic}, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        return organic
+
+
+def provider_from_env():
+    """
+    환경 변수로 검색 제공자를 생성하는 함수
+
+    SEARCH_PROVIDER_URL: Serper 호환 엔드포인트 (기본값: google.serper.dev)
+    SEARCH_RECORD_PATH: 검색 결과 기록 파일 (지정 시 RecordingProvider로 감쌈)
+    """
+    provider = SerperProvider(url=os.environ.get("SEARCH_PROVIDER_URL") or SERPER_URL)
+    record_path = os.environ.get("SEARCH_RECORD_PATH")
+    if record_path:
+        provider = RecordingProvider(provider, record_path)
+    return provider
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_search_provider():
+    """
+    현재 프로세스에서 사용하는 검색 제공자를 반환하는 함수
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = provider_from_env()
+    return _provider
+
+
+def set_search_provider(provider):
+    """
+    검색 제공자를 교체하는 함수 (벤치마크 등에서 사용)
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
+    return provider
@@ -0,0 +1,168 @@
+"""
+시작 시간 측정 (모듈별 불러오기 시간 + 첫 화면 표시 시간)
+
+Streamlit은 첫 접속 때 main2.py를 실행하면서 필요한 모듈을 모두 불러오므로, 무거운 라이브러리
+(scikit-learn, google.generativeai, aiohttp, PyPDF2, altair)를 상단에서 불러오면 API 키 입력 화면이
+나타나기 전까지 그 시간을 모두 기다려야 한다. 이 도구는 새 인터프리터에서
+- main2.py가 상단에서 불러오는 모듈을 `python -X importtime`으로 불러와 모듈별 시간을 집계하고
+- AppTest로 main2.py를 처음 실행하여 첫 화면(API 키 입력)까지 걸린 시간을 측정하며
+- 첫 화면 표시 시간이 예산(--budget, STARTUP_BUDGET_SECONDS)을 넘으면 종료 코드 1을 반환한다
+  (무거운 모듈을 다시 상단에서 불러오는 변경을 CI에서 잡기 위한 용도)
+
+사용 예:
+    python startup_profile.py
+    python startup_profile.py --top 30 --repeat 5 --budget 1.0
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_SCRIPT = "main2.py"
+DEFAULT_BUDGET = 1.5   # 첫 화면 표시 시간 예산 (초)
+DEFAULT_REPEAT = 3     # 첫 화면 측정 반복 횟수 (중앙값 사용)
+DEFAULT_TOP = 20
+
+# 첫 화면 측정용 스크립트 (새 프로세스에서 실행, 걸린 시간(초)을 출력)
+_FIRST_RENDER_CODE = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+started = time.perf_counter()
+app.run()
+elapsed = time.perf_counter() - started
+if app.exception:
+    sys.exit("첫 화면 실행 중 오류: " + app.exception[0].message)
+print(elapsed)
+"""
+
+
+def script_imports(script):
+    """
+    스크립트가 상단에서 불러오는 모듈 이름 목록을 반환하는 함수 (함수 안의 지연 불러오기는 제외)
+    """
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _isolated_env():
+    # 측정 중 대화 기록/관계 그래프 파일을 만들지 않도록 메모리 전용으로 실행
+    return {**os.environ, "CONVERSATION_STORE_PATH": "", "RELATIONSHIP_GRAPH_PATH": "", "PYTHONWARNINGS": "ignore"}
+
+
+def parse_importtime(output):
+    """
+    `python -X importtime` 출력을 읽는 함수
+
+    Returns:
+        list: (모듈, 자체 시간(초), 누적 시간(초), 깊이) 목록 (출력 순서)
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return rows
+
+
+def profile_imports(modules, cwd=None):
+    """
+    새 인터프리터에서 모듈들을 불러오며 모듈별 불러오기 시간을 측정하는 함수
+
+    Returns:
+        list: parse_importtime 결과
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=cwd, env=_isolated_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    # 하위 모듈은 상위 모듈보다 먼저 출력되므로 깊이 0 항목까지를 한 묶음으로 보고,
+    # 인터프리터 시작 시 불러오는 모듈(site, encodings 등) 묶음은 제외
+    rows, block = [], []
+    for row in parse_importtime(result.stderr):
+        block.append(row)
+        if row[3] == 0:
+            if row[0] in modules:
+                rows.extend(block)
+            block = []
+    return rows
+
+
+def package_times(rows):
+    """
+    최상위 패키지별 불러오기 시간 합계를 반환하는 함수 (모듈 자체 시간을 각 모듈의 최상위 패키지에 합산)
+
+    Returns:
+        list: (패키지, 시간(초)) 목록 (오래 걸린 순)
+    """
+    totals = {}
+    for name, self_time, _, _ in rows:
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + self_time
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def measure_first_render(script=DEFAULT_SCRIPT, cwd=None):
+    """
+    새 프로세스에서 스크립트를 처음 실행하여 첫 화면까지 걸린 시간(초)을 측정하는 함수
+    (streamlit 자체를 불러오는 시간은 서버가 이미 떠 있는 상황과 같도록 제외)
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_RENDER_CODE, script],
+        cwd=cwd, env=_isolated_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈별 불러오기 시간과 첫 화면 표시 시간 측정")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="측정할 Streamlit 스크립트")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="표시할 모듈 수")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="첫 화면 측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--budget", type=float,
+                        default=float(os.environ.get("STARTUP_BUDGET_SECONDS", DEFAULT_BUDGET)),
+                        help="첫 화면 표시 시간 예산 (초, 넘으면 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.abspath(args.script))
+    script = os.path.basename(args.script)
+    modules = script_imports(args.script)
+    rows = profile_imports(modules, cwd=cwd)
+    total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+
+    print(f"{script} 상단 모듈 불러오기: {total:.3f}초 ({', '.join(modules)})")
+    print("\n[패키지별 시간]")
+    for package, seconds in package_times(rows)[:args.top]:
+        print(f"  {seconds * 1000:9.1f} ms  {package}")
+    print("\n[모듈별 자체 시간]")
+    for name, self_time, cumulative, _ in sorted(rows, key=lambda row: -row[1])[:args.top]:
+        print(f"  {self_time * 1000:9.1f} ms  (누적 {cumulative * 1000:8.1f} ms)  {name}")
+
+    timings = [measure_first_render(script, cwd=cwd) for _ in range(max(1, args.repeat))]
+    first_render = statistics.median(timings)
+    print(f"\n첫 화면 표시 시간: {first_render:.3f}초 (중앙값, {len(timings)}회: "
+          f"{', '.join(f'{t:.3f}' for t in timings)}) / 예산 {args.budget:.3f}초")
+    if first_render > args.budget:
+        print("첫 화면 표시 시간이 예산을 넘었습니다. 상단에서 무거운 모듈을 불러오지 않는지 확인하세요.",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,384 @@
+"""
+공급자 별칭 색인
+
+SUPPLIERS_INFO의 주요 공급자명(한글/영문/중문)과 관계사(related_companies) 이름을
+정규화하여 Aho-Corasick 오토마톤 하나로 묶고, 입력 텍스트 한 번 순회로
+언급된 회사를 세율 그룹(주요 공급자 키)으로 해석한다.
+별칭은 원래 텍스트의 단어 경계에서 시작하고 끝나는 경우만 인정한다 ("각종 인쇄판"의 "종인"은 제외).
+비슷한 이름(오타, 일부 표기 차이)은 문자 n-gram 색인(NameNgramIndex)으로 후보를 찾고 단어 단위로 유사도를 구한다.
+"""
+import heapq
+import re
+import unicodedata
+from collections import namedtuple
+
+from aho_corasick import AhoCorasick
+
+# 정규화 시 제거하는 법인 형태 표기
+_CORPORATE_SUFFIX_WORDS = {
+    "co", "ltd", "limited", "company", "inc", "corp", "corporation", "llc", "plc", "gmbh",
+}
+_CORPORATE_SUFFIX_PATTERN = re.compile(
+    r"股份有限公司|有限责任公司|有限公司|公司|주식회사|유한회사|\(주\)|㈜"
+)
+_WORD_PATTERN = re.compile(r"\w+")
+# 별칭 뒤에 붙어도 단어 경계로 보는 조사 ("코닥의", "화광은", "러차이와")
+_KOREAN_PARTICLES = (
+    "에서는", "으로는", "이라는", "에서", "에게", "으로", "까지", "부터", "처럼", "보다", "하고", "이나", "이랑",
+    "이란", "라는", "의", "은", "는", "이", "가", "을", "를", "와", "과", "에", "로", "도", "만", "나", "랑", "란",
+)
+# "화광(Lucky Huaguang Graphics Co., Ltd.)", "코닥 인베스트먼트[Kodak (China) Investment Co., Ltd.]"
+_RELATED_COMPANY_PATTERN = re.compile(r"^\s*([^(\[]+?)\s*[(\[](.+)[)\]]\s*$")
+
+# 이름 유사도 비교에서 제외하는 업종·지역 일반 단어 (서로 관계없는 회사도 흔히 함께 쓰는 단어)
+GENERIC_NAME_WORDS = frozenset({
+    # 업종·사업 형태
+    "printing", "print", "plate", "plates", "material", "materials", "equipment", "graphic", "graphics",
+    "communication", "communications", "technology", "technologies", "tech", "trading", "trade", "packaging",
+    "product", "products", "electronic", "electronics", "investment", "investments", "group", "holding",
+    "holdings", "industry", "industries", "industrial", "international", "imaging", "chemical", "chemicals",
+    "science", "development", "manufacturing", "import", "export", "enterprise", "new",
+    "인쇄", "인쇄판", "인쇄재료", "인쇄설비", "재료", "소재", "설비", "장비", "기술", "무역", "실업", "산업", "그룹",
+    "포장", "전자", "투자", "화학", "그래픽", "그래픽스", "케미컬", "테크", "테크놀로지", "패키징",
+    # 국가·지역
+    "china", "chinese", "korea", "hong", "kong", "beijing", "shanghai", "tianjin", "chongqing", "jiangsu",
+    "zhejiang", "guangdong", "shandong", "henan", "hebei", "hubei", "hunan", "fujian", "anhui", "jiangxi",
+    "sichuan", "shaanxi", "shanxi", "liaoning", "jilin", "heilongjiang", "guangxi", "yunnan", "guizhou",
+    "gansu", "hainan", "suzhou", "nanyang", "shenzhen", "guangzhou", "hangzhou", "wuxi", "nanjing", "ningbo",
+    "xiamen", "qingdao", "dalian", "wuhan", "chengdu", "changzhou", "nantong", "wenzhou", "dongguan", "foshan",
+    "중국", "한국", "상하이", "베이징", "장쑤", "저장", "충칭", "쑤저우", "난양", "허난", "차이나", "코리아",
+})
+# 여러 회사가 흔히 쓰는 상호 단어 (유사도 계산에는 쓰지만, 이 단어만으로는 고유한 이름으로 보지 않음)
+COMMON_NAME_WORDS = frozenset({
+    "lucky", "baoli", "golden", "great", "united", "global", "asia", "asian", "orient", "oriental", "star", "sun",
+})
+MIN_DISTINCTIVE_LENGTH = 3  # 포함 관계를 1.0으로 볼 고유 단어의 최소 길이
+MIN_PREFIX_LENGTH = 4       # 이름 앞부분으로 해석할 입력의 최소 길이 (정규화 기준)
+MIN_HANGUL_PREFIX_LENGTH = 2  # 띄어 쓰지 않은 한글 이름의 앞부분으로 인정할 공급자 한글명 최소 길이
+OWN_NAME_TYPES = ("name_kr", "name_en", "name_cn", "alias")  # 공급자 자체 이름·별칭 유형 (관계사명 제외)
+
+# 별칭 해석 결과
+SupplierMatch = namedtuple("SupplierMatch", ["supplier_key", "alias", "alias_type", "start", "end"])
+# 이름 유사도 검색 결과
+NameCandidate = namedtuple("NameCandidate", ["score", "key", "name"])
+
+
+def company_name_tokens(name):
+    """
+    회사명을 비교용 단어 목록으로 나누는 함수
+    (유니코드 정규화, 소문자화, 법인 형태 표기·구두점 제거)
+    """
+    if not name:
+        return []
+    text = unicodedata.normalize("NFKC", name).lower()
+    text = _CORPORATE_SUFFIX_PATTERN.sub(" ", text)
+    words = (w.replace("_", "") for w in _WORD_PATTERN.findall(text) if w not in _CORPORATE_SUFFIX_WORDS)
+    return [w for w in words if w]
+
+
+def normalize_company_name(name):
+    """
+    회사명을 비교용으로 정규화하는 함수 (company_name_tokens의 단어를 공백 없이 이어 붙임)
+    """
+    return "".join(company_name_tokens(name))
+
+
+def token_boundaries(tokens):
+    """
+    단어들을 이어 붙인 문자열에서 단어가 시작/끝나는 위치 집합을 구하는 함수
+    (한글 단어 끝의 조사 앞도 끝 위치로 포함)
+
+    Returns:
+        tuple: (시작 위치 집합, 끝 위치 집합)
+    """
+    starts, ends = set(), set()
+    offset = 0
+    for token in tokens:
+        starts.add(offset)
+        offset += len(token)
+        ends.add(offset)
+        for particle in _KOREAN_PARTICLES:
+            if len(token) > len(particle) and token.endswith(particle):
+                ends.add(offset - len(particle))
+    return starts, ends
+
+
+def split_related_company(entry):
+    """
+    관계사 표기에서 한글명과 괄호 안의 영문명을 분리하는 함수
+    """
+    match = _RELATED_COMPANY_PATTERN.match(entry)
+    if match:
+        return [match.group(1), match.group(2)]
+    return [entry]
+
+
+def iter_supplier_aliases(suppliers_info):
+    """
+    공급자 표에서 (주요 공급자 키, 별칭, 별칭 유형) 목록을 만드는 함수
+    """
+    for supplier_key, supplier in suppliers_info["MAJOR_SUPPLIERS"].items():
+        yield supplier_key, supplier_key, "name_kr"
+        for field in ("name_kr", "name_en", "name_cn"):
+            if supplier.get(field):
+                yield supplier_key, supplier[field], field
+        for alias in supplier.get("aliases", []):
+            yield supplier_key, alias, "alias"
+        for entry in supplier.get("related_companies", []):
+            for name in split_related_company(entry):
+                yield supplier_key, name, "related_company"
+
+
+class SupplierAliasIndex:
+    """
+    정규화된 공급자 별칭 색인
+
+    Args:
+        suppliers_info (dict): SUPPLIERS_INFO 형식의 공급자 표
+        min_alias_length (int): 색인에 포함할 정규화 별칭의 최소 길이
+    """
+
+    def __init__(self, suppliers_info, min_alias_length=2):
+        self.suppliers_info = suppliers_info
+        self.aliases = {}  # 정규화 별칭 → (주요 공급자 키, 원래 표기, 별칭 유형)
+        self._prefix_names = []  # (단어 목록, 주요 공급자 키, 원래 표기, 별칭 유형) - 공급자 자체 이름만
+        self._automaton = AhoCorasick()
+        for supplier_key, alias, alias_type in iter_supplier_aliases(suppliers_info):
+            if alias_type in OWN_NAME_TYPES:
+                self._prefix_names.append((company_name_tokens(alias), supplier_key, alias, alias_type))
+            normalized = normalize_company_name(alias)
+            if len(normalized) < min_alias_length or normalized in self.aliases:
+                continue
+            self.aliases[normalized] = (supplier_key, alias, alias_type)
+            self._automaton.add(normalized, normalized)
+        self._automaton.build()
+
+    def find_all(self, text):
+        """
+        텍스트에 언급된 모든 공급자 별칭을 찾는 함수
+        겹치는 경우 더 긴 별칭을 우선한다 (예: "아그파 화광" > "화광").
+
+        Returns:
+            list: 등장 순서대로 정렬된 SupplierMatch 목록 (위치는 정규화된 텍스트 기준)
+        """
+        tokens = company_name_tokens(text)
+        starts, ends = token_boundaries(tokens)
+        candidates = sorted(
+            (m for m in self._automaton.iter("".join(tokens)) if m[0] in starts and m[1] in ends),
+            key=lambda m: (-(m[1] - m[0]), m[0])
+        )
+        taken = []
+        matches = []
+        for start, end, alias, _ in candidates:
+            if any(start < t_end and t_start < end for t_start, t_end in taken):
+                continue
+            taken.append((start, end))
+            supplier_key, original, alias_type = self.aliases[alias]
+            matches.append(SupplierMatch(supplier_key, original, alias_type, start, end))
+        matches.sort(key=lambda m: m.start)
+        return matches
+
+    def resolve(self, name):
+        """
+        회사명 하나를 주요 공급자 그룹으로 해석하는 함수
+
+        1. 입력에 포함된 별칭 중 가장 긴 것
+        2. 입력이 공급자 이름·별칭의 앞쪽 단어들과 같은 경우 (예: "Jiangsu Lecai" → 러차이)
+           관계사명은 대상이 아니며, 입력이 MIN_PREFIX_LENGTH자 이상이고 업종·지역 일반 단어가
+           아닌 단어를 포함해야 한다 ("China", "Shanghai Printing"은 해석하지 않음)
+
+        Returns:
+            SupplierMatch 또는 None
+        """
+        matches = self.find_all(name)
+        if matches:
+            return max(matches, key=lambda m: m.end - m.start)
+
+        tokens = company_name_tokens(name)
+        length = len("".join(tokens))
+        if length < MIN_PREFIX_LENGTH or not any(token not in GENERIC_NAME_WORDS for token in tokens):
+            return None
+        for name_tokens, supplier_key, original, alias_type in self._prefix_names:
+            if name_tokens[:len(tokens)] == tokens:
+                return SupplierMatch(supplier_key, original, alias_type, 0, length)
+        return None
+
+    def supplier(self, supplier_key):
+        return self.suppliers_info["MAJOR_SUPPLIERS"][supplier_key]
+
+    def describe(self, match):
+        """
+        해석 결과를 세율 적용 사유 문구로 만드는 함수
+        """
+        supplier = self.supplier(match.supplier_key)
+        if match.alias_type == "related_company":
+            return f"주요 공급자 {supplier['name_kr']}의 관계사 {match.alias}에 해당"
+        return f"주요 공급자 {supplier['name_kr']}에 해당"
+
+
+def distinctive_name_tokens(name):
+    """
+    회사명에서 업종·지역 일반 단어를 뺀 고유 단어 목록을 반환하는 함수
+    """
+    return [token for token in company_name_tokens(name) if token not in GENERIC_NAME_WORDS]
+
+
+def _contains_tokens(tokens, part):
+    """
+    단어 목록 tokens에 part가 연속된 단어로 들어 있는지 확인하는 함수
+    """
+    size = len(part)
+    return any(tokens[i:i + size] == part for i in range(len(tokens) - size + 1))
+
+
+def _is_hangul(text):
+    return bool(text) and all("가" <= ch <= "힣" for ch in text)
+
+
+def char_ngrams(text, n=2):
+    """
+    문자열의 문자 n-gram 집합을 만드는 함수 (n보다 짧으면 문자열 전체를 하나의 n-gram으로 사용)
+    """
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+class NameNgramIndex:
+    """
+    회사명 문자 n-gram 역색인
+
+    업종·지역 일반 단어(GENERIC_NAME_WORDS)를 뺀 단어의 n-gram마다 그 n-gram을 가진 이름 목록
+    (posting list)을 두고, 질의 이름과 n-gram을 공유하는 이름만 후보로 고른다.
+    점수는 단어 단위 Jaccard 계수로, 두 이름의 단어를 문자 n-gram Dice 유사도가 높은 순으로 하나씩 짝지어
+    (짝지은 단어 유사도 합) / (두 이름의 단어 수 합 - 짝지은 단어 유사도 합)으로 구한다
+    (두 단어 이름과 단어 하나만 같으면 0.5, 오타가 있어도 단어가 모두 비슷하면 0.7 이상).
+
+    다음 경우는 1.0으로 본다 (공급자 자체 이름·별칭만 해당, 관계사명은 제외):
+    - 자체 이름·별칭의 단어가 질의에 연속된 단어로 그대로 들어 있고, 그 이름에 흔한 상호 단어가 아닌
+      3자 이상의 단어가 있는 경우 (예: "Kodak Korea" ⊃ "Kodak")
+    - 띄어 쓰지 않은 한글 질의 단어가 공급자 한글명으로 시작하는 경우 (예: "러차이인쇄", "코닥그래픽")
+
+    >>> index = NameNgramIndex([
+    ...     ("코닥", "Kodak", "alias"),
+    ...     ("코닥", "Eastman Kodak Company", "related_company"),
+    ...     ("코닥", "Agfa Huaguang (Shanghai) Printing Equipment Co., Ltd.", "related_company"),
+    ...     ("코닥", "Suzhou Huaguang Baoli Printing Plate Material Co., Ltd.", "related_company"),
+    ...     ("화펑", "화펑", "name_kr"),
+    ...     ("화펑", "Chongqing Huafeng Dijet Printing Material Co., Ltd.", "name_en"),
+    ... ])
+    >>> index.scores("Kodak Korea")["코닥"], index.scores("화펑인쇄재료")["화펑"]
+    (1.0, 1.0)
+    >>> index.scores("Huafang Dijet")["화펑"] > 0.7   # 오타
+    True
+    >>> [max(index.scores(name).values(), default=0.0) < 0.7
+    ...  for name in ("Shanghai Printing Equipment Co., Ltd.", "Agfa Graphics", "Eastman Chemical Company",
+    ...               "Suzhou Baoli Industrial", "Dijet Printing")]
+    [True, True, True, True, True]
+
+    Args:
+        entries (iterable): (키, 이름, 별칭 유형) 목록 (같은 키에 여러 이름 가능, 유형은 iter_supplier_aliases 참고)
+        n (int): n-gram 길이
+    """
+
+    def __init__(self, entries, n=2):
+        self.n = n
+        self._names = []      # 이름 번호 → (키, 원래 이름, 단어 목록, 단어별 n-gram, 자체 이름 여부)
+        self._postings = {}   # n-gram → 이름 번호 목록
+        seen = set()
+        for key, name, alias_type in entries:
+            tokens = distinctive_name_tokens(name)
+            own = alias_type in OWN_NAME_TYPES
+            if not tokens or (key, tuple(tokens), own) in seen:
+                continue
+            seen.add((key, tuple(tokens), own))
+            token_grams = [char_ngrams(token, n) for token in tokens]
+            entry_id = len(self._names)
+            self._names.append((key, name, tokens, token_grams, own))
+            for gram in set().union(*token_grams):
+                self._postings.setdefault(gram, []).append(entry_id)
+
+    @staticmethod
+    def _is_distinctive(tokens):
+        return any(len(token) >= MIN_DISTINCTIVE_LENGTH and token not in COMMON_NAME_WORDS for token in tokens)
+
+    @classmethod
+    def _contains_name(cls, query, tokens):
+        """
+        질의 단어 목록에 자체 이름(tokens)이 들어 있는지 확인하는 함수
+        """
+        if cls._is_distinctive(tokens) and _contains_tokens(query, tokens):
+            return True
+        # 띄어 쓰지 않은 한글 이름 ("러차이인쇄" = "러차이" + "인쇄")
+        if len(tokens) == 1 and _is_hangul(tokens[0]) and len(tokens[0]) >= MIN_HANGUL_PREFIX_LENGTH:
+            return any(_is_hangul(word) and word.startswith(tokens[0]) for word in query)
+        return False
+
+    @staticmethod
+    def _token_jaccard(query_grams, token_grams):
+        """
+        단어를 유사도가 높은 순으로 하나씩 짝지어 구한 단어 단위 Jaccard 계수
+        """
+        pairs = sorted(
+            ((_dice(q, t), i, j) for i, q in enumerate(query_grams) for j, t in enumerate(token_grams)),
+            reverse=True
+        )
+        used_query, used_tokens, total = set(), set(), 0.0
+        for similarity, i, j in pairs:
+            if similarity <= 0:
+                break
+            if i in used_query or j in used_tokens:
+                continue
+            used_query.add(i)
+            used_tokens.add(j)
+            total += similarity
+        return total / (len(query_grams) + len(token_grams) - total)
+
+    @classmethod
+    def from_suppliers(cls, suppliers_info, n=2):
+        """
+        공급자 표의 모든 주요 공급자명·별칭·관계사명으로 색인을 만드는 함수 (키: 주요 공급자 키)
+        """
+        return cls(iter_supplier_aliases(suppliers_info), n=n)
+
+    def search(self, name, top_k=5):
+        """
+        질의 이름과 비슷한 이름을 점수 순으로 찾는 함수 (키마다 가장 높은 점수 하나)
+
+        Returns:
+            list: NameCandidate(score, key, name) 목록 (점수 내림차순, 최대 top_k개)
+        """
+        query = distinctive_name_tokens(name)
+        if not query:
+            return []
+        query_grams = [char_ngrams(token, self.n) for token in query]
+
+        candidates = set()
+        for gram in set().union(*query_grams):
+            candidates.update(self._postings.get(gram, ()))
+
+        best = {}
+        for entry_id in candidates:
+            key, original, tokens, token_grams, own = self._names[entry_id]
+            if own and self._contains_name(query, tokens):
+                score = 1.0
+            else:
+                score = self._token_jaccard(query_grams, token_grams)
+            if score > best.get(key, (0.0,))[0]:
+                best[key] = (score, original)
+
+        return heapq.nlargest(
+            top_k,
+            (NameCandidate(score, key, original) for key, (score, original) in best.items()),
+            key=lambda candidate: candidate.score
+        )
+
+    def scores(self, name):
+        """
+        키별 최고 유사도를 {키: 점수} 형태로 반환하는 함수
+        """
+        return {candidate.key: candidate.score for candidate in self.search(name, top_k=len(self._names))}
@@ -0,0 +1,16 @@
+"""
+pytest 공통 설정
+
+저장소 최상위 모듈을 불러올 수 있도록 경로를 추가하고, 테스트 중 대화 기록·관계 그래프 파일을
+만들지 않도록 메모리 전용 저장소와 로컬 가짜 LLM 백엔드를 사용한다.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ["CONVERSATION_STORE_PATH"] = ""
+os.environ["RELATIONSHIP_GRAPH_PATH"] = ""
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+import batch_qa
+import pipeline
+
+
+def write_rows(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_load_results_keeps_last_row_and_skips_truncated_line(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    write_rows(path, [
+        {"id": "q1", "answer": None, "error": "timeout"},
+        {"id": "q1", "answer": "답변", "error": None},
+        {"id": "q2", "answer": "대체 문구", "error": "quick_response: 429"},
+    ])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "q3", "answ')  # 중단되며 잘린 마지막 줄
+
+    results = batch_qa.load_results(str(path))
+    assert set(results) == {"q1", "q2"}
+    assert results["q1"]["answer"] == "답변"
+    assert batch_qa.load_answered_ids(str(path)) == {"q1"}
+
+
+def test_compact_results_drops_error_and_duplicate_rows(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    write_rows(path, [
+        {"id": "q1", "answer": "이전 답변", "error": None},
+        {"id": "q1", "answer": "답변", "error": None},
+        {"id": "q2", "answer": "대체 문구", "error": "timeout"},
+    ])
+    assert batch_qa.compact_results(str(path)) == {"q1"}
+    assert read_rows(path) == [{"id": "q1", "answer": "답변", "error": None}]
+
+
+def test_compact_results_without_file(tmp_path):
+    assert batch_qa.compact_results(str(tmp_path / "missing.jsonl")) == set()
+
+
+@pytest.fixture
+def fake_answers(monkeypatch):
+    """답변 대신 질문별 실패 여부를 정해 결과 행을 만드는 answer_item"""
+    failing = set()
+    calls = []
+
+    def answer_item(item, session_defaults, detailed=True):
+        calls.append(item["id"])
+        error = "timeout" if item["id"] in failing else None
+        return {"id": item["id"], "question": item["question"], "answer": f"답변 {item['id']}",
+                "error": error, "timings": {"total": 0.0}}
+
+    monkeypatch.setattr(batch_qa, "answer_item", answer_item)
+    monkeypatch.setattr(pipeline, "wait_until_ready", lambda timeout=None: True)
+    return failing, calls
+
+
+def test_resume_retries_failed_questions_once(tmp_path, fake_answers):
+    failing, calls = fake_answers
+    questions = tmp_path / "questions.csv"
+    questions.write_text("id,question\nq1,코닥 세율은?\nq2,재심사 절차는?\n", encoding="utf-8")
+    output = tmp_path / "answers.jsonl"
+    argv = [str(questions), "-o", str(output), "--id-col", "id", "--question-col", "question",
+            "--completion-cache-size", "0"]
+
+    failing.add("q2")
+    batch_qa.main(argv)
+    assert sorted(calls) == ["q1", "q2"]
+
+    failing.clear()
+    calls.clear()
+    batch_qa.main(argv)
+    assert calls == ["q2"]  # 오류였던 질문만 다시 실행
+
+    rows = read_rows(output)
+    assert sorted(row["id"] for row in rows) == ["q1", "q2"]
+    assert not any(row["error"] for row in rows)
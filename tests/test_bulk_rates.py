@@ -0,0 +1,60 @@
+import math
+
+import pandas as pd
+import pytest
+
+from bulk_rates import MISSING_SUPPLIER_REASON, SPEC_ONLY_REASON, compute_bulk_rates
+from pipeline import SUPPLIERS_INFO
+
+KODAK_RATE = SUPPLIERS_INFO["MAJOR_SUPPLIERS"]["코닥"]["rate"]
+OTHER_RATE = SUPPLIERS_INFO["OTHER_SUPPLIERS_RATE"]
+
+
+@pytest.fixture
+def declarations():
+    return pd.DataFrame({
+        "supplier": ["Kodak", "Huaguang Chemical Co", "Kodak", "Kodak", None],
+        "product": ["CTP printing plates", "PS plate", "Aluminum sheet", "Offset printing ink", "PS plate"],
+        "value": [1000, 2000, 3000, 4000, 5000],
+    })
+
+
+def test_rates_and_duty(declarations):
+    result = compute_bulk_rates(declarations)
+
+    assert result["is_applicable"].tolist() == [True, True, False, False, True]
+    assert result.loc[0, "supplier_group"] == "코닥"
+    assert result.loc[0, "rate"] == KODAK_RATE
+    assert result.loc[0, "duty_amount"] == round(1000 * KODAK_RATE / 100, 2)
+    assert result.loc[1, "rate"] == OTHER_RATE  # 관계없는 회사는 그 밖의 공급자 세율
+    assert result.loc[2, "rate"] == 0.0
+    assert result.loc[2, "reason"] == SPEC_ONLY_REASON  # 사양 키워드만 있는 행은 확인 필요
+    assert result.loc[3, "duty_amount"] == 0.0
+
+
+def test_blank_supplier_is_not_charged(declarations):
+    result = compute_bulk_rates(declarations)
+    assert math.isnan(result.loc[4, "rate"])
+    assert result.loc[4, "reason"] == MISSING_SUPPLIER_REASON
+
+
+@pytest.mark.parametrize("columns", [
+    {"supplier_col": "공급자"},
+    {"product_col": "품명"},
+    {"value_col": "과세가격"},
+])
+def test_missing_named_column_raises(declarations, columns):
+    with pytest.raises(KeyError):
+        compute_bulk_rates(declarations, **columns)
+
+
+def test_all_applicable_without_product_column(declarations):
+    result = compute_bulk_rates(declarations.drop(columns="product"), all_applicable=True)
+    assert result["is_applicable"].all()
+    assert result.loc[2, "rate"] == KODAK_RATE
+
+
+def test_duty_skipped_without_value_column(declarations):
+    result = compute_bulk_rates(declarations.drop(columns="value"), value_col=None)
+    assert result["duty_amount"].isna().all()
+    assert result.loc[0, "rate"] == KODAK_RATE
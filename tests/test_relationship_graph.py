@@ -0,0 +1,33 @@
+import pipeline
+import relationship_graph
+from relationship_graph import EDGE_SUBSIDIARY, RelationshipGraph
+
+SUBSIDIARY_RESULT = {
+    "title": "Acme Plate Trading Co., Ltd. - company profile",
+    "snippet": "Acme Plate Trading Co., Ltd. is a subsidiary of Lucky Huaguang Graphics Co., Ltd.",
+    "link": "https://example.com/acme",
+}
+
+
+def test_web_relationship_is_persisted_and_found_by_bfs(tmp_path, monkeypatch):
+    path = str(tmp_path / "graph.sqlite3")
+    graph = RelationshipGraph(path)
+    graph.seed_from_suppliers(pipeline.SUPPLIERS_INFO)
+    monkeypatch.setattr(relationship_graph, "_graph", graph)
+    monkeypatch.setattr(pipeline, "search_info", lambda query, api_key, search_type: {"organic": [SUBSIDIARY_RESULT]})
+    pipeline.use_session(pipeline.new_session(serper_api_key="test"))
+
+    info = pipeline.analyze_web_info("Acme Plate Trading Co., Ltd.", "company")
+
+    assert [r["major_supplier"] for r in info["special_relationships"]] == ["코닥"]
+    # 다시 연 저장 파일에서 웹 검색 없이 관계(Acme —자회사→ 코닥)를 찾음
+    reopened = RelationshipGraph(path)
+    edge_types = {edge["type"] for edge in reopened.edges("Acme Plate Trading Co., Ltd.")}
+    assert EDGE_SUBSIDIARY in edge_types
+    assert reopened.within_hops("Acme Plate Trading Co., Ltd.", "코닥", max_hops=2)
+
+
+def test_graph_is_in_memory_by_default(monkeypatch):
+    monkeypatch.delenv("RELATIONSHIP_GRAPH_PATH", raising=False)
+    monkeypatch.setattr(relationship_graph, "_graph", None)
+    assert relationship_graph.get_relationship_graph().path is None
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import FairScheduler
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "대기 시간 초과"
+        time.sleep(0.01)
+
+
+def test_admits_immediately_under_capacity():
+    scheduler = FairScheduler(2)
+    assert scheduler.acquire("a") == 0.0
+    assert scheduler.acquire("b") == 0.0
+    assert scheduler.stats()["active"] == 2
+    scheduler.release()
+    scheduler.release()
+    assert scheduler.stats()["active"] == 0
+
+
+def test_round_robin_between_users():
+    """질문을 많이 보낸 사용자가 있어도 사용자 사이에는 돌아가며 허가"""
+    scheduler = FairScheduler(1)
+    scheduler.acquire("holder")
+    order = []
+    threads = []
+    for label, user in [("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b"), ("c1", "c")]:
+        def run(label=label, user=user):
+            with scheduler.slot(user):
+                order.append(label)
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        # 대기열에 들어간 순서를 고정
+        wait_for(lambda count=len(threads): scheduler.waiting == count)
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+    assert scheduler.stats()["queued"] == 5
+
+
+def test_wait_position_reported():
+    scheduler = FairScheduler(1)
+    scheduler.acquire("holder")
+    positions = []
+    thread = threading.Thread(target=lambda: (scheduler.acquire("a", on_wait=positions.append), scheduler.release()))
+    thread.start()
+    wait_for(lambda: positions)
+    scheduler.release()
+    thread.join(timeout=5)
+    assert positions == [1]
+
+
+def test_timeout_leaves_queue():
+    scheduler = FairScheduler(1)
+    scheduler.acquire("holder")
+    with pytest.raises(TimeoutError):
+        scheduler.acquire("a", timeout=0.05)
+    assert scheduler.waiting == 0
+    assert scheduler.stats()["timeouts"] == 1
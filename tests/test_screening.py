@@ -0,0 +1,58 @@
+import csv
+import json
+
+import pytest
+
+import pipeline
+import screening
+
+
+def read_report(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if screening.report_format(str(path)) == "jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize("filename", ["report.csv", "report.jsonl"])
+def test_report_round_trip(tmp_path, filename):
+    path = str(tmp_path / filename)
+    with screening.ReportWriter(path) as writer:
+        writer.write({**dict.fromkeys(screening.REPORT_COLUMNS, ""), "name": "Kodak Korea"})
+        writer.write({**dict.fromkeys(screening.REPORT_COLUMNS, ""), "name": "XYZ Trading", "error": "timeout"})
+    # 이어서 기록해도 CSV 머리글은 한 번만
+    with screening.ReportWriter(path) as writer:
+        writer.write({**dict.fromkeys(screening.REPORT_COLUMNS, ""), "name": "Jiangsu Lecai"})
+
+    assert [row["name"] for row in read_report(path)] == ["Kodak Korea", "XYZ Trading", "Jiangsu Lecai"]
+    # 오류 행은 다시 검사하도록 제외하고, 회사명은 정규화하여 비교
+    assert screening.load_screened_names(path) == {"kodak korea", "jiangsu lecai"}
+
+
+def test_resume_screens_only_new_and_failed_names(tmp_path, monkeypatch):
+    names = tmp_path / "exporters.txt"
+    names.write_text("Kodak Korea\nXYZ Trading\n", encoding="utf-8")
+    output = tmp_path / "report.csv"
+    argv = [str(names), "-o", str(output), "--serper-api-key", ""]
+
+    check = pipeline.check_special_relationship
+    screened = []
+
+    def failing_check(company_info, **kwargs):
+        screened.append(company_info["name"])
+        if company_info["name"] == "XYZ Trading":
+            raise RuntimeError("timeout")
+        return check(company_info, **kwargs)
+
+    monkeypatch.setattr(pipeline, "check_special_relationship", failing_check)
+    screening.main(argv)
+    assert sorted(screened) == ["Kodak Korea", "XYZ Trading"]
+
+    monkeypatch.setattr(pipeline, "check_special_relationship", check)
+    names.write_text("Kodak Korea\nXYZ Trading\nJiangsu Lecai\n", encoding="utf-8")
+    screening.main(argv)
+
+    rows = read_report(output)
+    assert sorted(row["name"] for row in rows[2:]) == ["Jiangsu Lecai", "XYZ Trading"]
+    kodak = next(row for row in rows if row["name"] == "Kodak Korea")
+    assert kodak["has_special_relationship"] == "True"
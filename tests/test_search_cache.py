@@ -0,0 +1,81 @@
+import pytest
+
+import search_cache
+from search_cache import SearchCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(search_cache.time, "time", clock)
+    return clock
+
+
+def test_hit_and_normalized_key(clock):
+    cache = SearchCache(max_entries=10, ttl=60)
+    cache.set("Kodak  China", "company", {"info": "a"})
+    assert cache.get("kodak china", "company") == {"info": "a"}
+    assert cache.get("kodak china", "product") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SearchCache(max_entries=10, ttl=60)
+    cache.set("kodak", "company", {"info": "a"})
+    cache.set("lecai", "company", {"info": "b"}, ttl=10)  # 항목별 유효 기간
+
+    clock.now += 30
+    assert cache.get("kodak", "company") == {"info": "a"}
+    assert cache.get("lecai", "company") is None
+
+    clock.now += 31
+    assert cache.get("kodak", "company") is None
+    assert cache.stats()["expired"] == 2
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = SearchCache(max_entries=2, ttl=60)
+    cache.set("a", "company", 1)
+    cache.set("b", "company", 2)
+    assert cache.get("a", "company") == 1  # a를 최근 사용으로
+    cache.set("c", "company", 3)
+
+    assert cache.get("b", "company") is None
+    assert cache.get("a", "company") == 1
+    assert cache.get("c", "company") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persisted_entries_survive_restart(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SearchCache(ttl=60, path=path).set("kodak", "company", {"info": "a"})
+
+    cache = SearchCache(ttl=60, path=path)
+    assert cache.get("kodak", "company") == {"info": "a"}
+    assert cache.stats()["disk_hits"] == 1
+
+    clock.now += 61
+    assert SearchCache(ttl=60, path=path).get("kodak", "company") is None
+
+
+def test_get_or_fetch_calls_fetch_once(clock):
+    cache = SearchCache(ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        cache.set("kodak", "company", {"info": "a"})
+        return {"info": "a"}
+
+    assert cache.get_or_fetch("kodak", "company", fetch) == {"info": "a"}
+    assert cache.get_or_fetch("kodak", "company", fetch) == {"info": "a"}
+    assert len(calls) == 1
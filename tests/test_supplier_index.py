@@ -0,0 +1,67 @@
+import pytest
+
+from pipeline import SUPPLIER_INDEX, SUPPLIER_NAME_INDEX
+
+SIMILARITY_THRESHOLD = 0.7  # check_special_relationship의 이름 유사도 기준
+
+# (회사명, 기대 공급자 키 또는 None) - None이면 어느 공급자와도 기준을 넘지 않아야 함
+NAME_PAIRS = [
+    # 관계 있음
+    ("Kodak Korea", "코닥"),
+    ("Eastman Kodak", "코닥"),
+    ("Lucky Huaguang Graphics Co., Ltd.", "코닥"),
+    ("Zhongyin Printing Equipment", "코닥"),
+    ("Jiangsu Lecai Printing Material Co., Ltd.", "러차이"),
+    ("江苏乐彩印刷材料有限公司", "러차이"),
+    ("Chongqing Huafeng Printing Material", "화펑"),
+    ("Huafang Dijet", "화펑"),   # 오타
+    ("러차이인쇄", "러차이"),     # 띄어 쓰지 않은 한글 이름
+    ("화펑인쇄재료", "화펑"),
+    ("코닥그래픽", "코닥"),
+    # 관계 없음 (일반 단어나 관계사명의 단어 하나만 같음)
+    ("Shanghai Printing Equipment Co., Ltd.", None),
+    ("Zhejiang Printing Equipment", None),
+    ("Jiangsu Printing Material", None),
+    ("Zhongshan Printing", None),
+    ("Agfa (Wuxi) Printing Plate Co., Ltd.", None),
+    ("Agfa Graphics", None),
+    ("Eastman Chemical Company", None),
+    ("Suzhou Baoli Industrial", None),
+    ("Henan Baoli Packaging", None),
+    ("Lucky Group", None),
+    ("Dijet Printing", None),
+    ("Huaguang Chemical Co", None),
+]
+
+
+@pytest.mark.parametrize("name, expected", NAME_PAIRS)
+def test_name_similarity_pairs(name, expected):
+    related = {key for key, score in SUPPLIER_NAME_INDEX.scores(name).items() if score > SIMILARITY_THRESHOLD}
+    assert related == ({expected} if expected else set())
+
+
+# (회사명, 기대 공급자 키 또는 None) - SupplierAliasIndex.resolve 결과 (bulk_rates, get_dumping_rate에서 사용)
+RESOLVE_CASES = [
+    ("코닥", "코닥"),
+    ("Kodak", "코닥"),
+    ("柯达", "코닥"),
+    ("乐凯华光", "코닥"),
+    ("Kodak (China) Graphic Communication", "코닥"),
+    ("Lucky Huaguang Graphics Co., Ltd.", "코닥"),  # 관계사명
+    ("Jiangsu Lecai", "러차이"),                     # 공급자 이름의 앞쪽 단어
+    ("Lecai", "러차이"),
+    ("화펑", "화펑"),
+    ("Huafeng", "화펑"),
+    # 해석하지 않음 (일반 단어만 있거나 관계없는 이름)
+    ("", None),
+    ("China", None),
+    ("Shanghai Printing", None),
+    ("Huaguang Chemical Co", None),
+    ("XYZ Trading", None),
+]
+
+
+@pytest.mark.parametrize("name, expected", RESOLVE_CASES)
+def test_resolve(name, expected):
+    match = SUPPLIER_INDEX.resolve(name)
+    assert (match.supplier_key if match else None) == expected
@@ -0,0 +1,287 @@
+"""
+LLM 토큰 사용량 및 비용 집계
+
+LLM 호출마다 응답의 usage_metadata(입력/출력 토큰 수)를 기록하여 질문별, 에이전트별, 문서별,
+세션별, 프로세스 전체로 집계한다. Gemini 요금과 분당 호출/토큰 한도(RPM/TPM) 계획에 사용한다.
+- 질문/벤치마크 등 집계 범위는 usage_scope()로 지정 (contextvars로 비동기 작업/스레드에 전달, 중첩 가능)
+- 프로세스 전체 집계(get_usage_ledger)는 모든 세션의 합계, 세션별 합계, 최근 1분 사용량을 제공
+- 비용은 모델별 100만 토큰당 단가(USD)로 추정 (USAGE_PRICE_INPUT/USAGE_PRICE_OUTPUT로 변경 가능)
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+# 100만 토큰당 (입력, 출력) 단가 (USD)
+MODEL_PRICES = {
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+DEFAULT_PRICE = (0.10, 0.40)
+RATE_WINDOW = 60             # 최근 사용량 집계 구간 (초, 분당 한도 계획용)
+DEFAULT_MAX_SESSIONS = 1000  # 세션별 집계를 유지할 세션 수
+
+# LLM 호출 한 번의 사용량
+UsageRecord = namedtuple(
+    "UsageRecord", ["agent", "document", "model", "prompt_tokens", "response_tokens", "cached"]
+)
+
+
+def model_price(model):
+    """
+    모델의 100만 토큰당 (입력, 출력) 단가를 반환하는 함수 (환경 변수가 있으면 우선)
+    """
+    price = MODEL_PRICES.get((model or "").removeprefix("models/"), DEFAULT_PRICE)
+    return (
+        float(os.environ.get("USAGE_PRICE_INPUT", price[0])),
+        float(os.environ.get("USAGE_PRICE_OUTPUT", price[1])),
+    )
+
+
+def usage_from_response(response):
+    """
+    응답의 usage_metadata에서 (입력 토큰, 출력 토큰)을 읽는 함수 (정보가 없으면 0)
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0, 0
+    return (
+        getattr(usage, "prompt_token_count", 0) or 0,
+        getattr(usage, "candidates_token_count", 0) or 0,
+    )
+
+
+class UsageTally:
+    """
+    호출 수/토큰 수/추정 비용 합계
+    """
+    __slots__ = ("calls", "cached_calls", "prompt_tokens", "response_tokens", "cost")
+
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.cost = 0.0
+
+    def add(self, record):
+        if record.cached:
+            self.cached_calls += 1
+            return
+        self.calls += 1
+        self.prompt_tokens += record.prompt_tokens
+        self.response_tokens += record.response_tokens
+        input_price, output_price = model_price(record.model)
+        self.cost += (record.prompt_tokens * input_price + record.response_tokens * output_price) / 1_000_000
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.response_tokens
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "total_tokens": self.total_tokens,
+            "cost_usd": round(self.cost, 6),
+        }
+
+
+class UsageBreakdown:
+    """
+    사용량 합계와 에이전트별/문서별 합계 (질문 하나, 세션 하나 등의 집계 단위)
+    """
+
+    def __init__(self):
+        self.total = UsageTally()
+        self.by_agent = {}
+        self.by_document = {}
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.total.add(record)
+            self.by_agent.setdefault(record.agent, UsageTally()).add(record)
+            if record.document:
+                self.by_document.setdefault(record.document, UsageTally()).add(record)
+
+    def merge(self, other):
+        """
+        다른 집계의 에이전트별/문서별 합계를 더하는 함수 (질문 집계를 세션 집계에 합칠 때 사용)
+        """
+        with other._lock:
+            agents = dict(other.by_agent)
+            documents = dict(other.by_document)
+        with self._lock:
+            _merge_tally(self.total, other.total)
+            for agent, tally in agents.items():
+                _merge_tally(self.by_agent.setdefault(agent, UsageTally()), tally)
+            for document, tally in documents.items():
+                _merge_tally(self.by_document.setdefault(document, UsageTally()), tally)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                **self.total.to_dict(),
+                "by_agent": {agent: tally.to_dict() for agent, tally in self.by_agent.items()},
+                "by_document": {document: tally.to_dict() for document, tally in self.by_document.items()},
+            }
+
+
+def _merge_tally(target, source):
+    target.calls += source.calls
+    target.cached_calls += source.cached_calls
+    target.prompt_tokens += source.prompt_tokens
+    target.response_tokens += source.response_tokens
+    target.cost += source.cost
+
+
+class UsageLedger:
+    """
+    프로세스 전체 사용량 집계 (모든 세션 합계, 세션별 합계, 최근 RATE_WINDOW초 사용량)
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.started_at = datetime.now()
+        self.totals = UsageBreakdown()
+        self.questions = 0
+        self._sessions = OrderedDict()  # 세션 ID → UsageTally
+        self._recent = deque()          # (시각, 전체 토큰 수) - 캐시 적중 제외
+        self._lock = threading.Lock()
+
+    def record(self, record, session_id=None):
+        self.totals.add(record)
+        with self._lock:
+            if session_id:
+                tally = self._sessions.get(session_id)
+                if tally is None:
+                    tally = self._sessions[session_id] = UsageTally()
+                    while len(self._sessions) > self.max_sessions:
+                        self._sessions.popitem(last=False)
+                self._sessions.move_to_end(session_id)
+                tally.add(record)
+            if not record.cached:
+                now = time.time()
+                self._recent.append((now, record.prompt_tokens + record.response_tokens))
+                self._trim(now)
+
+    def count_question(self):
+        with self._lock:
+            self.questions += 1
+
+    def _trim(self, now):
+        while self._recent and self._recent[0][0] < now - RATE_WINDOW:
+            self._recent.popleft()
+
+    def recent(self):
+        """
+        최근 RATE_WINDOW초 동안의 (호출 수, 토큰 수)를 반환하는 함수
+        """
+        with self._lock:
+            self._trim(time.time())
+            return len(self._recent), sum(tokens for _, tokens in self._recent)
+
+    def snapshot(self):
+        """
+        /metrics 등에 사용할 전체 집계를 반환하는 함수
+        """
+        recent_calls, recent_tokens = self.recent()
+        with self._lock:
+            sessions = len(self._sessions)
+            questions = self.questions
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "questions": questions,
+            "sessions": sessions,
+            "last_minute": {"calls": recent_calls, "tokens": recent_tokens},
+            **self.totals.to_dict(),
+        }
+
+
+_ledger = UsageLedger()
+_active_scopes = contextvars.ContextVar("active_usage_scopes", default=())
+
+
+def get_usage_ledger():
+    """
+    프로세스 전체 사용량 집계를 반환하는 함수
+    """
+    return _ledger
+
+
+@contextmanager
+def usage_scope():
+    """
+    with 블록 안의 LLM 호출 사용량을 모으는 함수 (중첩된 범위에는 모두 기록)
+
+    Yields:
+        UsageBreakdown: 블록 안의 사용량
+    """
+    breakdown = UsageBreakdown()
+    token = _active_scopes.set(_active_scopes.get() + (breakdown,))
+    try:
+        yield breakdown
+    finally:
+        _active_scopes.reset(token)
+
+
+def record_usage(response, agent, document=None, model=None, cached=False, session_id=None):
+    """
+    LLM 호출 한 번의 사용량을 현재 집계 범위들과 프로세스 전체 집계에 기록하는 함수
+
+    Args:
+        response: generate_content 결과 (usage_metadata 사용, 캐시 적중이면 토큰 0)
+        agent (str): 호출한 에이전트 (law_agent, head_agent, summarizer 등)
+        document (str, optional): 대상 문서명
+        model (str, optional): 모델 이름 (단가 계산용)
+        cached (bool): LLM 응답 캐시 적중 여부
+        session_id (str, optional): 세션 ID
+
+    Returns:
+        UsageRecord: 기록한 사용량
+    """
+    prompt_tokens, response_tokens = (0, 0) if cached else usage_from_response(response)
+    record = UsageRecord(agent, document, model, prompt_tokens, response_tokens, cached)
+    for breakdown in _active_scopes.get():
+        breakdown.add(record)
+    _ledger.record(record, session_id)
+    return record
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(snapshot, prefix="dumping_chatbot"):
+    """
+    UsageLedger.snapshot() 결과를 Prometheus 텍스트 형식으로 변환하는 함수
+    """
+    lines = [
+        f"# TYPE {prefix}_questions_total counter",
+        f"{prefix}_questions_total {snapshot['questions']}",
+        f"# TYPE {prefix}_llm_calls_total counter",
+        f'{prefix}_llm_calls_total{{cached="false"}} {snapshot["calls"]}',
+        f'{prefix}_llm_calls_total{{cached="true"}} {snapshot["cached_calls"]}',
+        f"# TYPE {prefix}_llm_tokens_total counter",
+        f'{prefix}_llm_tokens_total{{kind="prompt"}} {snapshot["prompt_tokens"]}',
+        f'{prefix}_llm_tokens_total{{kind="response"}} {snapshot["response_tokens"]}',
+        f"# TYPE {prefix}_llm_cost_usd_total counter",
+        f"{prefix}_llm_cost_usd_total {snapshot['cost_usd']}",
+        f"# TYPE {prefix}_llm_last_minute gauge",
+        f'{prefix}_llm_last_minute{{kind="calls"}} {snapshot["last_minute"]["calls"]}',
+        f'{prefix}_llm_last_minute{{kind="tokens"}} {snapshot["last_minute"]["tokens"]}',
+    ]
+    for group, key in (("agent", "by_agent"), ("document", "by_document")):
+        lines.append(f"# TYPE {prefix}_llm_{group}_tokens_total counter")
+        for name, tally in snapshot[key].items():
+            for kind in ("prompt", "response"):
+                lines.append(
+                    f'{prefix}_llm_{group}_tokens_total{{{group}="{_label(name)}",kind="{kind}"}} '
+                    f'{tally[f"{kind}_tokens"]}'
+                )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,274 @@
+"""
+질문별 단계 소요 시간 추적 (경량 트레이싱)
+
+process_user_input 한 번을 하나의 트레이스로 보고, 자료 검색/문서별 에이전트/웹 검색/LLM 호출/
+헤드 에이전트 등 각 단계를 중첩된 구간(span)으로 기록한다.
+- 현재 트레이스와 구간은 contextvars로 전달되므로 같은 질문에서 생성된 비동기 작업과
+  to_thread 스레드의 구간이 올바른 부모 아래에 기록된다
+- 트레이스가 없으면 span()은 공유 no-op 객체를, @traced는 원래 함수를 바로 호출하므로
+  비활성 상태의 부가 비용은 컨텍스트 변수 조회 한 번뿐
+- 트레이스는 JSON Lines(한 줄에 트레이스 하나)로 내보내 오프라인 분석에 사용
+"""
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+_active_trace = contextvars.ContextVar("active_trace", default=None)
+_active_span = contextvars.ContextVar("active_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """
+    트레이스의 한 구간
+
+    Attributes:
+        span_id (int): 트레이스 안의 구간 번호 (0은 최상위 구간)
+        parent_id (int): 부모 구간 번호 (최상위 구간은 None)
+        name (str): 단계 이름
+        attributes (dict): 단계별 부가 정보 (문서명, 검색어, 토큰 수 등)
+        start (float): 트레이스 시작 기준 시작 시각 (초)
+        duration (float): 소요 시간 (초, 끝나지 않았으면 None)
+        error (str): 예외/취소로 끝난 경우 예외 이름
+    """
+    __slots__ = ("span_id", "parent_id", "name", "attributes", "start", "duration", "error", "thread")
+
+    def __init__(self, span_id, parent_id, name, attributes, start):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = start
+        self.duration = None
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    def set(self, **attributes):
+        """
+        구간 부가 정보를 추가하는 함수 (단계가 끝난 뒤 알 수 있는 값 기록용)
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": None if self.duration is None else round(self.duration, 6),
+            "error": self.error,
+            "thread": self.thread,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """
+    질문 하나의 트레이스 (구간 목록)
+
+    Args:
+        name (str): 최상위 구간 이름
+        attributes (dict): 최상위 구간 부가 정보 (질문 등)
+    """
+
+    def __init__(self, name, **attributes):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.now()
+        self._origin = time.perf_counter()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.spans = []
+
+    def elapsed(self):
+        return time.perf_counter() - self._origin
+
+    def new_span(self, name, parent, attributes):
+        span = Span(next(self._ids), parent.span_id if parent else None, name, attributes, self.elapsed())
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def duration(self):
+        root = self.spans[0] if self.spans else None
+        return root.duration if root else None
+
+    def waterfall(self):
+        """
+        부모-자식 순서(깊이 우선)로 정렬한 구간 목록을 반환하는 함수
+
+        Returns:
+            list: (깊이, Span) 목록 (형제 구간은 시작 시각 순)
+        """
+        with self._lock:
+            spans = list(self.spans)
+        children = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+        rows = []
+
+        def visit(parent_id, depth):
+            for span in sorted(children.get(parent_id, []), key=lambda s: s.start):
+                rows.append((depth, span))
+                visit(span.span_id, depth + 1)
+
+        visit(None, 0)
+        return rows
+
+    def to_dict(self):
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "duration": None if self.duration is None else round(self.duration, 6),
+            "attributes": self.attributes,
+            "spans": spans,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+
+class _SpanScope:
+    """
+    span()이 반환하는 구간 컨텍스트 (with 블록 동안 현재 구간으로 지정)
+    """
+    __slots__ = ("_trace", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, trace, name, attributes):
+        self._trace = trace
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self):
+        self._span = self._trace.new_span(self._name, _active_span.get(), self._attributes)
+        self._token = _active_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self._span
+        span.duration = self._trace.elapsed() - span.start
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        _active_span.reset(self._token)
+        return False
+
+
+class _NoopSpan:
+    """
+    트레이스가 없을 때 사용하는 아무 일도 하지 않는 구간 (공유 객체 하나)
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attributes):
+    """
+    with 블록을 하나의 구간으로 기록하는 컨텍스트를 반환하는 함수 (트레이스가 없으면 no-op)
+
+    사용 예:
+        with span("web_search", query=query) as s:
+            ...
+            s.set(cached=True)
+    """
+    trace = _active_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _SpanScope(trace, name, attributes)
+
+
+def traced(name, record_args=()):
+    """
+    함수 호출 전체를 하나의 구간으로 기록하는 데코레이터 (일반 함수/코루틴 함수 모두 지원)
+
+    Args:
+        name (str): 구간 이름
+        record_args (tuple): 구간 부가 정보로 기록할 인자 이름
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def attributes_of(args, kwargs):
+            if not record_args:
+                return {}
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            return {arg: bound[arg] for arg in record_args if arg in bound}
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                trace = _active_trace.get()
+                if trace is None:
+                    return await fn(*args, **kwargs)
+                with _SpanScope(trace, name, attributes_of(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _active_trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _SpanScope(trace, name, attributes_of(args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def start_trace(name, **attributes):
+    """
+    새 트레이스를 시작하고 with 블록 전체를 최상위 구간으로 기록하는 함수
+
+    Yields:
+        Trace: 진행 중인 트레이스
+    """
+    trace = Trace(name, **attributes)
+    trace_token = _active_trace.set(trace)
+    span_token = _active_span.set(None)
+    try:
+        with _SpanScope(trace, name, dict(attributes)):
+            yield trace
+    finally:
+        _active_span.reset(span_token)
+        _active_trace.reset(trace_token)
+
+
+def current_span():
+    """
+    현재 구간을 반환하는 함수 (트레이스가 없으면 no-op 구간)
+    """
+    return _active_span.get() or _NOOP_SPAN
+
+
+def export_trace(trace, path):
+    """
+    트레이스를 JSON Lines 파일에 한 줄로 추가하는 함수 (여러 스레드에서 호출해도 줄이 섞이지 않음)
+    """
+    line = trace.to_json() + "\n"
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
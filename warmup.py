@@ -0,0 +1,130 @@
+"""
+서버 시작 시 백그라운드 준비 작업 (워밍업)
+
+자료 코퍼스/색인 생성 등 첫 질문 전에 필요한 작업을 백그라운드 스레드에서 미리 실행하고
+준비 상태(대기/진행 중/완료/실패)를 제공한다. 준비 중에 들어온 질문은 wait_until_ready()로
+완료를 기다리며, 각 작업 자체도 프로세스 공유 싱글턴이므로 중복 생성되지 않는다.
+준비에 실패하면 다음 start()/wait_until_ready() 호출(다음 질문, 상태 점검) 때 처음부터 다시 시도한다.
+"""
+import threading
+import time
+
+STATUS_PENDING = "pending"   # 아직 시작하지 않음
+STATUS_RUNNING = "running"   # 준비 중
+STATUS_READY = "ready"       # 준비 완료
+STATUS_FAILED = "failed"     # 준비 실패 (다음 start() 호출 시 다시 시도됨)
+
+STATUS_LABELS = {
+    STATUS_PENDING: "대기",
+    STATUS_RUNNING: "준비 중",
+    STATUS_READY: "준비 완료",
+    STATUS_FAILED: "준비 실패",
+}
+
+
+class Warmup:
+    """
+    준비 작업 실행기
+
+    Args:
+        steps (list): (작업 이름, 인자 없는 함수) 목록 (순서대로 실행)
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.status = STATUS_PENDING
+        self.current_step = None
+        self.step_durations = {}  # 작업 이름 → 소요 시간 (초)
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.attempts = 0         # 준비 시도 횟수 (실패 후 다시 시도하면 증가)
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """
+        백그라운드 스레드에서 준비 작업을 시작하는 함수
+        (진행 중이거나 완료되었으면 무시, 실패했으면 처음부터 다시 시작)
+        """
+        with self._lock:
+            if self._thread is not None and self.status != STATUS_FAILED:
+                return self
+            self._done.clear()
+            self.step_durations = {}
+            self.error = None
+            self.finished_at = None
+            self.attempts += 1
+            self.status = STATUS_RUNNING
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for name, step in self.steps:
+                self.current_step = name
+                step_started = time.perf_counter()
+                step()
+                self.step_durations[name] = time.perf_counter() - step_started
+            self.status = STATUS_READY
+        except Exception as e:
+            self.error = f"{self.current_step}: {e}"
+            self.status = STATUS_FAILED
+        finally:
+            self.current_step = None
+            self.finished_at = time.time()
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.status == STATUS_READY
+
+    def wait_until_ready(self, timeout=None):
+        """
+        준비 작업이 끝날 때까지 기다리는 함수 (시작 전이거나 이전 시도가 실패했으면 바로 시작)
+
+        Returns:
+            bool: 준비 완료 여부 (실패하거나 시간 초과면 False)
+        """
+        self.start()
+        self._done.wait(timeout)
+        return self.ready
+
+    def health(self):
+        """
+        상태 점검용 정보를 반환하는 함수
+        """
+        if self.finished_at and self.started_at:
+            elapsed = self.finished_at - self.started_at
+        elif self.started_at:
+            elapsed = time.time() - self.started_at
+        else:
+            elapsed = 0.0
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "current_step": self.current_step,
+            "completed_steps": {name: round(seconds, 3) for name, seconds in self.step_durations.items()},
+            "elapsed": round(elapsed, 3),
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup(steps=()):
+    """
+    프로세스 전체에서 공유하는 준비 작업 실행기를 반환하는 함수 (처음 호출 시 steps로 생성)
+    """
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = Warmup(steps)
+    return _warmup